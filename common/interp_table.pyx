@@ -0,0 +1,73 @@
+# cython: language_level = 3
+from libc.stdlib cimport malloc, free
+
+from common.numpy_fast import interp
+
+
+cdef class InterpTable:
+  """
+  Piecewise linear lookup table, returns exactly what numpy_fast.interp(x, xp, fp)
+  returns. Breakpoints are copied once into C doubles and the segment is found by
+  binary search. Breakpoints that aren't sorted, or tables interp would raise on,
+  go through interp itself.
+  """
+  cdef double* xp
+  cdef double* fp
+  cdef int n
+  cdef int nf
+  cdef bint fallback
+  cdef readonly list breakpoints
+  cdef readonly list values
+
+  def __cinit__(self, xp, fp):
+    self.breakpoints = [float(v) for v in xp]
+    self.values = [float(v) for v in fp]
+    self.n = len(self.breakpoints)
+    self.nf = len(self.values)
+    self.fallback = self.n == 0 or self.nf < self.n or \
+                    any(not (a <= b) for a, b in zip(self.breakpoints[:-1], self.breakpoints[1:]))
+
+    self.xp = <double*>malloc(max(self.n, 1) * sizeof(double))
+    self.fp = <double*>malloc(max(self.nf, 1) * sizeof(double))
+    if self.xp == NULL or self.fp == NULL:
+      raise MemoryError()
+    for i in range(self.n):
+      self.xp[i] = self.breakpoints[i]
+    for i in range(self.nf):
+      self.fp[i] = self.values[i]
+
+  def __dealloc__(self):
+    free(self.xp)
+    free(self.fp)
+
+  cdef double lookup(self, double x):
+    cdef int lo = 0
+    cdef int hi = self.n
+    cdef int mid
+
+    # first breakpoint not below x, the same one interp's linear scan stops at
+    while lo < hi:
+      mid = (lo + hi) >> 1
+      if self.xp[mid] < x:
+        lo = mid + 1
+      else:
+        hi = mid
+
+    if lo == self.n:
+      return self.fp[self.nf - 1]
+    elif lo == 0:
+      return self.fp[0]
+    # same operation order as interp so the result is bit identical
+    return (x - self.xp[lo - 1]) * (self.fp[lo] - self.fp[lo - 1]) / (self.xp[lo] - self.xp[lo - 1]) + self.fp[lo - 1]
+
+  def __call__(self, x):
+    if self.fallback:
+      return interp(x, self.breakpoints, self.values)
+    elif type(x) is float:
+      return self.lookup(x)
+    elif hasattr(x, '__iter__'):
+      return [self.lookup(v) for v in x]
+    return self.lookup(x)
+
+  def __reduce__(self):
+    return (InterpTable, (self.breakpoints, self.values))
@@ -0,0 +1,21 @@
+from distutils.core import Extension, setup  # pylint: disable=import-error,no-name-in-module
+from Cython.Build import cythonize
+
+from common.cython_hacks import BuildExtWithoutPlatformSuffix
+
+sourcefiles = ['interp_table.pyx']
+# no fused multiply-add, results have to match numpy_fast.interp bit for bit
+extra_compile_args = ["-std=c++1z", "-ffp-contract=off"]
+
+setup(name='common',
+      cmdclass={'build_ext': BuildExtWithoutPlatformSuffix},
+      ext_modules=cythonize(
+        Extension(
+          "interp_table",
+          language="c++",
+          sources=sourcefiles,
+          extra_compile_args=extra_compile_args,
+        ),
+        nthreads=4,
+      ),
+)
@@ -42,6 +42,9 @@ class SwagFormatter(logging.Formatter):
 
     record_dict['ctx'] = self.swaglogger.get_ctx()
 
+    if getattr(record, 'dropped', 0):
+      record_dict['dropped'] = record.dropped
+
     if record.exc_info:
       record_dict['exc_info'] = self.formatException(record.exc_info)
 
@@ -64,6 +67,62 @@ class SwagFormatter(logging.Formatter):
   def format(self, record):
     return json_robust_dumps(self.format_dict(record))
 
+class CallsiteRateLimiter():
+  """Token bucket per log call site (file, line and event name), rate in records/s with bursts of up to burst records.
+
+  Messages formatted before logging share their call site's bucket. Once there are max_buckets, the ones
+  that refilled are evicted, their drop counts are kept for pop_evicted until reported.
+  """
+  def __init__(self, rate, burst, min_level=logging.ERROR, max_buckets=1024):
+    self.rate = rate
+    self.burst = burst
+    self.min_level = min_level  # records at or above this level are never dropped
+    self.max_buckets = max_buckets
+    self.buckets = {}  # (pathname, lineno, event name) -> [tokens, last time, dropped since last passed record]
+    self.evicted = []  # (key, dropped) of evicted buckets with unreported drops
+
+  def allow(self, record):
+    """Returns True if the record may be sent, records how many were dropped before it in record.dropped."""
+    if record.levelno >= self.min_level:
+      return True
+
+    # one cloudlog.event line can log several events
+    event = record.msg.get('event') if isinstance(record.msg, dict) else None
+    key = (record.pathname, record.lineno, event if isinstance(event, str) else None)
+    bucket = self.buckets.get(key)
+    if bucket is None:
+      if len(self.buckets) >= self.max_buckets:
+        self.evict(record.created)
+      bucket = self.buckets[key] = [self.burst, record.created, 0]
+
+    bucket[0] = min(self.burst, bucket[0] + (record.created - bucket[1]) * self.rate)
+    bucket[1] = record.created
+    if bucket[0] < 1.:
+      bucket[2] += 1
+      return False
+
+    bucket[0] -= 1.
+    record.dropped = bucket[2]
+    bucket[2] = 0
+    return True
+
+  def evict(self, t):
+    # full buckets behave like new ones, then the least recently used if none are full
+    idle = [key for key, (tokens, last, _) in self.buckets.items() if tokens + (t - last) * self.rate >= self.burst]
+    if not idle:
+      idle = [min(self.buckets, key=lambda key: self.buckets[key][1])]
+    for key in idle:
+      dropped = self.buckets.pop(key)[2]
+      if dropped:
+        self.evicted.append((key, dropped))
+
+  def pop_evicted(self):
+    evicted, self.evicted = self.evicted, []
+    return evicted
+
+  def dropped(self):
+    return {key: bucket[2] for key, bucket in self.buckets.items() if bucket[2]}
+
 class SwagErrorFilter(logging.Filter):
   def filter(self, record):
     return record.levelno < logging.ERROR
@@ -1,4 +1,7 @@
-from common.params_pyx import Params, UnknownKeyName, put_nonblocking # pylint: disable=no-name-in-module, import-error
+from common.params_pyx import Params, ParamsWatcher, ParamsWriter, UnknownKeyName, put_nonblocking, watch_params # pylint: disable=no-name-in-module, import-error
 assert Params
+assert ParamsWatcher
+assert ParamsWriter
 assert UnknownKeyName
 assert put_nonblocking
+assert watch_params
@@ -1,4 +1,6 @@
 from libcpp.string cimport string
+from libcpp.vector cimport vector
+from libcpp.map cimport map
 from libcpp cimport bool
 
 cdef extern from "selfdrive/common/params.cc":
@@ -14,3 +16,12 @@ cdef extern from "selfdrive/common/params.h":
     string get(string, bool) nogil
     int delete_db_value(string)
     int write_db_value(string, string)
+    int write_db_values(map[string, string]) nogil
+    int delete_db_values(vector[string]) nogil
+    string get_params_path()
+
+  cdef cppclass ParamsWatcher:
+    ParamsWatcher(string, vector[string])
+    int fd()
+    vector[string] read_changed()
+    vector[string] wait(int) nogil
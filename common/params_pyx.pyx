@@ -2,12 +2,19 @@
 # cython: language_level = 3
 from libcpp cimport bool
 from libcpp.string cimport string
-from params_pxd cimport Params as c_Params
+from libcpp.vector cimport vector
+from libcpp.map cimport map
+from params_pxd cimport Params as c_Params, ParamsWatcher as c_ParamsWatcher
 
 import os
+import time
+import atexit
 import threading
 from common.basedir import BASEDIR
 
+WRITER_RETRY_INTERVAL = 1.  # s between attempts of a batch that failed to write
+WRITER_EXIT_TIMEOUT = 5.  # s to wait for queued writes at exit
+
 cdef enum TxType:
   PERSISTENT = 1
   CLEAR_ON_MANAGER_START = 2
@@ -100,9 +107,13 @@ cdef class Params:
     del self.p
 
   def clear_all(self, tx_type=None):
+    cdef vector[string] k
     for key in keys:
       if tx_type is None or tx_type in keys[key]:
-        self.delete(key)
+        k.push_back(key)
+
+    with nogil:
+      self.p.delete_db_values(k)
 
   def manager_start(self):
     self.clear_all(TxType.CLEAR_ON_MANAGER_START)
@@ -151,16 +162,169 @@ cdef class Params:
 
     self.p.write_db_value(key, dat)
 
+  def put_many(self, values):
+    """
+    Writes a dict of key to value under one lock with a single directory fsync.
+    Every key ends up with either its old or its new value, but a crash can
+    leave only some of the keys updated. Blocks like put, returns False if
+    the values couldn't be written.
+    """
+    cdef int result
+    cdef map[string, string] v
+    for key, dat in values.items():
+      key = ensure_bytes(key)
+      if key not in keys:
+        raise UnknownKeyName(key)
+      v[key] = ensure_bytes(dat)
+
+    with nogil:
+      result = self.p.write_db_values(v)
+    return result >= 0
+
   def delete(self, key):
     key = ensure_bytes(key)
     self.p.delete_db_value(key)
 
+  def watch(self, watch_keys=None):
+    """Returns a ParamsWatcher for the given keys on this params directory, all keys if None."""
+    return ParamsWatcher(watch_keys, self.p.get_params_path().decode())
 
-def put_nonblocking(key, val, d=None):
-  def f(key, val):
-    params = Params(d)
-    params.put(key, val)
 
-  t = threading.Thread(target=f, args=(key, val))
+cdef class ParamsWatcher:
+  """
+  Change notification for params keys through inotify instead of polling.
+  fileno() can be passed to select/poll, it becomes readable when a watched
+  key is written or deleted. Unrelated keys may also wake it, so use the
+  keys returned by read() or wait().
+  """
+  cdef c_ParamsWatcher* w
+
+  def __cinit__(self, watch_keys=None, d=None):
+    cdef vector[string] k
+    for key in (watch_keys or []):
+      key = ensure_bytes(key)
+      if key not in keys:
+        raise UnknownKeyName(key)
+      k.push_back(key)
+
+    if d is None:
+      d = Params().p.get_params_path().decode()
+    self.w = new c_ParamsWatcher(<string>d.encode(), k)
+
+  def __dealloc__(self):
+    del self.w
+
+  def fileno(self):
+    return self.w.fd()
+
+  def read(self):
+    """Returns the watched keys that changed since the last call, without blocking."""
+    cdef vector[string] changed = self.w.read_changed()
+    return [key.decode() for key in changed]
+
+  def wait(self, timeout=None):
+    """Blocks until a watched key changes or timeout seconds pass, returns the changed keys."""
+    cdef int timeout_ms = -1 if timeout is None else int(timeout * 1000)
+    cdef vector[string] changed
+    with nogil:
+      changed = self.w.wait(timeout_ms)
+    return [key.decode() for key in changed]
+
+
+def watch_params(watch_keys, callback, d=None):
+  """Calls callback(key) from a background thread every time one of the keys changes."""
+  def f(watcher):
+    while True:
+      for key in watcher.wait():
+        callback(key)
+
+  t = threading.Thread(target=f, args=(ParamsWatcher(watch_keys, d),), daemon=True)
   t.start()
   return t
+
+
+class ParamsWriter:
+  """
+  Long lived background writer for a params directory. Writes queued while a
+  batch is being committed are coalesced per key and go out together as the
+  next batch through put_many. A batch that fails to write is retried.
+  """
+  def __init__(self, d=None):
+    self.d = d
+    self.pid = os.getpid()
+    self.cv = threading.Condition()
+    self.pending = {}
+    self.queued = 0  # number of puts so far
+    self.committed = 0  # number of puts on disk
+    self.errors = 0  # number of failed batches
+
+    self.thread = threading.Thread(target=self.writer_thread, daemon=True)
+    self.thread.start()
+    atexit.register(self.flush, WRITER_EXIT_TIMEOUT)
+
+  def put(self, key, dat):
+    key = ensure_bytes(key)
+    dat = ensure_bytes(dat)
+
+    if key not in keys:
+      raise UnknownKeyName(key)
+
+    with self.cv:
+      self.pending[key] = dat
+      self.queued += 1
+      self.cv.notify_all()
+
+  def flush(self, timeout=None):
+    """Blocks until every put before this call is on disk. Returns False on timeout or when a write fails,
+    the writer keeps retrying it in the background."""
+    if os.getpid() != self.pid:
+      # the writer thread didn't survive a fork
+      return False
+
+    with self.cv:
+      queued, errors = self.queued, self.errors
+      self.cv.wait_for(lambda: self.committed >= queued or self.errors > errors, timeout)
+      return self.committed >= queued
+
+  def writer_thread(self):
+    params = Params(self.d)
+    while True:
+      with self.cv:
+        self.cv.wait_for(lambda: self.pending)
+        batch, self.pending = self.pending, {}
+        queued = self.queued
+
+      ok = params.put_many(batch)
+
+      with self.cv:
+        if ok:
+          self.committed = queued
+        else:
+          # newer puts of the same keys replace the failed values
+          self.pending = {**batch, **self.pending}
+          self.errors += 1
+        self.cv.notify_all()
+
+      if not ok:
+        from selfdrive.swaglog import cloudlog
+        cloudlog.error(f"params writer failed to write {sorted(k.decode() for k in batch)}, retrying")
+        time.sleep(WRITER_RETRY_INTERVAL)
+
+
+writers = {}
+writers_lock = threading.Lock()
+
+def get_writer(d=None):
+  """Returns the background writer of this process for a params directory."""
+  with writers_lock:
+    writer = writers.get(d)
+    if writer is None or writer.pid != os.getpid():
+      writer = writers[d] = ParamsWriter(d)
+    return writer
+
+
+def put_nonblocking(key, val, d=None):
+  """Queues the write on the background writer and returns it, call flush on it to wait for the write."""
+  writer = get_writer(d)
+  writer.put(key, val)
+  return writer
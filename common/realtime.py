@@ -3,6 +3,7 @@ import gc
 import os
 import time
 import multiprocessing
+from bisect import bisect_left
 
 from common.hardware import PC
 from common.common_pyx import sec_since_boot  # pylint: disable=no-name-in-module, import-error
@@ -14,6 +15,11 @@ DT_MDL = 0.05  # model
 DT_DMON = 0.1  # driver monitoring
 DT_TRML = 0.5  # thermald and manager
 
+LOOP_TIMING_INTERVAL = 10.  # s between loop timing reports
+
+# upper bin edges in ms for the loop timing histograms, the last bin also holds everything above
+TIMING_BINS_MS = [0.1, 0.25, 0.5, 1., 2., 3., 4., 5., 6., 7., 8., 9., 10., 12.5, 15., 20., 30., 50., 75., 100., 200.]
+
 
 class Priority:
   MIN_REALTIME = 52 # highest android process priority is 51
@@ -37,9 +43,83 @@ def config_realtime_process(core, priority):
   set_core_affinity(core)
 
 
+class TimingHistogram():
+  """Fixed size histogram of durations in ms, cheap enough to update every frame."""
+  def __init__(self, bins=TIMING_BINS_MS):
+    self.bins = bins
+    self.reset()
+
+  def reset(self):
+    self.counts = [0] * len(self.bins)
+    self.count = 0
+    self.total = 0.
+    self.max = 0.
+
+  def add(self, value):
+    self.counts[min(bisect_left(self.bins, value), len(self.bins) - 1)] += 1
+    self.count += 1
+    self.total += value
+    self.max = max(self.max, value)
+
+  def percentile(self, p):
+    """Upper edge of the bin holding the p-th percentile, capped at the largest sample."""
+    if self.count == 0:
+      return 0.
+    rank = p / 100. * self.count
+    seen = 0
+    # the last bin is open ended, only the max bounds it
+    for edge, count in zip(self.bins[:-1], self.counts):
+      seen += count
+      if seen >= rank:
+        return min(edge, self.max)
+    return self.max
+
+  def summary(self):
+    return {
+      'mean': self.total / self.count if self.count else 0.,
+      'p50': self.percentile(50),
+      'p90': self.percentile(90),
+      'p99': self.percentile(99),
+      'max': self.max,
+      'counts': list(self.counts),
+    }
+
+
+class LoopTiming():
+  """Distribution of work time, slack and sleep overshoot of a Ratekeeper loop, all in ms.
+
+  Work is the time from the previous keep_time/monitor_time returning to the next call,
+  so for loops that only monitor it includes waiting on their input. Slack is the time
+  left until the frame deadline, loops behind schedule count as an overrun instead.
+  Overshoot is how late keep_time woke up from its sleep."""
+  def __init__(self):
+    self.work = TimingHistogram()
+    self.slack = TimingHistogram()
+    self.overshoot = TimingHistogram()
+    self.frames = 0
+    self.overruns = 0
+
+  def reset(self):
+    self.work.reset()
+    self.slack.reset()
+    self.overshoot.reset()
+    self.frames = 0
+    self.overruns = 0
+
+  def summary(self):
+    return {
+      'frames': self.frames,
+      'overruns': self.overruns,
+      'work': self.work.summary(),
+      'slack': self.slack.summary(),
+      'overshoot': self.overshoot.summary(),
+    }
+
+
 class Ratekeeper():
-  def __init__(self, rate, print_delay_threshold=0.):
-    """Rate in Hz for ratekeeping. print_delay_threshold must be nonnegative."""
+  def __init__(self, rate, print_delay_threshold=0., timing_interval=None):
+    """Rate in Hz for ratekeeping. print_delay_threshold must be nonnegative.
+    With a timing_interval in seconds the loop timing is recorded and handed out by pop_timing."""
     self._interval = 1. / rate
     self._next_frame_time = sec_since_boot() + self._interval
     self._print_delay_threshold = print_delay_threshold
@@ -47,6 +127,11 @@ class Ratekeeper():
     self._remaining = 0
     self._process_name = multiprocessing.current_process().name
 
+    self._timing_interval = timing_interval
+    self._timing = LoopTiming() if timing_interval is not None else None
+    self._timing_start = sec_since_boot()
+    self._last_return = None
+
   @property
   def frame(self):
     return self._frame
@@ -55,21 +140,61 @@ class Ratekeeper():
   def remaining(self):
     return self._remaining
 
+  @property
+  def timing(self):
+    return self._timing
+
   # Maintain loop rate by calling this at the end of each loop
   def keep_time(self):
     lagged = self.monitor_time()
     if self._remaining > 0:
       time.sleep(self._remaining)
+      if self._timing is not None:
+        # monitor_time already moved on to the next frame
+        t = sec_since_boot()
+        self._timing.overshoot.add((t - (self._next_frame_time - self._interval)) * 1000.)
+        self._last_return = t
     return lagged
 
   # this only monitor the cumulative lag, but does not enforce a rate
   def monitor_time(self):
     lagged = False
-    remaining = self._next_frame_time - sec_since_boot()
+    t = sec_since_boot()
+    remaining = self._next_frame_time - t
     self._next_frame_time += self._interval
     if self._print_delay_threshold is not None and remaining < -self._print_delay_threshold:
       print("%s lagging by %.2f ms" % (self._process_name, -remaining * 1000))
       lagged = True
     self._frame += 1
     self._remaining = remaining
+
+    if self._timing is not None:
+      if self._last_return is not None:
+        self._timing.work.add((t - self._last_return) * 1000.)
+      if remaining < 0:
+        self._timing.overruns += 1
+      else:
+        self._timing.slack.add(remaining * 1000.)
+      self._timing.frames += 1
+      self._last_return = t
     return lagged
+
+  def pop_timing(self):
+    """Returns a summary of the loop timing once every timing_interval and starts a new window, None otherwise."""
+    if self._timing is None:
+      return None
+
+    t = sec_since_boot()
+    if t - self._timing_start < self._timing_interval:
+      return None
+
+    ret = {
+      'process': self._process_name,
+      'rate': 1. / self._interval,
+      'window': t - self._timing_start,
+      'bins_ms': TIMING_BINS_MS,
+    }
+    ret.update(self._timing.summary())
+    self._timing.reset()
+    self._timing_start = t
+    return ret
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+import logging
+import unittest
+
+from common.logging_extra import CallsiteRateLimiter, NiceOrderedDict
+
+
+def record(msg, t, lineno=10, level=logging.INFO):
+  r = logging.LogRecord("swaglog", level, "test.py", lineno, msg, (), None)
+  r.created = t
+  return r
+
+
+def event(name, t, lineno=10):
+  return record(NiceOrderedDict(event=name), t, lineno)
+
+
+class TestCallsiteRateLimiter(unittest.TestCase):
+  def setUp(self):
+    self.limiter = CallsiteRateLimiter(rate=10., burst=5.)
+
+  def test_burst_then_rate(self):
+    allowed = [self.limiter.allow(record("x", 0.)) for _ in range(10)]
+    self.assertEqual(allowed, [True] * 5 + [False] * 5)
+    self.assertEqual(list(self.limiter.dropped().values()), [5])
+
+    # refilled after 0.1s, the next record carries the drop count
+    r = record("x", 0.1)
+    self.assertTrue(self.limiter.allow(r))
+    self.assertEqual(r.dropped, 5)
+    self.assertEqual(self.limiter.dropped(), {})
+
+  def test_errors_not_limited(self):
+    for _ in range(10):
+      self.assertTrue(self.limiter.allow(record("x", 0., level=logging.ERROR)))
+
+  def test_separate_callsites(self):
+    for _ in range(5):
+      self.assertTrue(self.limiter.allow(record("x", 0.)))
+    self.assertFalse(self.limiter.allow(record("x", 0.)))
+    self.assertTrue(self.limiter.allow(record("x", 0., lineno=11)))
+
+  def test_formatted_messages_share_callsite(self):
+    # cloudlog.info("deleting %s" % path)
+    allowed = [self.limiter.allow(record("deleting %d" % i, 0.)) for i in range(10)]
+    self.assertEqual(allowed, [True] * 5 + [False] * 5)
+    self.assertEqual(len(self.limiter.buckets), 1)
+
+  def test_events_keyed_by_name(self):
+    # cloudlog.event(name, ...) on one line with different names
+    for _ in range(5):
+      self.assertTrue(self.limiter.allow(event("a", 0.)))
+    self.assertFalse(self.limiter.allow(event("a", 0.)))
+    self.assertTrue(self.limiter.allow(event("b", 0.)))
+
+  def test_evict(self):
+    limiter = CallsiteRateLimiter(rate=10., burst=5., max_buckets=4)
+    for lineno in range(4):
+      for _ in range(6):
+        limiter.allow(record("x", 0., lineno=lineno))
+    self.assertEqual(len(limiter.buckets), 4)
+
+    # none refilled yet, the least recently used goes
+    limiter.allow(record("x", 0.01, lineno=0))
+    self.assertTrue(limiter.allow(record("x", 0.02, lineno=10)))
+    self.assertEqual(len(limiter.buckets), 4)
+    self.assertEqual(limiter.pop_evicted(), [(("test.py", 1, None), 1)])
+    self.assertEqual(limiter.pop_evicted(), [])
+
+    # after refilling every full bucket goes, with its drop count
+    self.assertTrue(limiter.allow(record("x", 10., lineno=11)))
+    self.assertEqual(list(limiter.buckets), [("test.py", 11, None)])
+    self.assertEqual(sorted(limiter.pop_evicted()), [(("test.py", 0, None), 2), (("test.py", 2, None), 1), (("test.py", 3, None), 1)])
+
+
+if __name__ == "__main__":
+  unittest.main()
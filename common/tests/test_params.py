@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from common.basedir import BASEDIR
+from common.params import Params, ParamsWatcher, ParamsWriter, UnknownKeyName, put_nonblocking
+
+CRASH_KEYS = ["CarParams", "CarParamsCache", "CalibrationParams", "LiveParameters"]
+CRASH_VALUE_SIZE = 64 * 1024
+
+# keeps rewriting CRASH_KEYS with a new generation until it gets killed
+CRASH_WRITER = """
+import sys
+from common.params import ParamsWriter
+writer = ParamsWriter(sys.argv[1])
+g = 0
+while True:
+  for key in %r:
+    writer.put(key, "%%s %%d " %% (key, g) + "x" * %d)
+  writer.flush()
+  g += 1
+""" % (CRASH_KEYS, CRASH_VALUE_SIZE)
+
+
+class TestParamsWatcher(unittest.TestCase):
+  def setUp(self):
+    self.tmpdir = tempfile.mkdtemp()
+    self.params = Params(self.tmpdir)
+
+  def tearDown(self):
+    shutil.rmtree(self.tmpdir)
+
+  def test_first_write(self):
+    # the d directory doesn't exist until the first write
+    watcher = self.params.watch(["IsMetric"])
+    self.params.put("IsMetric", "1")
+    self.assertEqual(watcher.read(), ["IsMetric"])
+    self.assertEqual(watcher.read(), [])
+
+  def test_only_watched_keys(self):
+    self.params.put("IsMetric", "0")
+    watcher = self.params.watch(["IsMetric"])
+    self.params.put("Passive", "1")
+    self.assertEqual(watcher.wait(0.1), [])
+
+    self.params.delete("IsMetric")
+    self.assertEqual(watcher.wait(0.1), ["IsMetric"])
+
+  def test_wait_wakes_on_write(self):
+    watcher = self.params.watch(["IsMetric"])
+    threading.Timer(0.1, self.params.put, args=("IsMetric", "1")).start()
+    t = time.monotonic()
+    self.assertEqual(watcher.wait(5.), ["IsMetric"])
+    self.assertLess(time.monotonic() - t, 1.)
+
+  def test_blocking_get(self):
+    threading.Timer(0.1, self.params.put, args=("CarParams", "test")).start()
+    self.assertEqual(self.params.get("CarParams", block=True), b"test")
+
+  def test_unknown_key(self):
+    with self.assertRaises(UnknownKeyName):
+      ParamsWatcher(["NotAKey"], self.tmpdir)
+
+
+class TestParamsWriter(unittest.TestCase):
+  def setUp(self):
+    self.tmpdir = tempfile.mkdtemp()
+    self.params = Params(self.tmpdir)
+
+  def tearDown(self):
+    shutil.rmtree(self.tmpdir)
+
+  def test_put_many(self):
+    self.params.put_many({"IsMetric": "1", "IsRHD": b"0"})
+    self.assertEqual(self.params.get("IsMetric"), b"1")
+    self.assertEqual(self.params.get("IsRHD"), b"0")
+
+    with self.assertRaises(UnknownKeyName):
+      self.params.put_many({"NotAKey": "1"})
+
+  def test_clear_all(self):
+    self.params.put_many({"IsMetric": "1", "IsOffroad": "1", "CarParams": "test"})
+    self.params.manager_start()
+    self.assertEqual(self.params.get("IsMetric"), b"1")
+    self.assertIsNone(self.params.get("IsOffroad"))
+    self.assertIsNone(self.params.get("CarParams"))
+
+  def test_coalesce_and_flush(self):
+    writer = ParamsWriter(self.tmpdir)
+    for i in range(100):
+      writer.put("IsMetric", str(i))
+      writer.put("IsRHD", str(-i))
+    self.assertTrue(writer.flush(5.))
+    self.assertEqual(self.params.get("IsMetric"), b"99")
+    self.assertEqual(self.params.get("IsRHD"), b"-99")
+
+    with self.assertRaises(UnknownKeyName):
+      writer.put("NotAKey", "1")
+
+  def test_write_error(self):
+    # not a directory, writes fail until it's removed
+    d = os.path.join(self.tmpdir, "params")
+    open(d, "w").close()
+    self.assertFalse(Params(d).put_many({"IsMetric": "0"}))
+
+    writer = ParamsWriter(d)
+    writer.put("IsMetric", "1")
+    self.assertFalse(writer.flush(5.))
+
+    os.unlink(d)
+    t = time.monotonic()
+    while Params(d).get("IsMetric") != b"1":
+      self.assertLess(time.monotonic() - t, 5.)
+      time.sleep(0.01)
+    self.assertTrue(writer.flush(5.))
+
+  def test_put_nonblocking(self):
+    writer = put_nonblocking("IsMetric", "1", self.tmpdir)
+    self.assertIs(put_nonblocking("IsRHD", "1", self.tmpdir), writer)
+    self.assertTrue(writer.flush(5.))
+    self.assertEqual(self.params.get("IsRHD"), b"1")
+
+  def test_crash_consistency(self):
+    self.params.put_many({key: "%s 0 " % key + "x" * CRASH_VALUE_SIZE for key in CRASH_KEYS})
+
+    env = dict(os.environ, PYTHONPATH=BASEDIR)
+    for _ in range(10):
+      proc = subprocess.Popen([sys.executable, "-c", CRASH_WRITER, self.tmpdir], env=env)
+      time.sleep(random.uniform(0.3, 0.6))
+      proc.send_signal(signal.SIGKILL)
+      proc.wait()
+
+      # every key holds a complete value from some generation, never a partial one
+      for key in CRASH_KEYS:
+        val = self.params.get(key, encoding='utf8')
+        k, g, x = val.split(" ")
+        self.assertEqual(k, key)
+        self.assertTrue(g.isdigit())
+        self.assertEqual(x, "x" * CRASH_VALUE_SIZE)
+
+
+if __name__ == "__main__":
+  unittest.main()
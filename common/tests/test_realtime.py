@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+import time
+import unittest
+
+from common.realtime import Ratekeeper, TimingHistogram, TIMING_BINS_MS
+
+
+class TestTimingHistogram(unittest.TestCase):
+  def test_percentiles(self):
+    h = TimingHistogram()
+    for _ in range(98):
+      h.add(1.5)
+    h.add(9.5)
+    h.add(1000.)
+
+    self.assertEqual(h.count, 100)
+    self.assertEqual(h.percentile(50), 2.)
+    self.assertEqual(h.percentile(99), 10.)
+    self.assertEqual(h.percentile(100), 1000.)
+    self.assertEqual(h.counts[-1], 1)
+
+  def test_capped_at_max(self):
+    h = TimingHistogram()
+    h.add(0.3)
+    self.assertEqual(h.percentile(50), 0.3)
+    self.assertEqual(len(h.summary()['counts']), len(TIMING_BINS_MS))
+
+
+class TestRatekeeperTiming(unittest.TestCase):
+  def test_disabled_by_default(self):
+    rk = Ratekeeper(100, print_delay_threshold=None)
+    rk.keep_time()
+    self.assertIsNone(rk.timing)
+    self.assertIsNone(rk.pop_timing())
+
+  def test_overruns(self):
+    rk = Ratekeeper(100, print_delay_threshold=None, timing_interval=0.)
+    for i in range(20):
+      if i % 5 == 4:
+        time.sleep(0.03)
+      rk.keep_time()
+
+    timing = rk.pop_timing()
+    self.assertEqual(timing['frames'], 20)
+    self.assertGreater(timing['overruns'], 0)
+    self.assertEqual(sum(timing['work']['counts']), 19)
+    self.assertGreaterEqual(timing['work']['max'], 30.)
+
+    # a new window starts after every report
+    self.assertEqual(rk.timing.frames, 0)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -69,6 +69,8 @@ unsigned int chrysler_checksum(unsigned int address, uint64_t d, int l) {
 
 // Static lookup table for fast computation of CRC8 poly 0x2F, aka 8H2F/AUTOSAR
 uint8_t crc8_lut_8h2f[256];
+// Static lookup table for fast computation of CRC8 poly 0x1D, as used by Hyundai LKAS11
+uint8_t crc8_lut_1d[256];
 
 void gen_crc_lookup_table(uint8_t poly, uint8_t crc_lut[]) {
   uint8_t crc;
@@ -90,6 +92,7 @@ void init_crc_lookup_tables() {
   // At init time, set up static lookup tables for fast CRC computation.
 
   gen_crc_lookup_table(0x2F, crc8_lut_8h2f);    // CRC-8 8H2F/AUTOSAR for Volkswagen
+  gen_crc_lookup_table(0x1D, crc8_lut_1d);      // CRC-8 SAE J1850 poly for Hyundai
 }
 
 unsigned int volkswagen_crc(unsigned int address, uint64_t d, int l) {
@@ -193,6 +196,44 @@ unsigned int pedal_checksum(uint64_t d, int l) {
   return crc;
 }
 
+unsigned int hyundai_lkas_checksum(uint64_t d, int l, HyundaiLkasChecksum type) {
+  // LKAS11 keeps its checksum in byte 6, it is left out of all variants
+  uint8_t dat[8];
+  for (int i = 0; i < 8; i++) {
+    dat[i] = (d >> (56 - 8*i)) & 0xFF;
+  }
+
+  if (type == HYUNDAI_LKAS_CRC8) {
+    // CRC Checksum as seen on 2019 Hyundai Santa Fe
+    uint8_t crc = 0xFD ^ 0xDF;
+    for (int i = 0; i < l; i++) {
+      if (i == 6) continue;
+      crc = crc8_lut_1d[crc ^ dat[i]];
+    }
+    return crc ^ 0xDF;
+  }
+
+  // Checksum of first 6 Bytes, as seen on 2018 Kia Sorento
+  unsigned int s = 0;
+  for (int i = 0; i < 6; i++) {
+    s += dat[i];
+  }
+  // Checksum of first 6 Bytes and last Byte as seen on 2018 Kia Stinger
+  if (type == HYUNDAI_LKAS_7B) {
+    s += dat[7];
+  }
+  return s & 0xFF;
+}
+
+unsigned int hyundai_nibble_checksum(uint64_t d, int l) {
+  // expects the checksum nibble to be zeroed
+  d >>= ((8-l)*8); // remove padding
+
+  unsigned int s = 0;
+  while (d) { s += d & 0xF; d >>= 4; }
+
+  return (16 - (s % 16)) & 0xF;
+}
 
 uint64_t read_u64_be(const uint8_t* v) {
   return (((uint64_t)v[0] << 56)
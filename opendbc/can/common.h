@@ -2,6 +2,7 @@
 
 #include <vector>
 #include <map>
+#include <queue>
 #include <unordered_map>
 
 #include "common_dbc.h"
@@ -10,6 +11,13 @@
 
 #define MAX_BAD_COUNTER 5
 
+// LKAS11 checksum flavour differs per car rather than per DBC
+enum HyundaiLkasChecksum {
+  HYUNDAI_LKAS_CRC8,
+  HYUNDAI_LKAS_6B,
+  HYUNDAI_LKAS_7B,
+};
+
 // Helper functions
 unsigned int honda_checksum(unsigned int address, uint64_t d, int l);
 unsigned int toyota_checksum(unsigned int address, uint64_t d, int l);
@@ -18,8 +26,11 @@ unsigned int chrysler_checksum(unsigned int address, uint64_t d, int l);
 void init_crc_lookup_tables();
 unsigned int volkswagen_crc(unsigned int address, uint64_t d, int l);
 unsigned int pedal_checksum(uint64_t d, int l);
+unsigned int hyundai_lkas_checksum(uint64_t d, int l, HyundaiLkasChecksum type);
+unsigned int hyundai_nibble_checksum(uint64_t d, int l);
 uint64_t read_u64_be(const uint8_t* v);
 uint64_t read_u64_le(const uint8_t* v);
+uint64_t ReverseBytes(uint64_t x);
 
 class MessageState {
 public:
@@ -36,10 +47,27 @@ public:
   uint8_t counter;
   uint8_t counter_fail;
 
+  // health counters
+  uint64_t frames;
+  uint64_t checksum_errors;
+  uint64_t counter_errors;
+  uint64_t timeouts;
+  bool timed_out;
+
   bool parse(uint64_t sec, uint16_t ts_, uint8_t * dat);
   bool update_counter_generic(int64_t v, int cnt_size);
 };
 
+struct MessageStats {
+  uint32_t address;
+  uint64_t seen;
+  uint64_t frames;
+  uint64_t checksum_errors;
+  uint64_t counter_errors;
+  uint64_t timeouts;
+  bool timed_out;
+};
+
 class CANParser {
 private:
   const int bus;
@@ -47,6 +75,12 @@ private:
   const DBC *dbc = NULL;
   std::unordered_map<uint32_t, MessageState> message_states;
 
+  // (deadline, address) of the messages with a timeout check that aren't timed out yet, earliest first.
+  // Deadlines are only moved forward when they come up, so the cost scales with expirations.
+  typedef std::pair<uint64_t, uint32_t> Deadline;
+  std::priority_queue<Deadline, std::vector<Deadline>, std::greater<Deadline>> deadlines;
+  int num_timed_out = 0;
+
 public:
   bool can_valid = false;
   uint64_t last_sec = 0;
@@ -58,15 +92,35 @@ public:
   void UpdateValid(uint64_t sec);
   void update_string(std::string data, bool sendcan);
   std::vector<SignalValue> query_latest();
+  std::vector<MessageStats> query_stats();
 };
 
+struct SignalColumn {
+  uint32_t address;
+  int bus;
+  Signal sig;
+
+  // frame index and decoded value of every occurrence
+  std::vector<uint32_t> idx;
+  std::vector<double> vals;
+};
+
+void decode_can_columns(std::vector<SignalColumn> &columns, size_t n,
+                        const uint32_t *addresses, const uint8_t *buses, const uint8_t *dats);
+
 class CANPacker {
 private:
   const DBC *dbc = NULL;
   std::map<std::pair<uint32_t, std::string>, Signal> signal_lookup;
   std::map<uint32_t, Msg> message_lookup;
+  std::map<uint32_t, Signal> counter_lookup;
+  std::map<uint32_t, Signal> checksum_lookup;
 
 public:
+  HyundaiLkasChecksum hyundai_lkas_checksum_type = HYUNDAI_LKAS_7B;
+
   CANPacker(const std::string& dbc_name);
-  uint64_t pack(uint32_t address, const std::vector<SignalPackValue> &signals, int counter);
+  uint64_t pack(uint32_t address, const std::vector<SignalPackValue> &signals, int counter, bool checksum = true);
 };
+
+std::string can_frames_to_sendcan(const std::vector<CanPackFrame> &frames, bool valid);
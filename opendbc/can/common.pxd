@@ -1,7 +1,7 @@
 # distutils: language = c++
 #cython: language_level=3
 
-from libc.stdint cimport uint32_t, uint64_t, uint16_t
+from libc.stdint cimport uint8_t, uint32_t, uint64_t, uint16_t
 from libcpp.vector cimport vector
 from libcpp.map cimport map
 from libcpp.string cimport string
@@ -20,7 +20,10 @@ cdef extern from "common_dbc.h":
     VOLKSWAGEN_CHECKSUM,
     VOLKSWAGEN_COUNTER,
     SUBARU_CHECKSUM,
-    CHRYSLER_CHECKSUM
+    CHRYSLER_CHECKSUM,
+    HYUNDAI_LKAS_CHECKSUM,
+    HYUNDAI_NIBBLE_CHECKSUM,
+    HYUNDAI_COUNTER
 
   cdef struct Signal:
     const char* name
@@ -69,16 +72,50 @@ cdef extern from "common_dbc.h":
     const char * name
     double value
 
+  cdef struct CanPackFrame:
+    uint32_t address
+    uint64_t dat
+    unsigned int size
+    int src
+    uint16_t bus_time
+
 
 cdef extern from "common.h":
   cdef const DBC* dbc_lookup(const string);
 
+  cdef cppclass SignalColumn:
+    uint32_t address
+    int bus
+    Signal sig
+    vector[uint32_t] idx
+    vector[double] vals
+
+  void decode_can_columns(vector[SignalColumn]&, size_t, const uint32_t*, const uint8_t*, const uint8_t*)
+  cdef string can_frames_to_sendcan(vector[CanPackFrame], bool)
+
+  cdef struct MessageStats:
+    uint32_t address
+    uint64_t seen
+    uint64_t frames
+    uint64_t checksum_errors
+    uint64_t counter_errors
+    uint64_t timeouts
+    bool timed_out
+
   cdef cppclass CANParser:
     bool can_valid
+    uint64_t last_sec
     CANParser(int, string, vector[MessageParseOptions], vector[SignalParseOptions])
     void update_string(string, bool)
     vector[SignalValue] query_latest()
+    vector[MessageStats] query_stats()
+
+  ctypedef enum HyundaiLkasChecksum:
+    HYUNDAI_LKAS_CRC8,
+    HYUNDAI_LKAS_6B,
+    HYUNDAI_LKAS_7B
 
   cdef cppclass CANPacker:
+   HyundaiLkasChecksum hyundai_lkas_checksum_type
    CANPacker(string)
-   uint64_t pack(uint32_t, vector[SignalPackValue], int counter)
+   uint64_t pack(uint32_t, vector[SignalPackValue], int counter, bool checksum)
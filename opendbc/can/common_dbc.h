@@ -11,6 +11,14 @@ struct SignalPackValue {
   double value;
 };
 
+struct CanPackFrame {
+  uint32_t address;
+  uint64_t dat;
+  unsigned int size;
+  int src;
+  uint16_t bus_time;
+};
+
 struct SignalParseOptions {
   uint32_t address;
   const char* name;
@@ -40,6 +48,9 @@ enum SignalType {
   VOLKSWAGEN_COUNTER,
   SUBARU_CHECKSUM,
   CHRYSLER_CHECKSUM,
+  HYUNDAI_LKAS_CHECKSUM,
+  HYUNDAI_NIBBLE_CHECKSUM,
+  HYUNDAI_COUNTER,
 };
 
 struct Signal {
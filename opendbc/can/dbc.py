@@ -3,8 +3,17 @@ import os
 import struct
 import sys
 import numbers
+import hashlib
 from collections import namedtuple, defaultdict
 
+import numpy as np
+
+from opendbc.can.pickle_cache import default_cache_dir, load_cached
+
+# bump when the parsed representation changes to invalidate old caches
+DBC_CACHE_VERSION = 1
+DBC_CACHE_DIR = os.getenv("DBC_CACHE_DIR", default_cache_dir("dbc_cache"))
+
 def int_or_float(s):
   # return number, trying to maintain int format
   if s.isdigit():
@@ -17,105 +26,150 @@ DBCSignal = namedtuple(
   "DBCSignal", ["name", "start_bit", "size", "is_little_endian", "is_signed",
                 "factor", "offset", "tmin", "tmax", "units"])
 
+# precomputed per signal: raw = (dat >> shift) & mask, sign extended when raw & sign_bit
+DecodeEntry = namedtuple(
+  "DecodeEntry", ["name", "is_little_endian", "shift", "mask", "sign_bit", "factor", "offset"])
 
-class dbc():
-  def __init__(self, fn):
-    self.name, _ = os.path.splitext(os.path.basename(fn))
-    with open(fn, encoding="ascii") as f:
-      self.txt = f.readlines()
-    self._warned_addresses = set()
 
-    # regexps from https://github.com/ebroecker/canmatrix/blob/master/canmatrix/importdbc.py
-    bo_regexp = re.compile(r"^BO\_ (\w+) (\w+) *: (\w+) (\w+)")
-    sg_regexp = re.compile(r"^SG\_ (\w+) : (\d+)\|(\d+)@(\d+)([\+|\-]) \(([0-9.+\-eE]+),([0-9.+\-eE]+)\) \[([0-9.+\-eE]+)\|([0-9.+\-eE]+)\] \"(.*)\" (.*)")
-    sgm_regexp = re.compile(r"^SG\_ (\w+) (\w+) *: (\d+)\|(\d+)@(\d+)([\+|\-]) \(([0-9.+\-eE]+),([0-9.+\-eE]+)\) \[([0-9.+\-eE]+)\|([0-9.+\-eE]+)\] \"(.*)\" (.*)")
-    val_regexp = re.compile(r"VAL\_ (\w+) (\w+) (\s*[-+]?[0-9]+\s+\".+?\"[^;]*)")
+def parse_dbc_lines(txt, dbc_name):
+  """Parse the lines of a .dbc file into (msgs, def_vals), see dbc.__init__ for the layout."""
+  # regexps from https://github.com/ebroecker/canmatrix/blob/master/canmatrix/importdbc.py
+  bo_regexp = re.compile(r"^BO\_ (\w+) (\w+) *: (\w+) (\w+)")
+  sg_regexp = re.compile(r"^SG\_ (\w+) : (\d+)\|(\d+)@(\d+)([\+|\-]) \(([0-9.+\-eE]+),([0-9.+\-eE]+)\) \[([0-9.+\-eE]+)\|([0-9.+\-eE]+)\] \"(.*)\" (.*)")
+  sgm_regexp = re.compile(r"^SG\_ (\w+) (\w+) *: (\d+)\|(\d+)@(\d+)([\+|\-]) \(([0-9.+\-eE]+),([0-9.+\-eE]+)\) \[([0-9.+\-eE]+)\|([0-9.+\-eE]+)\] \"(.*)\" (.*)")
+  val_regexp = re.compile(r"VAL\_ (\w+) (\w+) (\s*[-+]?[0-9]+\s+\".+?\"[^;]*)")
 
-    # A dictionary which maps message ids to tuples ((name, size), signals).
-    #   name is the ASCII name of the message.
-    #   size is the size of the message in bytes.
-    #   signals is a list signals contained in the message.
-    # signals is a list of DBCSignal in order of increasing start_bit.
-    self.msgs = {}
+  msgs = {}
+  def_vals = defaultdict(list)
 
-    # A dictionary which maps message ids to a list of tuples (signal name, definition value pairs)
-    self.def_vals = defaultdict(list)
+  for l in txt:
+    l = l.strip()
 
-    # lookup to bit reverse each byte
-    self.bits_index = [(i & ~0b111) + ((-i - 1) & 0b111) for i in range(64)]
+    if l.startswith("BO_ "):
+      # new group
+      dat = bo_regexp.match(l)
+
+      if dat is None:
+        print("bad BO {0}".format(l))
 
-    for l in self.txt:
-      l = l.strip()
+      name = dat.group(2)
+      size = int(dat.group(3))
+      ids = int(dat.group(1), 0)  # could be hex
+      if ids in msgs:
+        sys.exit("Duplicate address detected %d %s" % (ids, dbc_name))
 
-      if l.startswith("BO_ "):
-        # new group
-        dat = bo_regexp.match(l)
+      msgs[ids] = ((name, size), [])
 
-        if dat is None:
-          print("bad BO {0}".format(l))
+    if l.startswith("SG_ "):
+      # new signal
+      dat = sg_regexp.match(l)
+      go = 0
+      if dat is None:
+        dat = sgm_regexp.match(l)
+        go = 1
 
-        name = dat.group(2)
-        size = int(dat.group(3))
-        ids = int(dat.group(1), 0)  # could be hex
-        if ids in self.msgs:
-          sys.exit("Duplicate address detected %d %s" % (ids, self.name))
+      if dat is None:
+        print("bad SG {0}".format(l))
 
-        self.msgs[ids] = ((name, size), [])
+      sgname = dat.group(1)
+      start_bit = int(dat.group(go + 2))
+      signal_size = int(dat.group(go + 3))
+      is_little_endian = int(dat.group(go + 4)) == 1
+      is_signed = dat.group(go + 5) == '-'
+      factor = int_or_float(dat.group(go + 6))
+      offset = int_or_float(dat.group(go + 7))
+      tmin = int_or_float(dat.group(go + 8))
+      tmax = int_or_float(dat.group(go + 9))
+      units = dat.group(go + 10)
 
-      if l.startswith("SG_ "):
-        # new signal
-        dat = sg_regexp.match(l)
-        go = 0
-        if dat is None:
-          dat = sgm_regexp.match(l)
-          go = 1
+      msgs[ids][1].append(
+        DBCSignal(sgname, start_bit, signal_size, is_little_endian,
+                  is_signed, factor, offset, tmin, tmax, units))
 
-        if dat is None:
-          print("bad SG {0}".format(l))
+    if l.startswith("VAL_ "):
+      # new signal value/definition
+      dat = val_regexp.match(l)
 
-        sgname = dat.group(1)
-        start_bit = int(dat.group(go + 2))
-        signal_size = int(dat.group(go + 3))
-        is_little_endian = int(dat.group(go + 4)) == 1
-        is_signed = dat.group(go + 5) == '-'
-        factor = int_or_float(dat.group(go + 6))
-        offset = int_or_float(dat.group(go + 7))
-        tmin = int_or_float(dat.group(go + 8))
-        tmax = int_or_float(dat.group(go + 9))
-        units = dat.group(go + 10)
+      if dat is None:
+        print("bad VAL {0}".format(l))
 
-        self.msgs[ids][1].append(
-          DBCSignal(sgname, start_bit, signal_size, is_little_endian,
-                    is_signed, factor, offset, tmin, tmax, units))
+      ids = int(dat.group(1), 0)  # could be hex
+      sgname = dat.group(2)
+      defvals = dat.group(3)
 
-      if l.startswith("VAL_ "):
-        # new signal value/definition
-        dat = val_regexp.match(l)
+      defvals = defvals.replace("?", r"\?")  # escape sequence in C++
+      defvals = defvals.split('"')[:-1]
 
-        if dat is None:
-          print("bad VAL {0}".format(l))
+      # convert strings to UPPER_CASE_WITH_UNDERSCORES
+      defvals[1::2] = [d.strip().upper().replace(" ", "_") for d in defvals[1::2]]
+      defvals = '"' + "".join(str(i) for i in defvals) + '"'
 
-        ids = int(dat.group(1), 0)  # could be hex
-        sgname = dat.group(2)
-        defvals = dat.group(3)
+      def_vals[ids].append((sgname, defvals))
 
-        defvals = defvals.replace("?", r"\?")  # escape sequence in C++
-        defvals = defvals.split('"')[:-1]
+  for msg in msgs.values():
+    msg[1].sort(key=lambda x: x.start_bit)
 
-        # convert strings to UPPER_CASE_WITH_UNDERSCORES
-        defvals[1::2] = [d.strip().upper().replace(" ", "_") for d in defvals[1::2]]
-        defvals = '"' + "".join(str(i) for i in defvals) + '"'
+  return msgs, def_vals
 
-        self.def_vals[ids].append((sgname, defvals))
 
-    for msg in self.msgs.values():
-      msg[1].sort(key=lambda x: x.start_bit)
+def load_dbc_cached(fn, content, cache_dir=None):
+  """Return (msgs, def_vals) for a .dbc file, using a pickle keyed by the file hash when possible."""
+  if cache_dir is None:
+    cache_dir = DBC_CACHE_DIR
+  name, _ = os.path.splitext(os.path.basename(fn))
+  key = hashlib.sha1(content).hexdigest()
+  cache_fn = "%s_%s_v%d.pkl" % (name, key, DBC_CACHE_VERSION)
+  return load_cached(cache_dir, cache_fn, lambda: parse_dbc_lines(content.decode("ascii").splitlines(), name))
+
+
+class dbc():
+  def __init__(self, fn, use_cache=True):
+    self.name, _ = os.path.splitext(os.path.basename(fn))
+    with open(fn, "rb") as f:
+      content = f.read()
+    self.txt = content.decode("ascii").splitlines(True)
+    self._warned_addresses = set()
+
+    # msgs is a dictionary which maps message ids to tuples ((name, size), signals).
+    #   name is the ASCII name of the message.
+    #   size is the size of the message in bytes.
+    #   signals is a list signals contained in the message.
+    # signals is a list of DBCSignal in order of increasing start_bit.
+    # def_vals is a dictionary which maps message ids to a list of tuples (signal name, definition value pairs)
+    if use_cache:
+      self.msgs, self.def_vals = load_dbc_cached(fn, content)
+    else:
+      self.msgs, self.def_vals = parse_dbc_lines(self.txt, self.name)
+
+    # lookup to bit reverse each byte
+    self.bits_index = [(i & ~0b111) + ((-i - 1) & 0b111) for i in range(64)]
 
     self.msg_name_to_address = {}
     for address, m in self.msgs.items():
       name = m[0][0]
       self.msg_name_to_address[name] = address
 
+    # shift/mask tables so decode doesn't redo the bit math per signal per frame
+    self.decode_tables = {address: self._build_decode_table(m[1]) for address, m in self.msgs.items()}
+
+  @staticmethod
+  def _build_decode_table(signals):
+    table = []
+    for s in signals:
+      if s.is_little_endian:
+        shift = s.start_bit
+      else:
+        b1 = (s.start_bit // 8) * 8 + (-s.start_bit - 1) % 8
+        shift = 64 - (b1 + s.size)
+
+      # signals that don't fit in 64 bits are never decoded
+      if shift < 0:
+        continue
+
+      sign_bit = (1 << (s.size - 1)) if s.is_signed else 0
+      table.append(DecodeEntry(s.name, s.is_little_endian, shift, (1 << s.size) - 1, sign_bit, s.factor, s.offset))
+    return table
+
   def lookup_msg_id(self, msg_id):
     if not isinstance(msg_id, numbers.Number):
       msg_id = self.msg_name_to_address[msg_id]
@@ -195,6 +249,7 @@ class dbc():
       out = {}
     else:
       out = [None] * len(arr)
+      arr_idx = {n: i for i, n in enumerate(arr)}
 
     msg = self.msgs.get(x[0])
     if msg is None:
@@ -208,49 +263,61 @@ class dbc():
       print(name)
 
     st = x[2].ljust(8, b'\x00')
-    le, be = None, None
+    le = int.from_bytes(st[:8], 'little')
+    be = int.from_bytes(st[:8], 'big')
 
-    for s in msg[1]:
-      if arr is not None and s[0] not in arr:
+    for sig_name, little_endian, shift, mask, sign_bit, factor, offset in self.decode_tables[x[0]]:
+      if arr is not None and sig_name not in arr_idx:
         continue
 
-      start_bit = s[1]
-      signal_size = s[2]
-      little_endian = s[3]
-      signed = s[4]
-      factor = s[5]
-      offset = s[6]
-
-      if little_endian:
-        if le is None:
-          le = struct.unpack("<Q", st)[0]
-        tmp = le
-        shift_amount = start_bit
-      else:
-        if be is None:
-          be = struct.unpack(">Q", st)[0]
-        tmp = be
-        b1 = (start_bit // 8) * 8 + (-start_bit - 1) % 8
-        shift_amount = 64 - (b1 + signal_size)
-
-      if shift_amount < 0:
-        continue
-
-      tmp = (tmp >> shift_amount) & ((1 << signal_size) - 1)
-      if signed and (tmp >> (signal_size - 1)):
-        tmp -= (1 << signal_size)
+      tmp = ((le if little_endian else be) >> shift) & mask
+      if tmp & sign_bit:
+        tmp -= (mask + 1)
 
       tmp = tmp * factor + offset
 
-      # if debug:
-      #   print("%40s  %2d %2d  %7.2f %s" % (s[0], s[1], s[2], tmp, s[-1]))
-
       if arr is None:
-        out[s[0]] = tmp
+        out[sig_name] = tmp
       else:
-        out[arr.index(s[0])] = tmp
+        out[arr_idx[sig_name]] = tmp
     return name, out
 
+  def decode_array(self, msg_id, dats, signals=None):
+    """Decode many frames of a single CAN message at once.
+
+       Inputs:
+        msg_id: The message ID or name.
+        dats: A sequence of CAN data bytes, or an (N, 8) uint8 array.
+        signals: Optional list of signal names to decode, defaults to all.
+
+       Returns:
+        A dict mapping signal name to a float64 array of length N.
+    """
+    msg_id = self.lookup_msg_id(msg_id)
+
+    if isinstance(dats, np.ndarray):
+      buf = np.ascontiguousarray(dats, dtype=np.uint8)
+    else:
+      buf = np.frombuffer(b"".join(d[:8].ljust(8, b'\x00') for d in dats), dtype=np.uint8)
+    buf = buf.reshape(-1, 8)
+
+    le = buf.view('<u8').ravel()
+    be = buf.view('>u8').ravel().astype(np.uint64)
+
+    out = {}
+    for s in self.decode_tables[msg_id]:
+      if signals is not None and s.name not in signals:
+        continue
+
+      tmp = ((le if s.is_little_endian else be) >> np.uint64(s.shift)) & np.uint64(s.mask)
+      if s.sign_bit:
+        # sign extend in wrapping uint64 arithmetic, then reinterpret
+        sign_bit = np.uint64(s.sign_bit)
+        tmp = ((tmp ^ sign_bit) - sign_bit).view(np.int64)
+
+      out[s.name] = tmp * float(s.factor) + float(s.offset)
+    return out
+
   def get_signals(self, msg):
     msg = self.lookup_msg_id(msg)
     return [sgs.name for sgs in self.msgs[msg][1]]
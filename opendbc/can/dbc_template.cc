@@ -33,6 +33,8 @@ const Signal sigs_{{address}}[] = {
       .type = SignalType::SUBARU_CHECKSUM,
       {% elif checksum_type == "chrysler" and sig.name == "CHECKSUM" %}
       .type = SignalType::CHRYSLER_CHECKSUM,
+      {% elif (address, sig.name) in sig_types %}
+      .type = SignalType::{{sig_types[(address, sig.name)]}},
       {% elif address in [512, 513] and sig.name == "CHECKSUM_PEDAL" %}
       .type = SignalType::PEDAL_CHECKSUM,
       {% elif address in [512, 513] and sig.name == "COUNTER_PEDAL" %}
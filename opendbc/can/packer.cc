@@ -1,8 +1,10 @@
 #include <cassert>
+#include <cstring>
 #include <utility>
 #include <algorithm>
 #include <map>
 #include <cmath>
+#include <ctime>
 
 #include "common.h"
 
@@ -43,12 +45,19 @@ CANPacker::CANPacker(const std::string& dbc_name) {
     for (int j=0; j<msg->num_sigs; j++) {
       const Signal* sig = &msg->sigs[j];
       signal_lookup[std::make_pair(msg->address, std::string(sig->name))] = *sig;
+
+      if (strcmp(sig->name, "COUNTER") == 0 || sig->type == SignalType::HYUNDAI_COUNTER) {
+        counter_lookup[msg->address] = *sig;
+      } else if (strcmp(sig->name, "CHECKSUM") == 0 || sig->type == SignalType::HYUNDAI_LKAS_CHECKSUM ||
+                 sig->type == SignalType::HYUNDAI_NIBBLE_CHECKSUM) {
+        checksum_lookup[msg->address] = *sig;
+      }
     }
   }
   init_crc_lookup_tables();
 }
 
-uint64_t CANPacker::pack(uint32_t address, const std::vector<SignalPackValue> &signals, int counter) {
+uint64_t CANPacker::pack(uint32_t address, const std::vector<SignalPackValue> &signals, int counter, bool checksum) {
   uint64_t ret = 0;
   for (const auto& sigval : signals) {
     std::string name = std::string(sigval.name);
@@ -70,22 +79,24 @@ uint64_t CANPacker::pack(uint32_t address, const std::vector<SignalPackValue> &s
   }
 
   if (counter >= 0){
-    auto sig_it = signal_lookup.find(std::make_pair(address, "COUNTER"));
-    if (sig_it == signal_lookup.end()) {
+    auto sig_it = counter_lookup.find(address);
+    if (sig_it == counter_lookup.end()) {
       WARN("COUNTER not defined\n");
       return ret;
     }
     auto sig = sig_it->second;
 
-    if ((sig.type != SignalType::HONDA_COUNTER) && (sig.type != SignalType::VOLKSWAGEN_COUNTER)) {
+    if ((sig.type != SignalType::HONDA_COUNTER) && (sig.type != SignalType::VOLKSWAGEN_COUNTER) &&
+        (sig.type != SignalType::HYUNDAI_COUNTER)) {
       WARN("COUNTER signal type not valid\n");
     }
 
     ret = set_value(ret, sig, counter);
   }
 
-  auto sig_it_checksum = signal_lookup.find(std::make_pair(address, "CHECKSUM"));
-  if (sig_it_checksum != signal_lookup.end()) {
+  // without checksum the checksum signal is packed as passed in, e.g. forwarding a stock message
+  auto sig_it_checksum = checksum_lookup.find(address);
+  if (checksum && sig_it_checksum != checksum_lookup.end()) {
     auto sig = sig_it_checksum->second;
     if (sig.type == SignalType::HONDA_CHECKSUM) {
       unsigned int chksm = honda_checksum(address, ret, message_lookup[address].size);
@@ -105,6 +116,14 @@ uint64_t CANPacker::pack(uint32_t address, const std::vector<SignalPackValue> &s
     } else if (sig.type == SignalType::CHRYSLER_CHECKSUM) {
       unsigned int chksm = chrysler_checksum(address, ReverseBytes(ret), message_lookup[address].size);
       ret = set_value(ret, sig, chksm);
+    } else if (sig.type == SignalType::HYUNDAI_LKAS_CHECKSUM) {
+      unsigned int chksm = hyundai_lkas_checksum(ret, message_lookup[address].size, hyundai_lkas_checksum_type);
+      ret = set_value(ret, sig, chksm);
+    } else if (sig.type == SignalType::HYUNDAI_NIBBLE_CHECKSUM) {
+      // the checksum nibble is part of the sum, so clear whatever the caller passed in
+      ret = set_value(ret, sig, 0);
+      unsigned int chksm = hyundai_nibble_checksum(ret, message_lookup[address].size);
+      ret = set_value(ret, sig, chksm);
     } else {
       //WARN("CHECKSUM signal type not valid\n");
     }
@@ -112,3 +131,30 @@ uint64_t CANPacker::pack(uint32_t address, const std::vector<SignalPackValue> &s
 
   return ret;
 }
+
+std::string can_frames_to_sendcan(const std::vector<CanPackFrame> &frames, bool valid) {
+  capnp::MallocMessageBuilder msg;
+  cereal::Event::Builder event = msg.initRoot<cereal::Event>();
+
+  struct timespec t;
+  clock_gettime(CLOCK_BOOTTIME, &t);
+  event.setLogMonoTime(t.tv_sec * 1000000000ULL + t.tv_nsec);
+  event.setValid(valid);
+
+  auto canData = event.initSendcan(frames.size());
+  for (int i = 0; i < frames.size(); i++) {
+    const auto &f = frames[i];
+    // packed values have the first byte of the message in the MSB
+    uint64_t dat = ReverseBytes(f.dat);
+
+    auto c = canData[i];
+    c.setAddress(f.address);
+    c.setBusTime(f.bus_time);
+    c.setDat(kj::arrayPtr((uint8_t*)&dat, f.size));
+    c.setSrc(f.src);
+  }
+
+  auto words = capnp::messageToFlatArray(msg);
+  auto bytes = words.asBytes();
+  return std::string((const char *)bytes.begin(), bytes.size());
+}
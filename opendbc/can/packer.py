@@ -1,3 +1,4 @@
 # pylint: skip-file
-from opendbc.can.packer_pyx import CANPacker
+from opendbc.can.packer_pyx import CANPacker, frames_to_sendcan
 assert CANPacker
+assert frames_to_sendcan
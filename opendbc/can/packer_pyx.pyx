@@ -6,10 +6,58 @@ from libcpp.vector cimport vector
 from libcpp.map cimport map
 from libcpp.string cimport string
 from libcpp cimport bool
+from libc.string cimport memcpy
 from posix.dlfcn cimport dlopen, dlsym, RTLD_LAZY
 
 from common cimport CANPacker as cpp_CANPacker
-from common cimport dbc_lookup, SignalPackValue, DBC
+from common cimport dbc_lookup, can_frames_to_sendcan, SignalPackValue, CanPackFrame, DBC
+from common cimport HYUNDAI_LKAS_CRC8, HYUNDAI_LKAS_6B, HYUNDAI_LKAS_7B
+
+HYUNDAI_LKAS_CHECKSUMS = {
+  "crc8": HYUNDAI_LKAS_CRC8,
+  "6B": HYUNDAI_LKAS_6B,
+  "7B": HYUNDAI_LKAS_7B,
+}
+
+
+cdef inline uint64_t reverse_bytes(uint64_t x):
+  return (((x & 0xff00000000000000ull) >> 56) |
+         ((x & 0x00ff000000000000ull) >> 40) |
+         ((x & 0x0000ff0000000000ull) >> 24) |
+         ((x & 0x000000ff00000000ull) >> 8) |
+         ((x & 0x00000000ff000000ull) << 8) |
+         ((x & 0x0000000000ff0000ull) << 24) |
+         ((x & 0x000000000000ff00ull) << 40) |
+         ((x & 0x00000000000000ffull) << 56))
+
+
+cdef CanPackFrame packed_frame(addr, bus_time, const unsigned char[:] dat, bus) except *:
+  # the frame holds the value as packed, with the first byte of the message in the MSB
+  cdef CanPackFrame f
+  cdef uint64_t val = 0
+  cdef size_t size = dat.shape[0]
+  if size > 8:
+    raise ValueError("%d bytes for %s, at most 8 fit in a frame" % (size, hex(addr)))
+  if size > 0:
+    memcpy(&val, &dat[0], size)
+  f.address = addr
+  f.size = size
+  f.dat = reverse_bytes(val)
+  f.src = bus
+  f.bus_time = bus_time
+  return f
+
+
+def frames_to_sendcan(frames, valid=True):
+  """Serialize a list of (addr, busTime, dat, bus) frames, as returned by make_can_msg, into a sendcan Event.
+
+  Same as can_list_to_can_capnp(frames, msgtype='sendcan', valid=valid), dat may be bytes or bytearray.
+  """
+  cdef vector[CanPackFrame] v
+  v.reserve(len(frames))
+  for addr, bus_time, dat, bus in frames:
+    v.push_back(packed_frame(addr, bus_time, dat, bus))
+  return can_frames_to_sendcan(v, valid)
 
 
 cdef class CANPacker:
@@ -19,19 +67,20 @@ cdef class CANPacker:
     map[string, (int, int)] name_to_address_and_size
     map[int, int] address_to_size
 
-  def __init__(self, dbc_name):
+  def __init__(self, dbc_name, hyundai_lkas_checksum="7B"):
     self.dbc = dbc_lookup(dbc_name)
     if not self.dbc:
       raise RuntimeError("Can't lookup" + dbc_name)
       
     self.packer = new cpp_CANPacker(dbc_name)
+    self.packer.hyundai_lkas_checksum_type = HYUNDAI_LKAS_CHECKSUMS[hyundai_lkas_checksum]
     num_msgs = self.dbc[0].num_msgs
     for i in range(num_msgs):
       msg = self.dbc[0].msgs[i]
       self.name_to_address_and_size[string(msg.name)] = (msg.address, msg.size)
       self.address_to_size[msg.address] = msg.size
 
-  cdef uint64_t pack(self, addr, values, counter):
+  cdef uint64_t pack(self, addr, values, counter, bool checksum=True):
     cdef vector[SignalPackValue] values_thing
     cdef SignalPackValue spv
 
@@ -45,25 +94,16 @@ cdef class CANPacker:
       spv.value = value
       values_thing.push_back(spv)
 
-    return self.packer.pack(addr, values_thing, counter)
-
-  cdef inline uint64_t ReverseBytes(self, uint64_t x):
-    return (((x & 0xff00000000000000ull) >> 56) |
-           ((x & 0x00ff000000000000ull) >> 40) |
-           ((x & 0x0000ff0000000000ull) >> 24) |
-           ((x & 0x000000ff00000000ull) >> 8) |
-           ((x & 0x00000000ff000000ull) << 8) |
-           ((x & 0x0000000000ff0000ull) << 24) |
-           ((x & 0x000000000000ff00ull) << 40) |
-           ((x & 0x00000000000000ffull) << 56))
+    return self.packer.pack(addr, values_thing, counter, checksum)
 
-  cpdef make_can_msg(self, name_or_addr, bus, values, counter=-1):
+  cpdef make_can_msg(self, name_or_addr, bus, values, counter=-1, checksum=True):
+    """Pack one message. With checksum=False the checksum signal in values is kept instead of computed."""
     cdef int addr, size
     if type(name_or_addr) == int:
       addr = name_or_addr
       size = self.address_to_size[name_or_addr]
     else:
       addr, size = self.name_to_address_and_size[name_or_addr.encode('utf8')]
-    cdef uint64_t val = self.pack(addr, values, counter)
-    val = self.ReverseBytes(val)
+    cdef uint64_t val = self.pack(addr, values, counter, checksum)
+    val = reverse_bytes(val)
     return [addr, 0, (<char *>&val)[:size], bus]
@@ -14,29 +14,36 @@
 #define INFO printf
 
 
+static inline int64_t get_raw_value(const Signal &sig, uint64_t dat_le, uint64_t dat_be) {
+  int64_t tmp;
+
+  if (sig.is_little_endian){
+    tmp = (dat_le >> sig.b1) & ((1ULL << sig.b2)-1);
+  } else {
+    tmp = (dat_be >> sig.bo) & ((1ULL << sig.b2)-1);
+  }
+
+  if (sig.is_signed) {
+    tmp -= (tmp >> (sig.b2-1)) ? (1ULL << sig.b2) : 0; //signed
+  }
+  return tmp;
+}
+
 bool MessageState::parse(uint64_t sec, uint16_t ts_, uint8_t * dat) {
   uint64_t dat_le = read_u64_le(dat);
   uint64_t dat_be = read_u64_be(dat);
+  frames++;
 
   for (int i=0; i < parse_sigs.size(); i++) {
     auto& sig = parse_sigs[i];
-    int64_t tmp;
-
-    if (sig.is_little_endian){
-      tmp = (dat_le >> sig.b1) & ((1ULL << sig.b2)-1);
-    } else {
-      tmp = (dat_be >> sig.bo) & ((1ULL << sig.b2)-1);
-    }
-
-    if (sig.is_signed) {
-      tmp -= (tmp >> (sig.b2-1)) ? (1ULL << sig.b2) : 0; //signed
-    }
+    int64_t tmp = get_raw_value(sig, dat_le, dat_be);
 
     DEBUG("parse 0x%X %s -> %lld\n", address, sig.name, tmp);
 
     if (sig.type == SignalType::HONDA_CHECKSUM) {
       if (honda_checksum(address, dat_be, size) != tmp) {
         INFO("0x%X CHECKSUM FAIL\n", address);
+        checksum_errors++;
         return false;
       }
     } else if (sig.type == SignalType::HONDA_COUNTER) {
@@ -46,11 +53,13 @@ bool MessageState::parse(uint64_t sec, uint16_t ts_, uint8_t * dat) {
     } else if (sig.type == SignalType::TOYOTA_CHECKSUM) {
       if (toyota_checksum(address, dat_be, size) != tmp) {
         INFO("0x%X CHECKSUM FAIL\n", address);
+        checksum_errors++;
         return false;
       }
     } else if (sig.type == SignalType::VOLKSWAGEN_CHECKSUM) {
       if (volkswagen_crc(address, dat_le, size) != tmp) {
         INFO("0x%X CRC FAIL\n", address);
+        checksum_errors++;
         return false;
       }
     } else if (sig.type == SignalType::VOLKSWAGEN_COUNTER) {
@@ -60,16 +69,19 @@ bool MessageState::parse(uint64_t sec, uint16_t ts_, uint8_t * dat) {
     } else if (sig.type == SignalType::SUBARU_CHECKSUM) {
       if (subaru_checksum(address, dat_be, size) != tmp) {
         INFO("0x%X CHECKSUM FAIL\n", address);
+        checksum_errors++;
         return false;
       }
     } else if (sig.type == SignalType::CHRYSLER_CHECKSUM) {
       if (chrysler_checksum(address, dat_le, size) != tmp) {
         INFO("0x%X CHECKSUM FAIL\n", address);
+        checksum_errors++;
         return false;
       }
     } else if (sig.type == SignalType::PEDAL_CHECKSUM) {
       if (pedal_checksum(dat_be, size) != tmp) {
         INFO("0x%X PEDAL CHECKSUM FAIL\n", address);
+        checksum_errors++;
         return false;
       }
     } else if (sig.type == SignalType::PEDAL_COUNTER) {
@@ -91,6 +103,7 @@ bool MessageState::update_counter_generic(int64_t v, int cnt_size) {
   uint8_t old_counter = counter;
   counter = v;
   if (((old_counter+1) & ((1 << cnt_size) -1)) != v) {
+    counter_errors++;
     counter_fail += 1;
     if (counter_fail > 1) {
       INFO("0x%X COUNTER FAIL %d -- %d vs %d\n", address, counter_fail, old_counter, (int)v);
@@ -123,6 +136,8 @@ CANParser::CANParser(int abus, const std::string& dbc_name,
     // msg is not valid if a message isn't received for 10 consecutive steps
     if (op.check_frequency > 0) {
       state.check_threshold = (1000000000ULL / op.check_frequency) * 10;
+      // invalid until first received
+      state.timed_out = true;
     }
 
 
@@ -167,6 +182,11 @@ CANParser::CANParser(int abus, const std::string& dbc_name,
 
     message_states[state.address] = state;
   }
+
+  // options for the same address share one state, count them once
+  for (const auto& kv : message_states) {
+    if (kv.second.timed_out) num_timed_out++;
+  }
 }
 
 void CANParser::UpdateCans(uint64_t sec, const capnp::List<cereal::CanData>::Reader& cans) {
@@ -191,21 +211,33 @@ void CANParser::UpdateCans(uint64_t sec, const capnp::List<cereal::CanData>::Rea
       uint8_t dat[8] = {0};
       memcpy(dat, cmsg.getDat().begin(), cmsg.getDat().size());
 
-      state_it->second.parse(sec, cmsg.getBusTime(), dat);
+      auto &state = state_it->second;
+      if (state.parse(sec, cmsg.getBusTime(), dat) && state.timed_out) {
+        state.timed_out = false;
+        num_timed_out--;
+        deadlines.push({state.seen + state.check_threshold, state.address});
+      }
     }
 }
 
 void CANParser::UpdateValid(uint64_t sec) {
-  can_valid = true;
-  for (const auto& kv : message_states) {
-    const auto& state = kv.second;
-    if (state.check_threshold > 0 && (sec - state.seen) > state.check_threshold) {
-      if (state.seen > 0) {
-        DEBUG("0x%X TIMEOUT\n", state.address);
-      }
-      can_valid = false;
+  while (!deadlines.empty() && deadlines.top().first < sec) {
+    const uint32_t address = deadlines.top().second;
+    deadlines.pop();
+
+    auto &state = message_states[address];
+    const uint64_t deadline = state.seen + state.check_threshold;
+    if (deadline < sec) {
+      DEBUG("0x%X TIMEOUT\n", address);
+      state.timed_out = true;
+      state.timeouts++;
+      num_timed_out++;
+    } else {
+      // received since this deadline was set
+      deadlines.push({deadline, address});
     }
   }
+  can_valid = num_timed_out == 0;
 }
 
 void CANParser::update_string(std::string data, bool sendcan) {
@@ -246,3 +278,45 @@ std::vector<SignalValue> CANParser::query_latest() {
 
   return ret;
 }
+
+std::vector<MessageStats> CANParser::query_stats() {
+  std::vector<MessageStats> ret;
+
+  for (const auto& kv : message_states) {
+    const auto& state = kv.second;
+    ret.push_back((MessageStats){
+      .address = state.address,
+      .seen = state.seen,
+      .frames = state.frames,
+      .checksum_errors = state.checksum_errors,
+      .counter_errors = state.counter_errors,
+      .timeouts = state.timeouts,
+      .timed_out = state.timed_out,
+    });
+  }
+
+  return ret;
+}
+
+
+void decode_can_columns(std::vector<SignalColumn> &columns, size_t n,
+                        const uint32_t *addresses, const uint8_t *buses, const uint8_t *dats) {
+  // (bus << 32 | address) -> columns to fill from that message, frames on other buses are skipped
+  std::unordered_map<uint64_t, std::vector<SignalColumn*>> lookup;
+  for (auto &col : columns) {
+    lookup[((uint64_t)col.bus << 32) | col.address].push_back(&col);
+  }
+
+  for (size_t i = 0; i < n; i++) {
+    auto it = lookup.find(((uint64_t)buses[i] << 32) | addresses[i]);
+    if (it == lookup.end()) continue;
+
+    uint64_t dat_le = read_u64_le(&dats[i*8]);
+    uint64_t dat_be = read_u64_be(&dats[i*8]);
+    for (auto col : it->second) {
+      int64_t tmp = get_raw_value(col->sig, dat_le, dat_be);
+      col->idx.push_back(i);
+      col->vals.push_back(tmp * col->sig.factor + col->sig.offset);
+    }
+  }
+}
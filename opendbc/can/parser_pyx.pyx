@@ -4,19 +4,34 @@
 from libcpp.string cimport string
 from libcpp.vector cimport vector
 from libcpp.unordered_set cimport unordered_set
-from libc.stdint cimport uint32_t, uint64_t, uint16_t
+from libc.stdint cimport uint8_t, uint32_t, uint64_t, uint16_t, uintptr_t
+from libc.string cimport memcpy
 from libcpp.map cimport map
+from libcpp.utility cimport pair
 from libcpp cimport bool
+from cython.operator cimport dereference as deref
 
 from common cimport CANParser as cpp_CANParser
-from common cimport SignalParseOptions, MessageParseOptions, dbc_lookup, SignalValue, DBC
+from common cimport SignalParseOptions, MessageParseOptions, dbc_lookup, SignalValue, DBC, Msg, MessageStats
+from common cimport SignalColumn, decode_can_columns as cpp_decode_can_columns
 
 import os
 import numbers
 from collections import defaultdict
 
+import numpy as np
+
 cdef int CAN_INVALID_CNT = 5
 
+_accessor_types = {}
+
+def message_accessor_type(msg_name, sig_names):
+  """Generate a class with one slot per parsed signal of a message, e.g. CLU11.CF_Clu_VehicleSpeed."""
+  key = (msg_name, tuple(sig_names))
+  if key not in _accessor_types:
+    _accessor_types[key] = type(msg_name, (), {'__slots__': key[1]})
+  return _accessor_types[key]
+
 cdef class CANParser:
   cdef:
     cpp_CANParser *can
@@ -25,6 +40,10 @@ cdef class CANParser:
     map[uint32_t, string] address_to_msg_name
     vector[SignalValue] can_values
     bool test_mode_enabled
+    # (address, DBC signal name pointer) -> index into sig_targets
+    map[pair[uint32_t, uintptr_t], size_t] sig_index
+    list sig_targets
+    dict __dict__
 
   cdef readonly:
     string dbc_name
@@ -54,10 +73,9 @@ cdef class CANParser:
 
       self.msg_name_to_address[name] = msg.address
       self.address_to_msg_name[msg.address] = name
-      self.vl[msg.address] = {}
-      self.vl[name] = {}
-      self.ts[msg.address] = {}
-      self.ts[name] = {}
+      # by address and by name are the same dict
+      self.vl[msg.address] = self.vl[name] = {}
+      self.ts[msg.address] = self.ts[name] = {}
 
     # Convert message names into addresses
     for i in range(len(signals)):
@@ -93,11 +111,42 @@ cdef class CANParser:
       message_options_v.push_back(mpo)
 
     self.can = new cpp_CANParser(bus, dbc_name, message_options_v, signal_options_v)
+    self.init_accessors()
     self.update_vl()
 
-  cdef unordered_set[uint32_t] update_vl(self):
-    cdef string sig_name
+  cdef init_accessors(self):
+    # Before the first update every parsed signal is returned, use that to generate
+    # one accessor per message and to resolve where each value is written to
+    cdef pair[uint32_t, uintptr_t] key
+    msg_sigs = defaultdict(list)
+    self.sig_targets = []
+
+    for cv in self.can.query_latest():
+      key.first = cv.address
+      key.second = <uintptr_t>cv.name
+      if self.sig_index.count(key):
+        continue
+      self.sig_index[key] = len(self.sig_targets)
+
+      name = <unicode>self.address_to_msg_name[cv.address].c_str()
+      cv_name = <unicode>cv.name
+      msg_sigs[name].append(cv_name)
+      self.sig_targets.append([name, cv_name, self.vl[name], self.ts[name]])
+
+    accessors = {}
+    for name, sig_names in msg_sigs.items():
+      accessors[name] = message_accessor_type(name, sig_names)()
+      # messages named like one of the parser's own attributes are only reachable through vl
+      if not hasattr(CANParser, name):
+        self.__dict__[name] = accessors[name]
+
+    for target in self.sig_targets:
+      target[0] = accessors[target[0]]
+
+  cdef unordered_set[uint32_t] update_vl(self) except *:
     cdef unordered_set[uint32_t] updated_val
+    cdef pair[uint32_t, uintptr_t] key
+    cdef map[pair[uint32_t, uintptr_t], size_t].iterator it
 
     can_values = self.can.query_latest()
     valid = self.can.can_valid
@@ -110,15 +159,16 @@ cdef class CANParser:
 
 
     for cv in can_values:
-      # Cast char * directly to unicode
-      name = <unicode>self.address_to_msg_name[cv.address].c_str()
-      cv_name = <unicode>cv.name
+      key.first = cv.address
+      key.second = <uintptr_t>cv.name
+      it = self.sig_index.find(key)
+      if it == self.sig_index.end():
+        raise RuntimeError("%s in %s wasn't returned before the first update" % (<unicode>cv.name, hex(cv.address)))
+      accessor, cv_name, vl, ts = self.sig_targets[deref(it).second]
 
-      self.vl[cv.address][cv_name] = cv.value
-      self.ts[cv.address][cv_name] = cv.ts
-
-      self.vl[name][cv_name] = cv.value
-      self.ts[name][cv_name] = cv.ts
+      setattr(accessor, cv_name, cv.value)
+      vl[cv_name] = cv.value
+      ts[cv_name] = cv.ts
 
       updated_val.insert(cv.address)
 
@@ -137,6 +187,100 @@ cdef class CANParser:
 
     return updated_vals
 
+  def message_stats(self):
+    """Per message health since the parser was created, keyed by message name.
+
+    frames, checksum_errors, counter_errors: frames received and how many of them failed a check
+    timeouts: number of times the message stopped arriving
+    timed_out: currently timed out, this is what makes can_valid False
+    age: seconds since the last valid frame, None if there never was one
+    """
+    ret = {}
+    for s in self.can.query_stats():
+      name = <unicode>self.address_to_msg_name[s.address].c_str()
+      ret[name] = {
+        'frames': s.frames,
+        'checksum_errors': s.checksum_errors,
+        'counter_errors': s.counter_errors,
+        'timeouts': s.timeouts,
+        'timed_out': s.timed_out,
+        'age': (self.can.last_sec - s.seen) * 1e-9 if s.seen > 0 else None,
+      }
+    return ret
+
+  def invalid_messages(self):
+    """Names of the messages that are currently timed out."""
+    return sorted(<unicode>self.address_to_msg_name[s.address].c_str() for s in self.can.query_stats() if s.timed_out)
+
+def decode_can_columns(dbc_name, signals, addresses, buses, timestamps, dats, bus=0):
+  """Decode logged CAN into one timeseries per signal in a single native pass.
+
+     Inputs:
+      dbc_name: name of the DBC to decode with.
+      signals: list of (message name or address, signal name) decoded from bus, or
+               (message name or address, signal name, bus) for signals on other buses.
+      addresses, buses, timestamps: arrays of length N, one entry per frame.
+      dats: (N, 8) uint8 array of zero padded payloads.
+      bus: bus of the signals that don't name one.
+
+     Returns:
+      A dict mapping each (message, signal) to a (timestamps, values) pair of arrays.
+  """
+  cdef const DBC *dbc = dbc_lookup(dbc_name)
+  if not dbc:
+    raise RuntimeError("Can't lookup" + dbc_name)
+
+  cdef const Msg *msg
+  msgs = {}
+  for i in range(dbc[0].num_msgs):
+    msg = &dbc[0].msgs[i]
+    msgs[msg.address] = i
+    msgs[msg.name.decode('utf8')] = i
+
+  cdef vector[SignalColumn] columns
+  cdef SignalColumn col
+  for s in signals:
+    msg_key, sig_name = s[:2]
+    msg = &dbc[0].msgs[msgs[msg_key]]
+    for j in range(msg.num_sigs):
+      if msg.sigs[j].name.decode('utf8') == sig_name:
+        col.address = msg.address
+        col.bus = s[2] if len(s) > 2 else bus
+        col.sig = msg.sigs[j]
+        columns.push_back(col)
+        break
+    else:
+      raise KeyError("%s not in %s" % (sig_name, msg.name.decode('utf8')))
+
+  cdef const uint32_t[::1] addresses_v = np.ascontiguousarray(addresses, dtype=np.uint32)
+  cdef const uint8_t[::1] buses_v = np.ascontiguousarray(buses, dtype=np.uint8)
+  cdef const uint8_t[::1] dats_v = np.ascontiguousarray(dats, dtype=np.uint8).reshape(-1)
+  timestamps = np.asarray(timestamps)
+
+  cdef size_t n = addresses_v.shape[0]
+  assert buses_v.shape[0] == n and dats_v.shape[0] == n * 8 and timestamps.shape[0] == n
+
+  if n > 0:
+    cpp_decode_can_columns(columns, n, &addresses_v[0], &buses_v[0], &dats_v[0])
+
+  cdef double[::1] vals_v
+  cdef uint32_t[::1] idx_v
+  cdef size_t k
+  ret = {}
+  for k in range(columns.size()):
+    m = columns[k].idx.size()
+    vals = np.empty(m, dtype=np.float64)
+    idx = np.empty(m, dtype=np.uint32)
+    if m > 0:
+      vals_v = vals
+      idx_v = idx
+      memcpy(&vals_v[0], columns[k].vals.data(), m * sizeof(double))
+      memcpy(&idx_v[0], columns[k].idx.data(), m * sizeof(uint32_t))
+    ret[tuple(signals[k])] = (timestamps[idx], vals)
+
+  return ret
+
+
 cdef class CANDefine():
   cdef:
     const DBC *dbc
@@ -0,0 +1,54 @@
+import os
+import stat
+import pickle
+import tempfile
+
+
+def default_cache_dir(name):
+  # per user, another user can't have created it with their files in it
+  return os.path.join(tempfile.gettempdir(), "%s_%d" % (name, os.getuid()))
+
+
+def private_dir(path):
+  """Creates path readable only by this user, returns None if it exists and someone else could write to it."""
+  try:
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+  except OSError:
+    return None
+
+  if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o022:
+    return None
+  return path
+
+
+def load_cached(cache_dir, fn, build):
+  """Returns the object pickled in cache_dir/fn, or build() which is then pickled there.
+
+  Pickles can execute code, so they're only read from a directory private to this user.
+  """
+  cache_dir = private_dir(cache_dir)
+  if cache_dir is None:
+    return build()
+  cache_fn = os.path.join(cache_dir, fn)
+
+  try:
+    fd = os.open(cache_fn, os.O_RDONLY | os.O_NOFOLLOW)
+    with os.fdopen(fd, "rb") as f:
+      st = os.fstat(f.fileno())
+      if stat.S_ISREG(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o022:
+        return pickle.load(f)
+  except Exception:  # pylint: disable=broad-except
+    pass
+
+  ret = build()
+
+  # the cache is only an optimization, a read-only filesystem is fine
+  try:
+    with tempfile.NamedTemporaryFile(dir=cache_dir, delete=False) as f:
+      pickle.dump(ret, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f.name, cache_fn)
+  except OSError:
+    pass
+
+  return ret
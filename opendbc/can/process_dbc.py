@@ -8,6 +8,17 @@ import jinja2
 from collections import Counter
 from opendbc.can.dbc import dbc
 
+# Hyundai/Kia DBCs don't use COUNTER/CHECKSUM names, so the auto-computed
+# signals are listed per message: (message, signal) -> signal type
+HYUNDAI_SIGNAL_TYPES = {
+  ("LKAS11", "CF_Lkas_Chksum"): "HYUNDAI_LKAS_CHECKSUM",
+  ("LKAS11", "CF_Lkas_MsgCount"): "HYUNDAI_COUNTER",
+  ("SCC12", "CR_VSM_ChkSum"): "HYUNDAI_NIBBLE_CHECKSUM",
+  ("SCC12", "CR_VSM_Alive"): "HYUNDAI_COUNTER",
+  ("FCA11", "CR_FCA_ChkSum"): "HYUNDAI_NIBBLE_CHECKSUM",
+  ("FCA11", "CR_FCA_Alive"): "HYUNDAI_COUNTER",
+}
+
 def process(in_fn, out_fn):
   dbc_name = os.path.split(out_fn)[-1].replace('.cc', '')
   # print("processing %s: %s -> %s" % (dbc_name, in_fn, out_fn))
@@ -61,6 +72,13 @@ def process(in_fn, out_fn):
     checksum_start_bit = 7
     counter_start_bit = None
     little_endian = False
+  elif can_dbc.name.startswith(("hyundai_kia_")):
+    checksum_type = "hyundai"
+    checksum_size = None
+    counter_size = None
+    checksum_start_bit = None
+    counter_start_bit = None
+    little_endian = True
   else:
     checksum_type = None
     checksum_size = None
@@ -69,12 +87,25 @@ def process(in_fn, out_fn):
     counter_start_bit = None
     little_endian = None
 
+  sig_types = {}
+  if checksum_type == "hyundai":
+    for address, msg_name, _, sigs in msgs:
+      for sig in sigs:
+        if (msg_name, sig.name) in HYUNDAI_SIGNAL_TYPES:
+          sig_types[(address, sig.name)] = HYUNDAI_SIGNAL_TYPES[(msg_name, sig.name)]
+
   # sanity checks on expected COUNTER and CHECKSUM rules, as packer and parser auto-compute those signals
   for address, msg_name, _, sigs in msgs:
     dbc_msg_name = dbc_name + " " + msg_name
     for sig in sigs:
       if checksum_type is not None:
         # checksum rules
+        if sig_types.get((address, sig.name)) == "HYUNDAI_LKAS_CHECKSUM":
+          if sig.size != 8 or sig.start_bit != 48:
+            sys.exit("%s: LKAS CHECKSUM is not byte 6" % dbc_msg_name)
+        if sig_types.get((address, sig.name)) == "HYUNDAI_NIBBLE_CHECKSUM":
+          if sig.size != 4:
+            sys.exit("%s: CHECKSUM is not 4 bits long" % dbc_msg_name)
         if sig.name == "CHECKSUM":
           if sig.size != checksum_size:
             sys.exit("%s: CHECKSUM is not %d bits long" % (dbc_msg_name, checksum_size))
@@ -104,7 +135,7 @@ def process(in_fn, out_fn):
     if count > 1:
       sys.exit("%s: Duplicate message name in DBC file %s" % (dbc_name, name))
 
-  parser_code = template.render(dbc=can_dbc, checksum_type=checksum_type, msgs=msgs, def_vals=def_vals, len=len)
+  parser_code = template.render(dbc=can_dbc, checksum_type=checksum_type, msgs=msgs, def_vals=def_vals, sig_types=sig_types, len=len)
 
   with open(out_fn, "w") as out_f:
     out_f.write(parser_code)
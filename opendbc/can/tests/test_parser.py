@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+import random
+import unittest
+
+import numpy as np
+
+from cereal import log
+from opendbc.can.parser import CANParser, decode_can_columns
+from opendbc.can.packer import CANPacker
+
+DBC = "subaru_global_2017_generated"
+CAN_INVALID_CNT = 5
+
+
+def can_string(t, msgs):
+  evt = log.Event.new_message()
+  evt.logMonoTime = t
+  evt.init('can', len(msgs))
+  for i, (address, _, dat, bus) in enumerate(msgs):
+    evt.can[i] = {'address': address, 'busTime': 0, 'dat': dat, 'src': bus}
+  return evt.to_bytes()
+
+
+class TestCanParserTimeouts(unittest.TestCase):
+
+  def setUp(self):
+    self.packer = CANPacker(DBC)
+    self.signals = [
+      ("LEFT_BLINKER", "Dashlights", 0),
+      ("DOOR_OPEN_FL", "BodyInfo", 0),
+    ]
+
+  def test_duplicate_checks(self):
+    # the subaru carstate checks Dashlights twice
+    checks = [("Dashlights", 10), ("BodyInfo", 10), ("Dashlights", 10)]
+    cp = CANParser(DBC, self.signals, checks, 0)
+    self.assertFalse(cp.can_valid)
+
+    msgs = [self.packer.make_can_msg(m, 0, {}) for m in ("Dashlights", "BodyInfo")]
+    for i in range(10):
+      cp.update_string(can_string(int((1 + i * 0.01) * 1e9), msgs))
+    self.assertTrue(cp.can_valid)
+    self.assertEqual(cp.invalid_messages(), [])
+
+  def test_dropout_recovery(self):
+    # against the full scan of every checked message the deadlines replaced
+    freqs = {"Dashlights": 10, "BodyInfo": 50}
+    cp = CANParser(DBC, self.signals, list(freqs.items()) + [("Dashlights", 10)], 0)
+    rng = random.Random(0)
+
+    seen = {m: None for m in freqs}
+    dropped = set()
+    invalid_cnt = CAN_INVALID_CNT
+    for i in range(3000):
+      t = int((1 + i * 0.01) * 1e9)
+      if rng.random() < 0.01:
+        dropped ^= {rng.choice(list(freqs))}
+
+      msgs = [self.packer.make_can_msg(m, 0, {"LEFT_BLINKER": i % 2}) for m in freqs if m not in dropped]
+      cp.update_string(can_string(t, msgs))
+
+      for m in freqs:
+        if m not in dropped:
+          seen[m] = t
+      valid = all(s is not None and t - s <= 1e9 / f * 10 for s, f in zip(seen.values(), freqs.values()))
+      invalid_cnt = 0 if valid else invalid_cnt + 1
+
+      self.assertEqual(cp.can_valid, invalid_cnt < CAN_INVALID_CNT, f"step {i}, dropped {dropped}")
+      self.assertEqual(set(cp.invalid_messages()), {m for m in freqs if seen[m] is None or t - seen[m] > 1e9 / freqs[m] * 10})
+
+  def test_subaru_parsers_become_valid(self):
+    from selfdrive.car.car_helpers import interfaces
+    from selfdrive.car.subaru.values import CAR
+
+    for car_name in CAR.__dict__.values():
+      if not isinstance(car_name, str) or car_name not in interfaces:
+        continue
+      CarInterface, _, CarState = interfaces[car_name]
+      CP = CarInterface.get_params(car_name)
+      for bus, cp in ((0, CarState.get_can_parser(CP)), (2, CarState.get_cam_can_parser(CP))):
+        if cp is None:
+          continue
+        packer = CANPacker(cp.dbc_name.decode())
+        msgs = [packer.make_can_msg(m, bus, {}) for m in cp.message_stats()]
+        for i in range(10):
+          cp.update_string(can_string(int((1 + i * 0.01) * 1e9), msgs))
+        with self.subTest(car=car_name, bus=bus):
+          self.assertTrue(cp.can_valid, cp.invalid_messages())
+
+
+class TestCanParserValues(unittest.TestCase):
+
+  def test_accessors_and_dicts(self):
+    packer = CANPacker(DBC)
+    cp = CANParser(DBC, [("LEFT_BLINKER", "Dashlights", 0), ("RIGHT_BLINKER", "Dashlights", 0)], [], 0)
+    address = packer.make_can_msg("Dashlights", 0, {})[0]
+    self.assertIs(cp.vl["Dashlights"], cp.vl[address])
+    self.assertIs(cp.ts["Dashlights"], cp.ts[address])
+
+    cp.update_string(can_string(int(1e9), [packer.make_can_msg("Dashlights", 0, {"LEFT_BLINKER": 1})]))
+    self.assertEqual(cp.vl["Dashlights"], {"LEFT_BLINKER": 1, "RIGHT_BLINKER": 0})
+    self.assertEqual(cp.ts["Dashlights"], {"LEFT_BLINKER": 0, "RIGHT_BLINKER": 0})  # busTime
+    self.assertEqual(cp.Dashlights.LEFT_BLINKER, 1)
+    self.assertEqual(cp.Dashlights.RIGHT_BLINKER, 0)
+
+
+class TestDecodeCanColumns(unittest.TestCase):
+
+  def test_matches_parser(self):
+    sigs = {
+      "Steering_Torque": {"Steer_Error_1": (0, 1), "Steer_Torque_Sensor": (-1000, 1000), "Steering_Angle": (-600, 600)},
+      "BodyInfo": {"DOOR_OPEN_FL": (0, 1), "DOOR_OPEN_TRUNK": (0, 1), "WIPERS": (0, 1)},
+    }
+    signals = [(m, s) for m in sigs for s in sigs[m]]
+    packer = CANPacker(DBC)
+    # the same messages on bus 0 and 1, with different values
+    parsers = {bus: CANParser(DBC, [(s, m, 0) for m, s in signals], [], bus) for bus in (0, 1)}
+    rng = random.Random(0)
+
+    frames = []
+    counters = {m: 0 for m in sigs}
+    expected = {(m, s, bus): ([], []) for m, s in signals for bus in parsers}
+    for i in range(1000):
+      t = int((1 + i * 0.01) * 1e9)
+      m = rng.choice(list(sigs))
+      counters[m] = (counters[m] + 1) % 16
+      msgs = [packer.make_can_msg(m, bus, {s: rng.uniform(*r) for s, r in sigs[m].items()}, counters[m]) for bus in parsers]
+      frames += [(t, msg) for msg in msgs]
+
+      for bus, cp in parsers.items():
+        cp.update_string(can_string(t, msgs))
+        for s in sigs[m]:
+          expected[(m, s, bus)][0].append(t)
+          expected[(m, s, bus)][1].append(cp.vl[m][s])
+
+    addresses = np.array([msg[0] for _, msg in frames], dtype=np.uint32)
+    buses = np.array([msg[3] for _, msg in frames], dtype=np.uint8)
+    timestamps = np.array([t for t, _ in frames], dtype=np.uint64)
+    dats = np.array([list(msg[2].ljust(8, b'\x00')) for _, msg in frames], dtype=np.uint8)
+
+    # bus 0 from the default, bus 1 named per signal
+    ret = decode_can_columns(DBC, signals + [(m, s, 1) for m, s in signals], addresses, buses, timestamps, dats)
+    for m, s in signals:
+      for bus, key in ((0, (m, s)), (1, (m, s, 1))):
+        with self.subTest(sig=key):
+          self.assertEqual(ret[key][0].tolist(), expected[(m, s, bus)][0])
+          self.assertEqual(ret[key][1].tolist(), expected[(m, s, bus)][1])
+
+
+if __name__ == "__main__":
+  unittest.main()
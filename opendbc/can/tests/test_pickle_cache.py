@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from opendbc.can.pickle_cache import load_cached
+
+
+class Planted():
+  def __reduce__(self):
+    return (os.getpid, ())
+
+
+class TestPickleCache(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp = tempfile.mkdtemp()
+    self.cache_dir = os.path.join(self.tmp, "cache")
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp)
+
+  def test_cached(self):
+    calls = []
+    build = lambda: calls.append(1) or {"a": (1, 2)}
+    self.assertEqual(load_cached(self.cache_dir, "x.pkl", build), {"a": (1, 2)})
+    self.assertEqual(load_cached(self.cache_dir, "x.pkl", build), {"a": (1, 2)})
+    self.assertEqual(len(calls), 1)
+    self.assertEqual(os.stat(self.cache_dir).st_mode & 0o777, 0o700)
+
+  def test_shared_dir_not_read(self):
+    os.mkdir(self.cache_dir)
+    os.chmod(self.cache_dir, 0o777)
+    with open(os.path.join(self.cache_dir, "x.pkl"), "wb") as f:
+      pickle.dump(Planted(), f)
+    self.assertEqual(load_cached(self.cache_dir, "x.pkl", lambda: "built"), "built")
+
+  def test_writable_file_not_read(self):
+    load_cached(self.cache_dir, "x.pkl", lambda: "built")
+    fn = os.path.join(self.cache_dir, "x.pkl")
+    with open(fn, "wb") as f:
+      pickle.dump(Planted(), f)
+    os.chmod(fn, 0o666)
+    self.assertEqual(load_cached(self.cache_dir, "x.pkl", lambda: "built"), "built")
+
+  def test_symlink_not_read(self):
+    planted = os.path.join(self.tmp, "planted.pkl")
+    with open(planted, "wb") as f:
+      pickle.dump(Planted(), f)
+    load_cached(self.cache_dir, "y.pkl", lambda: None)
+    os.symlink(planted, os.path.join(self.cache_dir, "x.pkl"))
+    self.assertEqual(load_cached(self.cache_dir, "x.pkl", lambda: "built"), "built")
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -9,6 +9,7 @@ import time
 import traceback
 import subprocess
 import sys
+import functools
 from .dfu import PandaDFU  # pylint: disable=import-error
 from .flash_release import flash_release  # noqa pylint: disable=import-error
 from .update import ensure_st_up_to_date  # noqa pylint: disable=import-error
@@ -30,20 +31,46 @@ def build_st(target, mkfile="Makefile", clean=True):
   cmd = 'cd %s && %s && make -f %s %s' % (os.path.join(BASEDIR, "board"), clean_cmd, mkfile, target)
   _ = subprocess.check_output(cmd, stderr=subprocess.STDOUT, shell=True)
 
+# one CAN message in a USB bulk transfer: RIR (address), length | bus << 4 | bus time << 16, 8 bytes of data
+CAN_BUFFER_FIELDS = [('rir', '<u4'), ('f2', '<u4'), ('dat', 'u1', (8,))]
+
+# numpy is only imported once CAN is sent or received, the rest of the library works without it
+@functools.lru_cache(maxsize=None)
+def can_buffer_dtype():
+  import numpy as np
+  return np.dtype(CAN_BUFFER_FIELDS)
+
+def parse_can_buffer_array(dat):
+  """Decode a whole USB bulk read at once.
+
+     Returns arrays (address, bus_time, dat, length, bus), dat is (N, 8) and zero padded past length.
+  """
+  import numpy as np
+  a = np.frombuffer(dat, dtype=can_buffer_dtype(), count=len(dat) // 0x10)
+  rir, f2 = a['rir'], a['f2']
+  extended = 4
+  address = np.where(rir & extended, rir >> 3, rir >> 21)
+  return address, f2 >> 16, a['dat'], f2 & 0xF, (f2 >> 4) & 0xFF
+
+def pack_can_buffer_array(address, dat, length, bus):
+  """Encode arrays of messages into the USB bulk write format, dat is (N, 8)."""
+  import numpy as np
+  transmit = 1
+  extended = 4
+  address = np.asarray(address, dtype=np.uint32)
+  a = np.zeros(len(address), dtype=can_buffer_dtype())
+  a['rir'] = np.where(address >= 0x800, (address << 3) | transmit | extended, (address << 21) | transmit)
+  a['f2'] = np.asarray(length, dtype=np.uint32) | (np.asarray(bus, dtype=np.uint32) << 4)
+  a['dat'] = dat
+  return a.tobytes()
+
 def parse_can_buffer(dat):
-  ret = []
-  for j in range(0, len(dat), 0x10):
-    ddat = dat[j:j + 0x10]
-    f1, f2 = struct.unpack("II", ddat[0:8])
-    extended = 4
-    if f1 & extended:
-      address = f1 >> 3
-    else:
-      address = f1 >> 21
-    dddat = ddat[8:8 + (f2 & 0xF)]
-    if DEBUG:
-      print(f"  R 0x{address:x}: 0x{dddat.hex()}")
-    ret.append((address, f2 >> 16, dddat, (f2 >> 4) & 0xFF))
+  address, bus_time, _, length, bus = parse_can_buffer_array(dat)
+  dddat = [dat[j:j + l] for j, l in zip(range(8, len(dat), 0x10), length.tolist())]
+  ret = list(zip(address.tolist(), bus_time.tolist(), dddat, bus.tolist()))
+  if DEBUG:
+    for a, _, d, _ in ret:
+      print(f"  R 0x{a:x}: 0x{d.hex()}")
   return ret
 
 class PandaWifiStreaming(object):
@@ -487,28 +514,25 @@ class Panda(object):
   CAN_SEND_TIMEOUT_MS = 10
 
   def can_send_many(self, arr, timeout=CAN_SEND_TIMEOUT_MS):
-    snds = []
-    transmit = 1
-    extended = 4
+    import numpy as np
     for addr, _, dat, bus in arr:
       assert len(dat) <= 8
       if DEBUG:
         print(f"  W 0x{addr:x}: 0x{dat.hex()}")
-      if addr >= 0x800:
-        rir = (addr << 3) | transmit | extended
-      else:
-        rir = (addr << 21) | transmit
-      snd = struct.pack("II", rir, len(dat) | (bus << 4)) + dat
-      snd = snd.ljust(0x10, b'\x00')
-      snds.append(snd)
+
+    address = [addr for addr, _, _, _ in arr]
+    dat = np.frombuffer(b''.join(bytes(d).ljust(8, b'\x00') for _, _, d, _ in arr), dtype=np.uint8).reshape(-1, 8)
+    length = [len(d) for _, _, d, _ in arr]
+    bus = [b for _, _, _, b in arr]
+    snds = pack_can_buffer_array(address, dat, length, bus)
 
     while True:
       try:
         if self.wifi:
-          for s in snds:
-            self._handle.bulkWrite(3, s)
+          for j in range(0, len(snds), 0x10):
+            self._handle.bulkWrite(3, snds[j:j + 0x10])
         else:
-          self._handle.bulkWrite(3, b''.join(snds), timeout=timeout)
+          self._handle.bulkWrite(3, snds, timeout=timeout)
         break
       except (usb1.USBErrorIO, usb1.USBErrorOverflow):
         print("CAN: BAD SEND MANY, RETRYING")
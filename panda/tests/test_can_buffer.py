@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+import random
+import struct
+import unittest
+
+from panda.python import Panda, parse_can_buffer, parse_can_buffer_array, pack_can_buffer_array
+
+
+def parse_can_buffer_loop(dat):
+  # the struct implementations the arrays replaced
+  ret = []
+  for j in range(0, len(dat), 0x10):
+    ddat = dat[j:j + 0x10]
+    f1, f2 = struct.unpack("II", ddat[0:8])
+    if f1 & 4:
+      address = f1 >> 3
+    else:
+      address = f1 >> 21
+    ret.append((address, f2 >> 16, ddat[8:8 + (f2 & 0xF)], (f2 >> 4) & 0xFF))
+  return ret
+
+
+def pack_can_buffer_loop(arr):
+  snds = []
+  for addr, _, dat, bus in arr:
+    if addr >= 0x800:
+      rir = (addr << 3) | 1 | 4
+    else:
+      rir = (addr << 21) | 1
+    snds.append((struct.pack("II", rir, len(dat) | (bus << 4)) + dat).ljust(0x10, b'\x00'))
+  return snds
+
+
+def random_msgs(rng, n):
+  # standard and extended ids, every length, all three buses
+  msgs = []
+  for _ in range(n):
+    addr = rng.randrange(0x800) if rng.random() < 0.8 else rng.randrange(0x800, 0x20000000)
+    dat = bytes(rng.randrange(256) for _ in range(rng.randrange(9)))
+    msgs.append((addr, None, dat, rng.randrange(3)))
+  return msgs
+
+
+class FakeHandle():
+  def __init__(self):
+    self.writes = []
+
+  def bulkWrite(self, endpoint, data, timeout=0):
+    self.writes.append(bytes(data))
+
+
+class TestCanBuffer(unittest.TestCase):
+
+  def setUp(self):
+    self.rng = random.Random(0)
+
+  def test_parse(self):
+    for n in (0, 1, 17, 256):
+      msgs = random_msgs(self.rng, n)
+      # a received buffer carries the bus time where the send buffer has zeros
+      dat = bytearray(b''.join(pack_can_buffer_loop(msgs)))
+      for j in range(0, len(dat), 0x10):
+        dat[j + 6:j + 8] = struct.pack("H", self.rng.randrange(0x10000))
+      dat = bytes(dat)
+
+      with self.subTest(n=n):
+        self.assertEqual(parse_can_buffer(dat), parse_can_buffer_loop(dat))
+        self.assertEqual([(a, d, b) for a, _, d, b in parse_can_buffer(dat)], [(a, d, b) for a, _, d, b in msgs])
+
+        address, bus_time, dats, length, bus = parse_can_buffer_array(dat)
+        ref = parse_can_buffer_loop(dat)
+        self.assertEqual(address.tolist(), [m[0] for m in ref])
+        self.assertEqual(bus_time.tolist(), [m[1] for m in ref])
+        self.assertEqual([dats[i, :l].tobytes() for i, l in enumerate(length)], [m[2] for m in ref])
+        self.assertEqual(bus.tolist(), [m[3] for m in ref])
+
+  def test_pack(self):
+    msgs = random_msgs(self.rng, 256)
+    address = [m[0] for m in msgs]
+    dats = [list(m[2].ljust(8, b'\x00')) for m in msgs]
+    length = [len(m[2]) for m in msgs]
+    bus = [m[3] for m in msgs]
+    self.assertEqual(pack_can_buffer_array(address, dats, length, bus), b''.join(pack_can_buffer_loop(msgs)))
+
+  def test_can_send_many(self):
+    msgs = random_msgs(self.rng, 64)
+    for wifi in (False, True):
+      p = Panda.__new__(Panda)
+      p.wifi = wifi
+      p._handle = FakeHandle()
+      p.can_send_many(msgs)
+
+      with self.subTest(wifi=wifi):
+        # wifi sends one message per write
+        ref = pack_can_buffer_loop(msgs)
+        self.assertEqual(p._handle.writes, ref if wifi else [b''.join(ref)])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -10,15 +10,16 @@ import select
 import socket
 import threading
 import time
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 from functools import partial
-from typing import Any
+from typing import Any, Dict, Optional
 
 import requests
 from jsonrpc import JSONRPCResponseManager, dispatcher
 from websocket import ABNF, WebSocketTimeoutException, create_connection
 
 import cereal.messaging as messaging
+from cereal import log
 from cereal.services import service_list
 from common.hardware import HARDWARE
 from common.api import Api
@@ -30,14 +31,25 @@ from selfdrive.swaglog import cloudlog
 
 ATHENA_HOST = os.getenv('ATHENA_HOST', 'wss://athena.comma.ai')
 HANDLER_THREADS = int(os.getenv('HANDLER_THREADS', "4"))
+UPLOAD_WORKERS = int(os.getenv('UPLOAD_WORKERS', "4"))
+MAX_UPLOAD_QUEUE = int(os.getenv('MAX_UPLOAD_QUEUE', "100"))  # uploadFileToUrl is refused above this
 LOCAL_PORT_WHITELIST = set([8022])
+SUB_POOL_TTL = float(os.getenv('SUB_POOL_TTL', "60"))  # seconds without a getMessage before a service is unsubscribed
+SUB_POOL_MAX_SOCKETS = int(os.getenv('SUB_POOL_MAX_SOCKETS', "8"))
+LATENCY_BUCKETS_MS = [1, 5, 10, 50, 100, 500, 1000, 5000]
 
 dispatcher["echo"] = lambda s: s
 payload_queue: Any = queue.Queue()
 response_queue: Any = queue.Queue()
-upload_queue: Any = queue.Queue()
+upload_queue: Any = queue.Queue(maxsize=MAX_UPLOAD_QUEUE)
 cancelled_uploads: Any = set()
-UploadItem = namedtuple('UploadItem', ['path', 'url', 'headers', 'created_at', 'id'])
+UploadItem = namedtuple('UploadItem', ['path', 'url', 'headers', 'created_at', 'id', 'current', 'progress'], defaults=(False, 0))
+
+cur_upload_items: Dict[int, Optional[UploadItem]] = {}
+
+
+class UploadCancelled(Exception):
+  pass
 
 
 def handle_long_poll(ws):
@@ -46,7 +58,9 @@ def handle_long_poll(ws):
   threads = [
     threading.Thread(target=ws_recv, args=(ws, end_event)),
     threading.Thread(target=ws_send, args=(ws, end_event)),
-    threading.Thread(target=upload_handler, args=(end_event,))
+  ] + [
+    threading.Thread(target=upload_handler, args=(end_event, i))
+    for i in range(UPLOAD_WORKERS)
   ] + [
     threading.Thread(target=jsonrpc_handler, args=(end_event,))
     for x in range(HANDLER_THREADS)
@@ -68,6 +82,7 @@ def handle_long_poll(ws):
 def jsonrpc_handler(end_event):
   dispatcher["startLocalProxy"] = partial(startLocalProxy, end_event)
   while not end_event.is_set():
+    sub_pool.evict()
     try:
       data = payload_queue.get(timeout=1)
       response = JSONRPCResponseManager.handle(data, dispatcher)
@@ -79,42 +94,185 @@ def jsonrpc_handler(end_event):
       response_queue.put_nowait(json.dumps({"error": str(e)}))
 
 
-def upload_handler(end_event):
+def upload_handler(end_event, tid=0):
   while not end_event.is_set():
+    cur_upload_items[tid] = None
     try:
       item = upload_queue.get(timeout=1)
       if item.id in cancelled_uploads:
         cancelled_uploads.remove(item.id)
         continue
-      _do_upload(item)
+
+      cur_upload_items[tid] = item._replace(current=True)
+
+      def cb(sz, cur):
+        cur_upload_items[tid] = cur_upload_items[tid]._replace(progress=cur / sz if sz else 1)
+
+      _do_upload(cur_upload_items[tid], cb)
     except queue.Empty:
       pass
+    except UploadCancelled:
+      cloudlog.event("athena.upload_handler.cancelled", id=item.id)
     except Exception:
       cloudlog.exception("athena.upload_handler.exception")
+    finally:
+      if cur_upload_items.get(tid) is not None:
+        cancelled_uploads.discard(cur_upload_items[tid].id)
 
 
-def _do_upload(upload_item):
+class UploadFile():
+  """File wrapper for requests that reports progress and aborts the upload once it's cancelled."""
+  def __init__(self, f, upload_id, size, callback=None):
+    self.f = f
+    self.upload_id = upload_id
+    self.size = size
+    self.callback = callback
+    self.sent = 0
+
+  def __len__(self):
+    return self.size
+
+  def read(self, size=-1):
+    if self.upload_id in cancelled_uploads:
+      raise UploadCancelled
+
+    dat = self.f.read(size)
+    self.sent += len(dat)
+    if self.callback is not None:
+      self.callback(self.size, self.sent)
+    return dat
+
+
+def _do_upload(upload_item, callback=None):
   with open(upload_item.path, "rb") as f:
     size = os.fstat(f.fileno()).st_size
     return requests.put(upload_item.url,
-                        data=f,
+                        data=UploadFile(f, upload_item.id, size, callback),
                         headers={**upload_item.headers, 'Content-Length': str(size)},
                         timeout=10)
 
 
+class PooledSubscriber():
+  def __init__(self, sock):
+    self.lock = threading.Lock()
+    self.sock = sock
+    self.dat = None
+    self.log_time = 0.
+    self.last_used = sec_since_boot()
+
+  def receive(self, non_blocking=False):
+    # a conflated socket can hold a message from long ago, its age comes from when it was sent
+    dat = self.sock.receive(non_blocking=non_blocking)
+    if dat is not None:
+      self.dat, self.log_time = dat, log.Event.from_bytes(dat).logMonoTime / 1e9
+    return dat
+
+
+class SubscriberPool():
+  """Keeps recently requested services subscribed, so getMessage can answer from the latest message."""
+  def __init__(self, ttl=SUB_POOL_TTL, max_sockets=SUB_POOL_MAX_SOCKETS, sub_sock=messaging.sub_sock):
+    self.ttl = ttl
+    self.max_sockets = max_sockets
+    self.sub_sock = sub_sock
+
+    self.lock = threading.Lock()
+    self.subs = OrderedDict()  # service -> PooledSubscriber, least recently used first
+    self.hits = 0
+    self.misses = 0
+    self.latency = {'hit': [0] * (len(LATENCY_BUCKETS_MS) + 1), 'miss': [0] * (len(LATENCY_BUCKETS_MS) + 1)}
+
+  def _evict(self, t, room=0):
+    # unused for longer than the TTL, then least recently used over the cap. Never closes a socket that is being read
+    for service, sub in list(self.subs.items()):
+      over_cap = len(self.subs) + room > self.max_sockets
+      if (over_cap or t - sub.last_used > self.ttl) and sub.lock.acquire(blocking=False):
+        del self.subs[service]
+        sub.lock.release()
+
+  def evict(self):
+    """Unsubscribes the services unused for longer than the TTL."""
+    with self.lock:
+      self._evict(sec_since_boot())
+
+  def _get_sub(self, service):
+    t = sec_since_boot()
+    with self.lock:
+      self._evict(t, room=int(service not in self.subs))
+      if service not in self.subs:
+        # conflate, only the latest message is of interest
+        self.subs[service] = PooledSubscriber(self.sub_sock(service, conflate=True))
+      self.subs.move_to_end(service)
+      sub = self.subs[service]
+      sub.last_used = t
+      return sub
+
+  def _record(self, kind, t):
+    dt = (sec_since_boot() - t) * 1000.
+    with self.lock:
+      if kind == 'hit':
+        self.hits += 1
+      else:
+        self.misses += 1
+      self.latency[kind][sum(dt > b for b in LATENCY_BUCKETS_MS)] += 1
+
+  def get(self, service, timeout=1000, max_age=None, wait=False):
+    """Latest message of a service as bytes, None on timeout.
+
+       A cached message is returned right away if it was sent less than max_age ms ago (two periods of
+       the service by default), otherwise or with wait=True the next message is waited for.
+    """
+    if max_age is None:
+      max_age = 2000. / service_list[service].frequency if service_list[service].frequency > 0 else 0.
+
+    t = sec_since_boot()
+    sub = self._get_sub(service)
+    with sub.lock:
+      sub.receive(non_blocking=True)
+
+      if not wait and sub.dat is not None and (t - sub.log_time) * 1000. <= max_age:
+        dat = sub.dat
+        kind = 'hit'
+      else:
+        sub.sock.setTimeout(timeout)
+        dat = sub.receive()
+        kind = 'miss'
+
+    self._record(kind, t)
+    return dat
+
+  def stats(self):
+    with self.lock:
+      requests = self.hits + self.misses
+      buckets = [str(b) for b in LATENCY_BUCKETS_MS] + ['inf']
+      return {
+        'hits': self.hits,
+        'misses': self.misses,
+        'hitRate': self.hits / requests if requests else 0.,
+        'services': list(self.subs.keys()),
+        'latencyMs': {kind: dict(zip(buckets, counts)) for kind, counts in self.latency.items()},
+      }
+
+
+sub_pool = SubscriberPool()
+
+
 # security: user should be able to request any message from their car
 @dispatcher.add_method
-def getMessage(service=None, timeout=1000):
+def getMessage(service=None, timeout=1000, maxAge=None, waitForNext=False):
   if service is None or service not in service_list:
     raise Exception("invalid service")
 
-  socket = messaging.sub_sock(service, timeout=timeout)
-  ret = messaging.recv_one(socket)
+  dat = sub_pool.get(service, timeout=timeout, max_age=maxAge, wait=waitForNext)
 
-  if ret is None:
+  if dat is None:
     raise TimeoutError
 
-  return ret.to_dict()
+  return log.Event.from_bytes(dat).to_dict()
+
+
+@dispatcher.add_method
+def getMessageStats():
+  return sub_pool.stats()
 
 
 @dispatcher.add_method
@@ -151,19 +309,27 @@ def uploadFileToUrl(fn, url, headers):
   upload_id = hashlib.sha1(str(item).encode()).hexdigest()
   item = item._replace(id=upload_id)
 
-  upload_queue.put_nowait(item)
+  try:
+    upload_queue.put_nowait(item)
+  except queue.Full:
+    raise Exception("upload queue full")
 
   return {"enqueued": 1, "item": item._asdict()}
 
 
+def current_upload_items():
+  return [item for item in list(cur_upload_items.values()) if item is not None]
+
+
 @dispatcher.add_method
 def listUploadQueue():
-  return [item._asdict() for item in list(upload_queue.queue)]
+  items = current_upload_items() + list(upload_queue.queue)
+  return [item._asdict() for item in items]
 
 
 @dispatcher.add_method
 def cancelUpload(upload_id):
-  upload_ids = set(item.id for item in list(upload_queue.queue))
+  upload_ids = set(item.id for item in current_upload_items() + list(upload_queue.queue))
   if upload_id not in upload_ids:
     return 404
 
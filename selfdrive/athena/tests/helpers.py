@@ -0,0 +1,50 @@
+import http.server
+import threading
+import time
+
+
+class HTTPSinkHandler(http.server.BaseHTTPRequestHandler):
+  def do_PUT(self):
+    length = int(self.headers['Content-Length'])
+    received = 0
+    while received < length:
+      dat = self.rfile.read(min(self.server.chunk_size, length - received))
+      if not dat:
+        break
+      received += len(dat)
+      if self.server.bandwidth is not None:
+        time.sleep(len(dat) / self.server.bandwidth)
+
+    with self.server.lock:
+      self.server.uploads.append((self.path, received))
+
+    self.send_response(200 if received == length else 400)
+    self.end_headers()
+
+  def log_message(self, *args):
+    pass
+
+
+class HTTPSink(http.server.ThreadingHTTPServer):
+  """Local upload target, bandwidth in bytes/s per connection to simulate a slow uplink."""
+  daemon_threads = True
+
+  def __init__(self, bandwidth=None, chunk_size=64 * 1024):
+    super().__init__(('127.0.0.1', 0), HTTPSinkHandler)
+    self.bandwidth = bandwidth
+    self.chunk_size = chunk_size
+    self.lock = threading.Lock()
+    self.uploads = []
+    self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+  @property
+  def url(self):
+    return "http://127.0.0.1:%d" % self.server_address[1]
+
+  def __enter__(self):
+    self.thread.start()
+    return self
+
+  def __exit__(self, *args):
+    self.shutdown()
+    self.server_close()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import cereal.messaging as messaging
+from cereal import log
+from selfdrive.athena import athenad
+from selfdrive.athena.athenad import SubscriberPool
+from selfdrive.athena.tests.helpers import HTTPSink
+
+
+class FakeSubSocket():
+  def __init__(self, publisher, service):
+    self.publisher = publisher
+    self.service = service
+    self.timeout = None
+    self.queue = []
+    self.cv = threading.Condition()
+
+  def setTimeout(self, timeout):
+    self.timeout = timeout
+
+  def push(self, dat):
+    with self.cv:
+      self.queue = [dat]  # conflated
+      self.cv.notify_all()
+
+  def receive(self, non_blocking=False):
+    with self.cv:
+      if not non_blocking and not self.queue:
+        self.cv.wait(None if self.timeout is None or self.timeout < 0 else self.timeout / 1000.)
+      return self.queue.pop() if self.queue else None
+
+
+class FakePublisher():
+  def __init__(self):
+    self.socks = []
+
+  def sub_sock(self, service, conflate=False):
+    sock = FakeSubSocket(self, service)
+    self.socks.append(sock)
+    return sock
+
+  def send(self, service, dat):
+    for sock in self.socks:
+      if sock.service == service:
+        sock.push(dat)
+
+
+def thermal(temp):
+  msg = messaging.new_message('thermal')
+  msg.thermal.bat = temp
+  return msg.to_bytes()
+
+
+class TestSubscriberPool(unittest.TestCase):
+  def setUp(self):
+    self.pub = FakePublisher()
+    self.pool = SubscriberPool(ttl=60, max_sockets=2, sub_sock=self.pub.sub_sock)
+
+  def test_cached_message(self):
+    self.assertIsNone(self.pool.get('thermal', timeout=10))
+
+    self.pub.send('thermal', thermal(1))
+    self.assertEqual(log.Event.from_bytes(self.pool.get('thermal', timeout=10)).thermal.bat, 1)
+
+    # served from the cache, no new socket
+    for _ in range(5):
+      self.assertEqual(log.Event.from_bytes(self.pool.get('thermal', max_age=1000)).thermal.bat, 1)
+    self.assertEqual(len(self.pub.socks), 1)
+
+    stats = self.pool.stats()
+    self.assertEqual(stats['hits'], 6)
+    self.assertEqual(stats['misses'], 1)
+    self.assertEqual(sum(stats['latencyMs']['hit'].values()), 6)
+
+    # too old
+    time.sleep(0.05)
+    self.assertIsNone(self.pool.get('thermal', timeout=10, max_age=10))
+
+  def test_publisher_stopped(self):
+    self.assertIsNone(self.pool.get('thermal', timeout=0))
+
+    # the last message is still queued in the socket when the request arrives
+    self.pub.send('thermal', thermal(1))
+    time.sleep(0.05)
+    self.assertIsNone(self.pool.get('thermal', timeout=10, max_age=10))
+    self.assertEqual(self.pool.stats()['hits'], 0)
+
+    # and stays stale in the cache
+    self.assertIsNone(self.pool.get('thermal', timeout=10, max_age=10))
+    self.assertEqual(log.Event.from_bytes(self.pool.get('thermal', timeout=10, max_age=1000)).thermal.bat, 1)
+
+  def test_wait_for_next(self):
+    self.pub.send('thermal', thermal(1))
+    self.pool.get('thermal', timeout=10)
+
+    threading.Timer(0.05, self.pub.send, args=('thermal', thermal(2))).start()
+    dat = self.pool.get('thermal', timeout=1000, max_age=1000, wait=True)
+    self.assertEqual(log.Event.from_bytes(dat).thermal.bat, 2)
+
+  def test_eviction(self):
+    for service in ['thermal', 'health', 'carState']:
+      self.pool.get(service, timeout=0)
+    self.assertEqual(self.pool.stats()['services'], ['health', 'carState'])
+
+    self.pool.ttl = 0.
+    time.sleep(0.01)
+    self.pool.get('thermal', timeout=0)
+    self.assertEqual(self.pool.stats()['services'], ['thermal'])
+
+  def test_idle_eviction(self):
+    # the same services over and over, nothing new to subscribe to
+    for service in ['thermal', 'health', 'thermal']:
+      self.pool.get(service, timeout=0)
+    self.assertEqual(self.pool.stats()['services'], ['health', 'thermal'])
+
+    self.pool.ttl = 0.05
+    time.sleep(0.1)
+    self.pool.get('thermal', timeout=0)
+    self.assertEqual(self.pool.stats()['services'], ['thermal'])
+
+    # without any requests
+    time.sleep(0.1)
+    self.pool.evict()
+    self.assertEqual(self.pool.stats()['services'], [])
+
+
+class TestUploads(unittest.TestCase):
+  def setUp(self):
+    self.root = tempfile.mkdtemp()
+    self.orig_root = athenad.ROOT
+    athenad.ROOT = self.root
+    for fn in ['a', 'b', 'c']:
+      with open(os.path.join(self.root, fn), 'wb') as f:
+        f.write(os.urandom(256 * 1024))
+
+    self.end_event = threading.Event()
+    self.workers = []
+
+  def tearDown(self):
+    self.end_event.set()
+    for t in self.workers:
+      t.join()
+    athenad.ROOT = self.orig_root
+    athenad.cancelled_uploads.clear()
+    while not athenad.upload_queue.empty():
+      athenad.upload_queue.get_nowait()
+    shutil.rmtree(self.root)
+
+  def start_workers(self, n):
+    self.workers = [threading.Thread(target=athenad.upload_handler, args=(self.end_event, i)) for i in range(n)]
+    for t in self.workers:
+      t.start()
+
+  def wait_for(self, condition, timeout=10):
+    end = time.monotonic() + timeout
+    while not condition():
+      self.assertLess(time.monotonic(), end)
+      time.sleep(0.01)
+
+  def test_parallel_uploads(self):
+    # 256 kB at 512 kB/s, three of them take ~0.5s in parallel vs ~1.5s one at a time
+    with HTTPSink(bandwidth=512 * 1024) as sink:
+      for fn in ['a', 'b', 'c']:
+        athenad.uploadFileToUrl(fn, sink.url + '/' + fn, {})
+      t = time.monotonic()
+      self.start_workers(3)
+
+      # in progress items show up in the queue with their progress
+      self.wait_for(lambda: len([i for i in athenad.listUploadQueue() if i['current']]) == 3)
+      self.wait_for(lambda: len(sink.uploads) == 3)
+      self.assertLess(time.monotonic() - t, 1.2)
+      self.assertEqual(sorted(sink.uploads), [('/a', 256 * 1024), ('/b', 256 * 1024), ('/c', 256 * 1024)])
+      self.wait_for(lambda: len(athenad.listUploadQueue()) == 0)
+
+  def test_cancel_current_upload(self):
+    # large enough to not fit in the socket buffers
+    with open(os.path.join(self.root, 'big'), 'wb') as f:
+      f.write(os.urandom(32 * 1024 * 1024))
+
+    with HTTPSink(bandwidth=1024 * 1024) as sink:
+      item = athenad.uploadFileToUrl('big', sink.url + '/big', {})['item']
+      self.start_workers(1)
+
+      self.wait_for(lambda: any(i['current'] and i['progress'] > 0 for i in athenad.listUploadQueue()))
+      self.assertEqual(athenad.cancelUpload(item['id']), {"success": 1})
+      self.wait_for(lambda: len(athenad.listUploadQueue()) == 0)
+      self.assertNotIn(('/big', 32 * 1024 * 1024), sink.uploads)
+
+  def test_backpressure(self):
+    orig_queue = athenad.upload_queue
+    athenad.upload_queue = queue.Queue(maxsize=2)
+    try:
+      athenad.uploadFileToUrl('a', 'http://127.0.0.1/a', {})
+      athenad.uploadFileToUrl('b', 'http://127.0.0.1/b', {})
+      with self.assertRaises(Exception):
+        athenad.uploadFileToUrl('c', 'http://127.0.0.1/c', {})
+    finally:
+      athenad.upload_queue = orig_queue
+
+
+if __name__ == "__main__":
+  unittest.main()
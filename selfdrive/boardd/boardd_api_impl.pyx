@@ -15,6 +15,7 @@ cdef extern void can_list_to_can_capnp_cpp(const vector[can_frame] &can_list, st
 def can_list_to_can_capnp(can_msgs, msgtype='can', valid=True):
   cdef vector[can_frame] can_list
   cdef can_frame f
+  can_list.reserve(len(can_msgs))
   for can_msg in can_msgs:
     f.address = can_msg[0]
     f.busTime = can_msg[1]
@@ -3,6 +3,7 @@ from common.params import Params
 from common.basedir import BASEDIR
 from selfdrive.version import comma_remote, tested_branch
 from selfdrive.car.fingerprints import eliminate_incompatible_cars, all_known_cars
+from selfdrive.car.manifest import load_manifest
 from selfdrive.car.vin import get_vin, VIN_UNKNOWN
 from selfdrive.car.fw_versions import get_fw_versions, match_fw_to_car
 from selfdrive.swaglog import cloudlog
@@ -34,47 +35,61 @@ def get_one_can(logcan):
       return can
 
 
+def load_interface(brand_name):
+  path = ('selfdrive.car.%s' % brand_name)
+  CarInterface = __import__(path + '.interface', fromlist=['CarInterface']).CarInterface
+
+  if os.path.exists(BASEDIR + '/' + path.replace('.', '/') + '/carstate.py'):
+    CarState = __import__(path + '.carstate', fromlist=['CarState']).CarState
+  else:
+    CarState = None
+
+  if os.path.exists(BASEDIR + '/' + path.replace('.', '/') + '/carcontroller.py'):
+    CarController = __import__(path + '.carcontroller', fromlist=['CarController']).CarController
+  else:
+    CarController = None
+
+  return CarInterface, CarController, CarState
+
+
 def load_interfaces(brand_names):
   ret = {}
   for brand_name in brand_names:
-    path = ('selfdrive.car.%s' % brand_name)
-    CarInterface = __import__(path + '.interface', fromlist=['CarInterface']).CarInterface
+    brand_interfaces = load_interface(brand_name)
+    for model_name in brand_names[brand_name]:
+      ret[model_name] = brand_interfaces
+  return ret
 
-    if os.path.exists(BASEDIR + '/' + path.replace('.', '/') + '/carstate.py'):
-      CarState = __import__(path + '.carstate', fromlist=['CarState']).CarState
-    else:
-      CarState = None
 
-    if os.path.exists(BASEDIR + '/' + path.replace('.', '/') + '/carcontroller.py'):
-      CarController = __import__(path + '.carcontroller', fromlist=['CarController']).CarController
-    else:
-      CarController = None
+class CarInterfaces():
+  """Maps car models to (CarInterface, CarController, CarState), importing a brand on first use."""
+  def __init__(self, brand_names):
+    self.model_to_brand = {model_name: brand_name for brand_name, model_names in brand_names.items()
+                           for model_name in model_names}
+    self.loaded = {}
 
-    for model_name in brand_names[brand_name]:
-      ret[model_name] = (CarInterface, CarController, CarState)
-  return ret
+  def __getitem__(self, model_name):
+    brand_name = self.model_to_brand[model_name]
+    if brand_name not in self.loaded:
+      self.loaded[brand_name] = load_interface(brand_name)
+    return self.loaded[brand_name]
+
+  def __contains__(self, model_name):
+    return model_name in self.model_to_brand
 
+  def __iter__(self):
+    return iter(self.model_to_brand)
 
-def _get_interface_names():
-  # read all the folders in selfdrive/car and return a dict where:
-  # - keys are all the car names that which we have an interface for
-  # - values are lists of spefic car models for a given car
-  brand_names = {}
-  for car_folder in [x[0] for x in os.walk(BASEDIR + '/selfdrive/car')]:
-    try:
-      brand_name = car_folder.split('/')[-1]
-      model_names = __import__('selfdrive.car.%s.values' % brand_name, fromlist=['CAR']).CAR
-      model_names = [getattr(model_names, c) for c in model_names.__dict__.keys() if not c.startswith("__")]
-      brand_names[brand_name] = model_names
-    except (ImportError, IOError):
-      pass
+  def __len__(self):
+    return len(self.model_to_brand)
 
-  return brand_names
+  def keys(self):
+    return self.model_to_brand.keys()
 
 
-# imports from directory selfdrive/car/<name>/
-interface_names = _get_interface_names()
-interfaces = load_interfaces(interface_names)
+# brand -> models from the precomputed manifest, interfaces from selfdrive/car/<name>/ are imported on demand
+interface_names = load_manifest()
+interfaces = CarInterfaces(interface_names)
 
 
 def only_toyota_left(candidate_cars):
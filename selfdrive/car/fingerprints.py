@@ -1,16 +1,21 @@
 import os
+import hashlib
 from common.basedir import BASEDIR
+from opendbc.can.pickle_cache import default_cache_dir, load_cached
+from selfdrive.car.manifest import load_manifest
+
+FINGERPRINT_CACHE_VERSION = 1
+FINGERPRINT_CACHE_DIR = os.getenv("FINGERPRINT_CACHE_DIR", default_cache_dir("fingerprint_cache"))
 
 
 def get_attr_from_cars(attr, result=dict, combine_brands=True):
-  # read all the folders in selfdrive/car and return a dict where:
+  # read all the brands in the manifest and return a dict where:
   # - keys are all the car models
   # - values are attr values from all car folders
   result = result()
 
-  for car_folder in [x[0] for x in os.walk(BASEDIR + '/selfdrive/car')]:
+  for car_name in load_manifest():
     try:
-      car_name = car_folder.split('/')[-1]
       values = __import__('selfdrive.car.%s.values' % car_name, fromlist=[attr])
       if hasattr(values, attr):
         attr_values = getattr(values, attr)
@@ -34,12 +39,61 @@ def get_attr_from_cars(attr, result=dict, combine_brands=True):
   return result
 
 
-FW_VERSIONS = get_attr_from_cars('FW_VERSIONS')
-_FINGERPRINTS = get_attr_from_cars('FINGERPRINTS')
-IGNORED_FINGERPRINTS = get_attr_from_cars('IGNORED_FINGERPRINTS', list)
-
 _DEBUG_ADDRESS = {1880: 8}   # reserved for debug purposes
 
+
+def build_fingerprint_index(fingerprints, ignored_fingerprints):
+  """Invert the fingerprints into (address, length) -> bitmask of the cars that can send it.
+
+     Returns:
+      A dict of car -> bit and a dict of (address, length) -> bitmask of compatible cars.
+      Ignored cars have a bit but are never compatible.
+  """
+  car_bits = {}
+  masks = {}
+  for i, (car_name, car_fingerprints) in enumerate(fingerprints.items()):
+    car_bits[car_name] = 1 << i
+    if car_name in ignored_fingerprints:
+      continue
+
+    for fingerprint in car_fingerprints:
+      for adr_len in {**fingerprint, **_DEBUG_ADDRESS}.items():  # add alien debug address
+        masks[adr_len] = masks.get(adr_len, 0) | car_bits[car_name]
+  return car_bits, masks
+
+
+def _values_hash():
+  h = hashlib.sha1(b"%d" % FINGERPRINT_CACHE_VERSION)
+  for brand_name in load_manifest():
+    try:
+      with open(os.path.join(BASEDIR, 'selfdrive/car', brand_name, 'values.py'), 'rb') as f:
+        h.update(brand_name.encode('utf8'))
+        h.update(f.read())
+    except IOError:
+      pass
+  return h.hexdigest()
+
+
+def load_fingerprint_db(cache_dir=None):
+  """Return the combined FW versions, fingerprints and their index, cached by the hash of all values.py."""
+  if cache_dir is None:
+    cache_dir = FINGERPRINT_CACHE_DIR
+  cache_fn = "fingerprints_%s_v%d.pkl" % (_values_hash(), FINGERPRINT_CACHE_VERSION)
+  return load_cached(cache_dir, cache_fn, _build_fingerprint_db)
+
+
+def _build_fingerprint_db():
+  fw_versions = get_attr_from_cars('FW_VERSIONS')
+  fingerprints = get_attr_from_cars('FINGERPRINTS')
+  ignored_fingerprints = get_attr_from_cars('IGNORED_FINGERPRINTS', list)
+  return (fw_versions, fingerprints, ignored_fingerprints) + build_fingerprint_index(fingerprints, ignored_fingerprints)
+
+
+FW_VERSIONS, _FINGERPRINTS, IGNORED_FINGERPRINTS, _CAR_BITS, _FINGERPRINT_MASKS = load_fingerprint_db()
+_ALL_CARS_MASK = (1 << len(_CAR_BITS)) - 1
+for car_name in IGNORED_FINGERPRINTS:
+  _ALL_CARS_MASK &= ~_CAR_BITS.get(car_name, 0)
+
 def is_valid_for_fingerprint(msg, car_fingerprint):
   adr = msg.address
   # ignore addresses that are more than 11 bits
@@ -56,22 +110,14 @@ def eliminate_incompatible_cars(msg, candidate_cars):
      Returns:
       A list containing the subset of candidate_cars that could have sent msg.
   """
-  compatible_cars = []
-
-  for car_name in candidate_cars:
-    if car_name in IGNORED_FINGERPRINTS:
-      continue
-
-    car_fingerprints = _FINGERPRINTS[car_name]
-
-    for fingerprint in car_fingerprints:
-      fingerprint.update(_DEBUG_ADDRESS)  # add alien debug address
-
-      if is_valid_for_fingerprint(msg, fingerprint):
-        compatible_cars.append(car_name)
-        break
+  adr = msg.address
+  # ignore addresses that are more than 11 bits
+  if adr >= 0x800:
+    compatible = _ALL_CARS_MASK
+  else:
+    compatible = _FINGERPRINT_MASKS.get((adr, len(msg.dat)), 0)
 
-  return compatible_cars
+  return [car_name for car_name in candidate_cars if compatible & _CAR_BITS[car_name]]
 
 
 def all_known_cars():
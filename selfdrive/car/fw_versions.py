@@ -108,38 +108,66 @@ def chunks(l, n=128):
     yield l[i:i + n]
 
 
-def match_fw_to_car(fw_versions):
-  candidates = FW_VERSIONS
-  invalid = []
+ESSENTIAL_ECUS = [Ecu.engine, Ecu.eps, Ecu.esp, Ecu.fwdRadar, Ecu.fwdCamera, Ecu.vsa, Ecu.electricBrakeBooster]
+
+# essential ECUs that don't always respond, a candidate isn't ruled out when these are missing
+OPTIONAL_ECUS = {
+  Ecu.esp: [TOYOTA.RAV4, TOYOTA.COROLLA, TOYOTA.HIGHLANDER],
+  # TODO: COROLLA_TSS2 engine can show on two different addresses
+  Ecu.engine: [TOYOTA.COROLLA_TSS2, TOYOTA.CHR],
+}
+
+
+def build_fw_index(candidates):
+  """Invert the FW versions so matching is a few set operations per ECU address.
+
+     Returns:
+      ecus: (addr, sub_addr) -> cars that list an ECU at that address.
+      accepted: (addr, sub_addr, version) -> cars for which every ECU at that address accepts version.
+      required: (addr, sub_addr) -> cars that are ruled out when that address doesn't respond.
+  """
+  ecus, required = {}, {}
+  versions = {}
+  for candidate, fws in candidates.items():
+    for (ecu_type, addr, sub_addr), expected_versions in fws.items():
+      a = (addr, sub_addr)
+      ecus.setdefault(a, set()).add(candidate)
+
+      # a car can list several ECUs at the same address, all of them have to match
+      key = (candidate, a)
+      versions[key] = set(expected_versions) if key not in versions else versions[key] & set(expected_versions)
+
+      optional = ecu_type not in ESSENTIAL_ECUS or candidate in OPTIONAL_ECUS.get(ecu_type, [])
+      if not optional and None not in expected_versions:
+        required.setdefault(a, set()).add(candidate)
+
+  accepted = {}
+  for (candidate, a), expected_versions in versions.items():
+    for version in expected_versions:
+      accepted.setdefault(a + (version,), set()).add(candidate)
+
+  return ecus, accepted, required
 
+
+FW_ECUS, FW_ACCEPTED, FW_REQUIRED = build_fw_index(FW_VERSIONS)
+
+
+def match_fw_to_car(fw_versions):
   fw_versions_dict = {}
   for fw in fw_versions:
     addr = fw.address
     sub_addr = fw.subAddress if fw.subAddress != 0 else None
     fw_versions_dict[(addr, sub_addr)] = fw.fwVersion
 
-  for candidate, fws in candidates.items():
-    for ecu, expected_versions in fws.items():
-      ecu_type = ecu[0]
-      addr = ecu[1:]
-      found_version = fw_versions_dict.get(addr, None)
-      ESSENTIAL_ECUS = [Ecu.engine, Ecu.eps, Ecu.esp, Ecu.fwdRadar, Ecu.fwdCamera, Ecu.vsa, Ecu.electricBrakeBooster]
-      if ecu_type == Ecu.esp and candidate in [TOYOTA.RAV4, TOYOTA.COROLLA, TOYOTA.HIGHLANDER] and found_version is None:
-        continue
-
-      # TODO: COROLLA_TSS2 engine can show on two different addresses
-      if ecu_type == Ecu.engine and candidate in [TOYOTA.COROLLA_TSS2, TOYOTA.CHR] and found_version is None:
-        continue
-
-      # ignore non essential ecus
-      if ecu_type not in ESSENTIAL_ECUS and found_version is None:
-        continue
-
-      if found_version not in expected_versions:
-        invalid.append(candidate)
-        break
-
-  return set(candidates.keys()) - set(invalid)
+  invalid = set()
+  for a, cars in FW_ECUS.items():
+    found_version = fw_versions_dict.get(a, None)
+    if found_version is None:
+      invalid |= FW_REQUIRED.get(a, set())
+    else:
+      invalid |= cars - FW_ACCEPTED.get(a + (found_version,), set())
+
+  return set(FW_VERSIONS.keys()) - invalid
 
 
 def get_fw_versions(logcan, sendcan, bus, extra=None, timeout=0.1, debug=False, progress=False):
@@ -7,7 +7,7 @@ from selfdrive.car.hyundai.carstate import GearShifter
 from selfdrive.car.hyundai.hyundaican import create_lkas11, create_clu11, create_lfa_mfa, \
                                              create_scc11, create_scc12, create_scc13, create_scc14, \
                                              create_scc42a, create_scc7d0, create_fca11, create_fca12
-from selfdrive.car.hyundai.values import Buttons, SteerLimitParams, CAR, FEATURES
+from selfdrive.car.hyundai.values import Buttons, SteerLimitParams, CAR, FEATURES, CHECKSUM
 from opendbc.can.packer import CANPacker
 from selfdrive.config import Conversions as CV
 from selfdrive.controls.lib.longcontrol import LongCtrlState
@@ -74,7 +74,8 @@ class CarController():
     self.apply_steer_last = 0
     self.car_fingerprint = CP.carFingerprint
     self.cp_oplongcontrol = CP.openpilotLongitudinalControl
-    self.packer = CANPacker(dbc_name)
+    lkas_checksum = next((k for k, cars in CHECKSUM.items() if self.car_fingerprint in cars), "7B")
+    self.packer = CANPacker(dbc_name, hyundai_lkas_checksum=lkas_checksum)
     self.accel_steady = 0
     self.accel_lim_prev = 0.
     self.accel_lim = 0.
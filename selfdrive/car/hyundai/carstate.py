@@ -38,26 +38,26 @@ class CarState(CarStateBase):
 
     ret = car.CarState.new_message()
 
-    ret.doorOpen = any([cp.vl["CGW1"]['CF_Gway_DrvDrSw'], cp.vl["CGW1"]['CF_Gway_AstDrSw'],
-                        cp.vl["CGW2"]['CF_Gway_RLDrSw'], cp.vl["CGW2"]['CF_Gway_RRDrSw']])
+    ret.doorOpen = any([cp.CGW1.CF_Gway_DrvDrSw, cp.CGW1.CF_Gway_AstDrSw,
+                        cp.CGW2.CF_Gway_RLDrSw, cp.CGW2.CF_Gway_RRDrSw])
 
-    ret.seatbeltUnlatched = cp.vl["CGW1"]['CF_Gway_DrvSeatBeltSw'] == 0
+    ret.seatbeltUnlatched = cp.CGW1.CF_Gway_DrvSeatBeltSw == 0
 
-    ret.wheelSpeeds.fl = cp.vl["WHL_SPD11"]['WHL_SPD_FL'] * CV.KPH_TO_MS
-    ret.wheelSpeeds.fr = cp.vl["WHL_SPD11"]['WHL_SPD_FR'] * CV.KPH_TO_MS
-    ret.wheelSpeeds.rl = cp.vl["WHL_SPD11"]['WHL_SPD_RL'] * CV.KPH_TO_MS
-    ret.wheelSpeeds.rr = cp.vl["WHL_SPD11"]['WHL_SPD_RR'] * CV.KPH_TO_MS
+    ret.wheelSpeeds.fl = cp.WHL_SPD11.WHL_SPD_FL * CV.KPH_TO_MS
+    ret.wheelSpeeds.fr = cp.WHL_SPD11.WHL_SPD_FR * CV.KPH_TO_MS
+    ret.wheelSpeeds.rl = cp.WHL_SPD11.WHL_SPD_RL * CV.KPH_TO_MS
+    ret.wheelSpeeds.rr = cp.WHL_SPD11.WHL_SPD_RR * CV.KPH_TO_MS
     ret.vEgoRaw = (ret.wheelSpeeds.fl + ret.wheelSpeeds.fr + ret.wheelSpeeds.rl + ret.wheelSpeeds.rr) / 4.
     ret.vEgo, ret.aEgo = self.update_speed_kf(ret.vEgoRaw)
 
     ret.standstill = ret.vEgoRaw < 0.1
 
-    ret.steeringAngle = cp_sas.vl["SAS11"]['SAS_Angle']
-    ret.steeringRate = cp_sas.vl["SAS11"]['SAS_Speed']
-    ret.yawRate = cp.vl["ESP12"]['YAW_RATE']
+    ret.steeringAngle = cp_sas.SAS11.SAS_Angle
+    ret.steeringRate = cp_sas.SAS11.SAS_Speed
+    ret.yawRate = cp.ESP12.YAW_RATE
 
-    self.leftblinkerflash = cp.vl["CGW1"]['CF_Gway_TurnSigLh'] != 0 and cp.vl["CGW1"]['CF_Gway_TSigLHSw'] == 0
-    self.rightblinkerflash = cp.vl["CGW1"]['CF_Gway_TurnSigRh'] != 0 and cp.vl["CGW1"]['CF_Gway_TSigRHSw'] == 0
+    self.leftblinkerflash = cp.CGW1.CF_Gway_TurnSigLh != 0 and cp.CGW1.CF_Gway_TSigLHSw == 0
+    self.rightblinkerflash = cp.CGW1.CF_Gway_TurnSigRh != 0 and cp.CGW1.CF_Gway_TSigRHSw == 0
 
     if self.leftblinkerflash:
       self.leftblinkerflashdebounce = 50
@@ -69,20 +69,20 @@ class CarState(CarStateBase):
     elif self.rightblinkerflashdebounce > 0:
       self.rightblinkerflashdebounce -= 1
 
-    ret.leftBlinker = cp.vl["CGW1"]['CF_Gway_TSigLHSw'] != 0 or self.leftblinkerflashdebounce > 0
-    ret.rightBlinker = cp.vl["CGW1"]['CF_Gway_TSigRHSw'] != 0 or self.rightblinkerflashdebounce > 0
+    ret.leftBlinker = cp.CGW1.CF_Gway_TSigLHSw != 0 or self.leftblinkerflashdebounce > 0
+    ret.rightBlinker = cp.CGW1.CF_Gway_TSigRHSw != 0 or self.rightblinkerflashdebounce > 0
 
-    ret.steeringTorque = cp_mdps.vl["MDPS12"]['CR_Mdps_StrColTq']
-    ret.steeringTorqueEps = cp_mdps.vl["MDPS12"]['CR_Mdps_OutTq']
+    ret.steeringTorque = cp_mdps.MDPS12.CR_Mdps_StrColTq
+    ret.steeringTorqueEps = cp_mdps.MDPS12.CR_Mdps_OutTq
 
     ret.steeringPressed = abs(ret.steeringTorque) > STEER_THRESHOLD
 
-    ret.steerWarning = cp_mdps.vl["MDPS12"]['CF_Mdps_ToiUnavail'] != 0
+    ret.steerWarning = cp_mdps.MDPS12.CF_Mdps_ToiUnavail != 0
 
-    self.brakeHold = (cp.vl["ESP11"]['AVH_STAT'] == 1)
+    self.brakeHold = (cp.ESP11.AVH_STAT == 1)
 
-    self.cruise_main_button = cp.vl["CLU11"]["CF_Clu_CruiseSwMain"]
-    self.cruise_buttons = cp.vl["CLU11"]["CF_Clu_CruiseSwState"]
+    self.cruise_main_button = cp.CLU11.CF_Clu_CruiseSwMain
+    self.cruise_buttons = cp.CLU11.CF_Clu_CruiseSwState
 
     if not self.cruise_main_button:
       if self.cruise_buttons == 4 and self.prev_cruise_buttons != 4 and self.cancel_button_count < 3:
@@ -104,64 +104,64 @@ class CarState(CarStateBase):
       ret.cruiseState.available = self.allow_nonscc_available != 0
       ret.cruiseState.enabled = ret.cruiseState.available
     elif not self.CP.radarOffCan:
-      ret.cruiseState.available = (cp_scc.vl["SCC11"]["MainMode_ACC"] != 0)
-      ret.cruiseState.enabled = (cp_scc.vl["SCC12"]['ACCMode'] != 0)
+      ret.cruiseState.available = (cp_scc.SCC11.MainMode_ACC != 0)
+      ret.cruiseState.enabled = (cp_scc.SCC12.ACCMode != 0)
 
-    self.lead_distance = cp_scc.vl["SCC11"]['ACC_ObjDist']
-    self.vrelative = cp_scc.vl["SCC11"]['ACC_ObjRelSpd']
-    self.radar_obj_valid = cp_scc.vl["SCC11"]['ObjValid']
-    ret.cruiseState.standstill = cp_scc.vl["SCC11"]['SCCInfoDisplay'] == 4.
+    self.lead_distance = cp_scc.SCC11.ACC_ObjDist
+    self.vrelative = cp_scc.SCC11.ACC_ObjRelSpd
+    self.radar_obj_valid = cp_scc.SCC11.ObjValid
+    ret.cruiseState.standstill = cp_scc.SCC11.SCCInfoDisplay == 4.
 
-    self.is_set_speed_in_mph = cp.vl["CLU11"]["CF_Clu_SPEED_UNIT"]
+    self.is_set_speed_in_mph = cp.CLU11.CF_Clu_SPEED_UNIT
     if ret.cruiseState.enabled:
       speed_conv = CV.MPH_TO_MS if self.is_set_speed_in_mph else CV.KPH_TO_MS
       if self.CP.radarOffCan:
-        ret.cruiseState.speed = cp.vl["LVR12"]["CF_Lvr_CruiseSet"] * speed_conv
+        ret.cruiseState.speed = cp.LVR12.CF_Lvr_CruiseSet * speed_conv
       else:
-        ret.cruiseState.speed = cp_scc.vl["SCC11"]['VSetDis'] * speed_conv
+        ret.cruiseState.speed = cp_scc.SCC11.VSetDis * speed_conv
     else:
       ret.cruiseState.speed = 0
 
     # TODO: Find brake pressure
     ret.brake = 0
-    ret.brakePressed = cp.vl["TCS13"]['DriverBraking'] != 0
-    self.brakeUnavailable = cp.vl["TCS13"]['ACCEnable'] == 3
+    ret.brakePressed = cp.TCS13.DriverBraking != 0
+    self.brakeUnavailable = cp.TCS13.ACCEnable == 3
 
     # TODO: Check this
-    ret.brakeLights = bool(cp.vl["TCS13"]['BrakeLight'] or ret.brakePressed)
+    ret.brakeLights = bool(cp.TCS13.BrakeLight or ret.brakePressed)
 
     if self.CP.carFingerprint in ELEC_VEH:
-      ret.gas = cp.vl["E_EMS11"]['Accel_Pedal_Pos'] / 256.
+      ret.gas = cp.E_EMS11.Accel_Pedal_Pos / 256.
     elif self.CP.carFingerprint in HYBRID_VEH:
-      ret.gas = cp.vl["EV_PC4"]['CR_Vcu_AccPedDep_Pc']
+      ret.gas = cp.EV_PC4.CR_Vcu_AccPedDep_Pc
     elif self.CP.emsAvailable:
-      ret.gas = cp.vl["EMS12"]['PV_AV_CAN'] / 100
+      ret.gas = cp.EMS12.PV_AV_CAN / 100
 
-    ret.gasPressed = (cp.vl["TCS13"]["DriverOverride"] == 1)
+    ret.gasPressed = (cp.TCS13.DriverOverride == 1)
     if self.CP.emsAvailable:
-      ret.gasPressed = ret.gasPressed or bool(cp.vl["EMS16"]["CF_Ems_AclAct"])
+      ret.gasPressed = ret.gasPressed or bool(cp.EMS16.CF_Ems_AclAct)
 
-    ret.espDisabled = (cp.vl["TCS15"]['ESC_Off_Step'] != 0)
+    ret.espDisabled = (cp.TCS15.ESC_Off_Step != 0)
 
-    self.parkBrake = (cp.vl["CGW1"]['CF_Gway_ParkBrakeSw'] != 0)
+    self.parkBrake = (cp.CGW1.CF_Gway_ParkBrakeSw != 0)
 
     # TODO: refactor gear parsing in function
     # Gear Selection via Cluster - For those Kia/Hyundai which are not fully discovered, we can use the Cluster Indicator for Gear Selection,
     # as this seems to be standard over all cars, but is not the preferred method.
     if self.CP.carFingerprint in FEATURES["use_cluster_gears"]:
-      if cp.vl["CLU15"]["CF_Clu_InhibitD"] == 1:
+      if cp.CLU15.CF_Clu_InhibitD == 1:
         ret.gearShifter = GearShifter.drive
-      elif cp.vl["CLU15"]["CF_Clu_InhibitN"] == 1:
+      elif cp.CLU15.CF_Clu_InhibitN == 1:
         ret.gearShifter = GearShifter.neutral
-      elif cp.vl["CLU15"]["CF_Clu_InhibitP"] == 1:
+      elif cp.CLU15.CF_Clu_InhibitP == 1:
         ret.gearShifter = GearShifter.park
-      elif cp.vl["CLU15"]["CF_Clu_InhibitR"] == 1:
+      elif cp.CLU15.CF_Clu_InhibitR == 1:
         ret.gearShifter = GearShifter.reverse
       else:
         ret.gearShifter = GearShifter.unknown
     # Gear Selecton via TCU12
     elif self.CP.carFingerprint in FEATURES["use_tcu_gears"]:
-      gear = cp.vl["TCU12"]["CUR_GR"]
+      gear = cp.TCU12.CUR_GR
       if gear == 0:
         ret.gearShifter = GearShifter.park
       elif gear == 14:
@@ -172,7 +172,7 @@ class CarState(CarStateBase):
         ret.gearShifter = GearShifter.unknown
     # Gear Selecton - This is only compatible with optima hybrid 2017
     elif self.CP.evgearAvailable:
-      gear = cp.vl["ELECT_GEAR"]["Elect_Gear_Shifter"]
+      gear = cp.ELECT_GEAR.Elect_Gear_Shifter
       if gear in (5, 8):  # 5: D, 8: sport mode
         ret.gearShifter = GearShifter.drive
       elif gear == 6:
@@ -185,7 +185,7 @@ class CarState(CarStateBase):
         ret.gearShifter = GearShifter.unknown
     # Gear Selecton - This is not compatible with all Kia/Hyundai's, But is the best way for those it is compatible with
     elif self.CP.lvrAvailable:
-      gear = cp.vl["LVR12"]["CF_Lvr_Gear"]
+      gear = cp.LVR12.CF_Lvr_Gear
       if gear in (5, 8):  # 5: D, 8: sport mode
         ret.gearShifter = GearShifter.drive
       elif gear == 6:
@@ -198,15 +198,15 @@ class CarState(CarStateBase):
         ret.gearShifter = GearShifter.unknown
 
     if self.CP.fcaBus != -1:
-      ret.stockAeb = cp_fca.vl["FCA11"]['FCA_CmdAct'] != 0
-      ret.stockFcw = cp_fca.vl["FCA11"]['CF_VSM_Warn'] == 2
+      ret.stockAeb = cp_fca.FCA11.FCA_CmdAct != 0
+      ret.stockFcw = cp_fca.FCA11.CF_VSM_Warn == 2
     elif not self.CP.radarOffCan:
-      ret.stockAeb = cp_scc.vl["SCC12"]['AEB_CmdAct'] != 0
-      ret.stockFcw = cp_scc.vl["SCC12"]['CF_VSM_Warn'] == 2
+      ret.stockAeb = cp_scc.SCC12.AEB_CmdAct != 0
+      ret.stockFcw = cp_scc.SCC12.CF_VSM_Warn == 2
 
     if self.CP.bsmAvailable:
-      ret.leftBlindspot = cp.vl["LCA11"]["CF_Lca_IndLeft"] != 0
-      ret.rightBlindspot = cp.vl["LCA11"]["CF_Lca_IndRight"] != 0
+      ret.leftBlindspot = cp.LCA11.CF_Lca_IndLeft != 0
+      ret.rightBlindspot = cp.LCA11.CF_Lca_IndRight != 0
 
     # save the entire LKAS11, CLU11, SCC12 and MDPS12
     self.lkas11 = copy.copy(cp_cam.vl["LKAS11"])
@@ -1,7 +1,4 @@
-import crcmod
-from selfdrive.car.hyundai.values import CAR, CHECKSUM
-
-hyundai_checksum = crcmod.mkCrcFun(0x11D, initCrc=0xFD, rev=False, xorOut=0xdf)
+from selfdrive.car.hyundai.values import CAR
 
 
 def create_lkas11(packer, frame, car_fingerprint, apply_steer, steer_req,
@@ -16,8 +13,6 @@ def create_lkas11(packer, frame, car_fingerprint, apply_steer, steer_req,
   values["CR_Lkas_StrToqReq"] = apply_steer
   values["CF_Lkas_ActToi"] = steer_req
   values["CF_Lkas_ToiFlt"] = 0
-  values["CF_Lkas_MsgCount"] = frame % 0x10
-  values["CF_Lkas_Chksum"] = 0
 
   if values["CF_Lkas_LdwsOpt_USM"] == 4:
     values["CF_Lkas_LdwsOpt_USM"] = 3
@@ -47,22 +42,8 @@ def create_lkas11(packer, frame, car_fingerprint, apply_steer, steer_req,
   elif car_fingerprint == CAR.KIA_OPTIMA:
     values["CF_Lkas_LdwsActivemode"] = 0
 
-  dat = packer.make_can_msg("LKAS11", 0, values)[2]
-
-  if car_fingerprint in CHECKSUM["crc8"]:
-    # CRC Checksum as seen on 2019 Hyundai Santa Fe
-    dat = dat[:6] + dat[7:8]
-    checksum = hyundai_checksum(dat)
-  elif car_fingerprint in CHECKSUM["6B"]:
-    # Checksum of first 6 Bytes, as seen on 2018 Kia Sorento
-    checksum = sum(dat[:6]) % 256
-  else:
-    # Checksum of first 6 Bytes and last Byte as seen on 2018 Kia Stinger
-    checksum = (sum(dat[:6]) + dat[7]) % 256
-
-  values["CF_Lkas_Chksum"] = checksum
-
-  return packer.make_can_msg("LKAS11", bus, values)
+  # CF_Lkas_Chksum is filled in by the packer, see CHECKSUM in values.py
+  return packer.make_can_msg("LKAS11", bus, values, frame % 0x10)
 
 
 def create_clu11(packer, bus, clu11, button, speed, cnt):
@@ -139,17 +120,12 @@ def create_scc12(packer, apply_accel, enabled, standstill, gaspressed, brakepres
 
     if nosccradar:
       values["CR_VSM_Alive"] = cnt
-
-    values["CR_VSM_ChkSum"] = 0
-    dat = packer.make_can_msg("SCC12", 0, values)[2]
-    values["CR_VSM_ChkSum"] = 16 - sum([sum(divmod(i, 16)) for i in dat]) % 16
   elif nosccradar:
     values["CR_VSM_Alive"] = cnt
-    values["CR_VSM_ChkSum"] = 0
-    dat = packer.make_can_msg("SCC12", 0, values)[2]
-    values["CR_VSM_ChkSum"] = 16 - sum([sum(divmod(i, 16)) for i in dat]) % 16
 
-  return packer.make_can_msg("SCC12", 0, values)
+  # CR_VSM_ChkSum is filled in by the packer, unless forwarded unchanged with the stock radar's checksum
+  passthrough = (usestockscc or aebcmdact) and not nosccradar
+  return packer.make_can_msg("SCC12", 0, values, checksum=not passthrough)
 
 def create_scc13(packer, scc13):
   values = scc13
@@ -187,9 +163,7 @@ def create_fca11(packer, fca11, fca11cnt, fca11supcnt):
   values = fca11
   values["CR_FCA_Alive"] = fca11cnt
   values["Supplemental_Counter"] = fca11supcnt
-  values["CR_FCA_ChkSum"] = 0
-  dat = packer.make_can_msg("FCA11", 0, values)[2]
-  values["CR_FCA_ChkSum"] = 16 - sum([sum(divmod(i, 16)) for i in dat]) % 16
+  # CR_FCA_ChkSum is filled in by the packer
   return packer.make_can_msg("FCA11", 0, values)
 
 def create_fca12(packer):
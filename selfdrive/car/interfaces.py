@@ -8,6 +8,7 @@ from selfdrive.config import Conversions as CV
 from selfdrive.controls.lib.events import Events
 from selfdrive.controls.lib.vehicle_model import VehicleModel
 from selfdrive.controls.lib.drive_helpers import V_CRUISE_MAX
+from opendbc.can.parser import CANParser
 
 GearShifter = car.CarState.GearShifter
 EventName = car.CarEvent.EventName
@@ -85,6 +86,17 @@ class CarInterfaceBase():
   def apply(self, c):
     raise NotImplementedError
 
+  def invalid_can_messages(self):
+    """Health of the messages that currently make CAN invalid, by parser attribute and message name."""
+    ret = {}
+    for attr, cp in vars(self).items():
+      if isinstance(cp, CANParser):
+        invalid = cp.invalid_messages()
+        if len(invalid):
+          stats = cp.message_stats()
+          ret[attr] = {name: stats[name] for name in invalid}
+    return ret
+
   def create_common_events(self, cs_out, extra_gears=[], gas_resume_speed=-1, pcm_enable=True):  # pylint: disable=dangerous-default-value
     events = Events()
 
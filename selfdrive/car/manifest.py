@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import os
+import json
+from common.basedir import BASEDIR
+
+# brand name -> car models, so the interfaces of a brand can be imported only once it's fingerprinted
+MANIFEST_PATH = os.path.join(BASEDIR, 'selfdrive/car/manifest.json')
+
+
+def get_interface_names():
+  # read all the folders in selfdrive/car and return a dict where:
+  # - keys are all the car names that which we have an interface for
+  # - values are lists of spefic car models for a given car
+  brand_names = {}
+  for car_folder in sorted(x[0] for x in os.walk(BASEDIR + '/selfdrive/car')):
+    try:
+      brand_name = car_folder.split('/')[-1]
+      model_names = __import__('selfdrive.car.%s.values' % brand_name, fromlist=['CAR']).CAR
+      model_names = [getattr(model_names, c) for c in model_names.__dict__.keys() if not c.startswith("__")]
+      brand_names[brand_name] = model_names
+    except (ImportError, IOError):
+      pass
+
+  return brand_names
+
+
+def load_manifest():
+  try:
+    with open(MANIFEST_PATH) as f:
+      return json.load(f)
+  except (IOError, ValueError):
+    return get_interface_names()
+
+
+def update_manifest():
+  with open(MANIFEST_PATH, 'w') as f:
+    json.dump(get_interface_names(), f, indent=2, sort_keys=True)
+    f.write('\n')
+
+
+if __name__ == "__main__":
+  update_manifest()
+  print("wrote", MANIFEST_PATH)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+import random
+import unittest
+
+from cereal import car, log
+from selfdrive.car.fingerprints import FW_VERSIONS, IGNORED_FINGERPRINTS, _FINGERPRINTS, _DEBUG_ADDRESS, \
+                                       all_known_cars, eliminate_incompatible_cars, is_valid_for_fingerprint
+from selfdrive.car.fw_versions import ESSENTIAL_ECUS, OPTIONAL_ECUS, match_fw_to_car
+
+Ecu = car.CarParams.Ecu
+
+
+# the plain loops the indexed lookups replaced
+def eliminate_incompatible_cars_reference(msg, candidate_cars):
+  compatible_cars = []
+  for car_name in candidate_cars:
+    if car_name in IGNORED_FINGERPRINTS:
+      continue
+
+    for fingerprint in _FINGERPRINTS[car_name]:
+      if is_valid_for_fingerprint(msg, {**fingerprint, **_DEBUG_ADDRESS}):
+        compatible_cars.append(car_name)
+        break
+  return compatible_cars
+
+
+def match_fw_to_car_reference(fw_versions):
+  invalid = []
+
+  fw_versions_dict = {}
+  for fw in fw_versions:
+    sub_addr = fw.subAddress if fw.subAddress != 0 else None
+    fw_versions_dict[(fw.address, sub_addr)] = fw.fwVersion
+
+  for candidate, fws in FW_VERSIONS.items():
+    for ecu, expected_versions in fws.items():
+      ecu_type = ecu[0]
+      found_version = fw_versions_dict.get(ecu[1:], None)
+      if found_version is None and candidate in OPTIONAL_ECUS.get(ecu_type, []):
+        continue
+
+      # ignore non essential ecus
+      if ecu_type not in ESSENTIAL_ECUS and found_version is None:
+        continue
+
+      if found_version not in expected_versions:
+        invalid.append(candidate)
+        break
+
+  return set(FW_VERSIONS.keys()) - set(invalid)
+
+
+def can_msg(address, length):
+  msg = log.CanData.new_message()
+  msg.address = address
+  msg.dat = b'\x00' * length
+  return msg
+
+
+def car_fw(versions):
+  ret = []
+  for (ecu_type, addr, sub_addr), version in versions.items():
+    f = car.CarParams.CarFw.new_message()
+    f.ecu = ecu_type
+    f.address = addr
+    if sub_addr is not None:
+      f.subAddress = sub_addr
+    f.fwVersion = version
+    ret.append(f)
+  return ret
+
+
+class TestFingerprintIndex(unittest.TestCase):
+  def test_eliminate_incompatible_cars(self):
+    all_cars = all_known_cars()
+    msgs = {(1880, 8), (1880, 4), (0x800, 8), (0x7ff, 3)}
+    for fingerprints in _FINGERPRINTS.values():
+      for fingerprint in fingerprints:
+        for address, length in fingerprint.items():
+          msgs |= {(address, length), (address, (length + 1) % 9)}
+
+    for address, length in sorted(msgs):
+      msg = can_msg(address, length)
+      self.assertEqual(eliminate_incompatible_cars(msg, all_cars), eliminate_incompatible_cars_reference(msg, all_cars))
+      self.assertEqual(eliminate_incompatible_cars(msg, all_cars[::3]), eliminate_incompatible_cars_reference(msg, all_cars[::3]))
+
+  def test_unknown_car(self):
+    # as in the reference, a typo in a car name isn't silently dropped
+    with self.assertRaises(KeyError):
+      eliminate_incompatible_cars(can_msg(1880, 8), ["NOT A CAR"])
+
+  def test_match_fw_to_car(self):
+    rng = random.Random(0)
+    for candidate, fws in FW_VERSIONS.items():
+      for _ in range(20):
+        versions = {}
+        for ecu, expected_versions in fws.items():
+          r = rng.random()
+          if r < 0.7:
+            versions[ecu] = rng.choice(expected_versions)
+          elif r < 0.8:
+            # a version from another car
+            other = rng.choice(list(FW_VERSIONS.values()))
+            versions[ecu] = rng.choice(rng.choice(list(other.values())))
+          elif r < 0.9:
+            versions[ecu] = b'\x00unknown'
+          # else the ECU doesn't respond
+
+        fw = car_fw(versions)
+        self.assertEqual(match_fw_to_car(fw), match_fw_to_car_reference(fw))
+
+      fw = car_fw({ecu: expected_versions[0] for ecu, expected_versions in fws.items()})
+      self.assertIn(candidate, match_fw_to_car(fw))
+
+    self.assertEqual(match_fw_to_car([]), match_fw_to_car_reference([]))
+
+
+if __name__ == "__main__":
+  unittest.main()
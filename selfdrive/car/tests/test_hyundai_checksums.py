@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+import os
+import random
+import unittest
+
+import crcmod
+
+from opendbc import DBC_PATH
+from opendbc.can.dbc import dbc
+from opendbc.can.packer import CANPacker
+from selfdrive.car.hyundai.hyundaican import create_scc12
+
+DBC_NAME = "hyundai_kia_generic"
+
+# the python checksums the packer replaced
+hyundai_checksum = crcmod.mkCrcFun(0x11D, initCrc=0xFD, rev=False, xorOut=0xdf)
+
+LKAS_CHECKSUMS = {
+  "crc8": lambda dat: hyundai_checksum(dat[:6] + dat[7:8]),
+  "6B": lambda dat: sum(dat[:6]) % 256,
+  "7B": lambda dat: (sum(dat[:6]) + dat[7]) % 256,
+}
+
+
+def nibble_checksum(dat):
+  dat = dat[:7] + bytes([dat[7] & 0x0F])
+  return (16 - sum([sum(divmod(i, 16)) for i in dat]) % 16) % 16
+
+
+# as seen from the stock cameras and radars
+STOCK = {
+  "LKAS11": {"CF_Lkas_LdwsSysState": 3, "CF_Lkas_LdwsLHWarning": 0, "CR_Lkas_StrToqReq": 0, "CF_Lkas_HbaOpt": 1,
+             "CF_Lkas_FcwOpt_USM": 2, "CF_Lkas_LdwsOpt_USM": 3, "CF_Lkas_MsgCount": 7, "CF_Lkas_FcwSysState": 3},
+  "SCC12": {"ACCMode": 1, "CF_VSM_ConfMode": 1, "aReqRaw": -0.52, "aReqValue": -0.49, "CR_VSM_Alive": 9},
+  "FCA11": {"CF_VSM_Prefill": 0, "FCA_Status": 2, "FCA_DrvSetStatus": 1, "CR_FCA_Alive": 3, "Supplemental_Counter": 5},
+}
+
+
+class TestHyundaiChecksums(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.dbc = dbc(os.path.join(DBC_PATH, DBC_NAME + ".dbc"))
+    cls.signals = {name: sigs for (name, _), sigs in cls.dbc.msgs.values()}
+
+  def frames(self, msg, n=200):
+    """The stock frame followed by n with every signal random."""
+    rng = random.Random(msg)
+    yield dict(STOCK[msg])
+    for _ in range(n):
+      yield {s.name: rng.randrange(1 << s.size) * s.factor + s.offset for s in self.signals[msg]}
+
+  def test_lkas11(self):
+    for variant, checksum in LKAS_CHECKSUMS.items():
+      packer = CANPacker(DBC_NAME, hyundai_lkas_checksum=variant)
+      for values in self.frames("LKAS11"):
+        dat = packer.make_can_msg("LKAS11", 0, values)[2]
+        with self.subTest(variant=variant, dat=dat.hex()):
+          self.assertEqual(dat[6], checksum(dat))
+
+  def test_nibble(self):
+    packer = CANPacker(DBC_NAME)
+    for msg in ("SCC12", "FCA11"):
+      for values in self.frames(msg):
+        dat = packer.make_can_msg(msg, 0, values)[2]
+        with self.subTest(msg=msg, dat=dat.hex()):
+          self.assertEqual(dat[7] >> 4, nibble_checksum(dat))
+
+  def test_scc12_passthrough(self):
+    packer = CANPacker(DBC_NAME)
+    # a stock checksum the packer wouldn't compute, forwarded as is
+    stock = dict(STOCK["SCC12"], CR_VSM_ChkSum=5)
+    computed = packer.make_can_msg("SCC12", 0, stock)[2][7] >> 4
+    self.assertNotEqual(computed, 5)
+
+    for usestockscc, aebcmdact, nosccradar, passthrough in [(True, False, False, True), (False, True, False, True),
+                                                            (False, False, False, False), (True, False, True, False)]:
+      dat = create_scc12(packer, -1.0, True, False, False, False, aebcmdact, dict(stock), usestockscc, nosccradar, 4)[2]
+      with self.subTest(usestockscc=usestockscc, aebcmdact=aebcmdact, nosccradar=nosccradar):
+        self.assertEqual(dat[7] >> 4, 5 if passthrough else nibble_checksum(dat))
+
+
+if __name__ == "__main__":
+  unittest.main()
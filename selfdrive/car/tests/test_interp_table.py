@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+import math
+import unittest
+
+from common.numpy_fast import interp
+from common.interp_table import InterpTable  # pylint: disable=no-name-in-module, import-error
+from selfdrive.car.fingerprints import all_known_cars
+from selfdrive.car.car_helpers import interfaces
+from selfdrive.car.fingerprints import _FINGERPRINTS as FINGERPRINTS
+
+
+def curves(CP):
+  # every breakpoint table controls evaluates at runtime
+  ret = {
+    'gasMax': (CP.gasMaxBP, CP.gasMaxV),
+    'brakeMax': (CP.brakeMaxBP, CP.brakeMaxV),
+    'steerMax': (CP.steerMaxBP, CP.steerMaxV),
+    'longKp': (CP.longitudinalTuning.kpBP, CP.longitudinalTuning.kpV),
+    'longKi': (CP.longitudinalTuning.kiBP, CP.longitudinalTuning.kiV),
+    'longKf': (CP.longitudinalTuning.kfBP, CP.longitudinalTuning.kfV),
+    'deadzone': (CP.longitudinalTuning.deadzoneBP, CP.longitudinalTuning.deadzoneV),
+  }
+  if CP.lateralTuning.which() == 'pid':
+    pid = CP.lateralTuning.pid
+    ret.update({'latKp': (pid.kpBP, pid.kpV), 'latKi': (pid.kiBP, pid.kiV), 'latKf': (pid.kfBP, pid.kfV)})
+  return ret
+
+
+def sample_points(xp):
+  # breakpoints, their float neighbours, midpoints and values outside the table
+  xs = [-1e9, -1., 0., 1e-9, 1e9, float('inf'), -float('inf'), float('nan')]
+  for x in xp:
+    xs += [x, math.nextafter(x, -math.inf), math.nextafter(x, math.inf)]
+  xs += [(a + b) / 2. for a, b in zip(xp[:-1], xp[1:])]
+  xs += [i * 0.37 for i in range(120)]
+  return xs
+
+
+def same(a, b):
+  return a == b or (math.isnan(a) and math.isnan(b))
+
+
+class TestInterpTable(unittest.TestCase):
+  def assertMatchesInterp(self, xp, fp, msg=None):
+    table = InterpTable(xp, fp)
+    xs = sample_points(list(xp))
+    for x in xs:
+      expected = interp(x, xp, fp)
+      actual = table(x)
+      self.assertTrue(same(expected, actual), f"{msg} x={x!r}: interp {expected!r} table {actual!r}")
+    self.assertEqual(table(xs)[:3], interp(xs, xp, fp)[:3])
+
+  def test_all_car_params(self):
+    for car_name in all_known_cars():
+      fingerprint = FINGERPRINTS[car_name][0]
+      CarInterface, _, _ = interfaces[car_name]
+      for has_relay in [True, False]:
+        CP = CarInterface.get_params(car_name, {0: fingerprint, 1: fingerprint, 2: fingerprint}, has_relay, [])
+        for name, (xp, fp) in curves(CP).items():
+          if len(xp) == 0:
+            continue
+          self.assertMatchesInterp(xp, fp, f"{car_name} {name}")
+
+  def test_edge_cases(self):
+    self.assertMatchesInterp([0.], [1.])
+    self.assertMatchesInterp([0., 20., 20.01, 30.], [0.3, .5, .65, 1.2])
+    self.assertMatchesInterp([0., 10., 10., 20.], [1., 2., 3., 4.])
+    # longer values than breakpoints, interp uses the last value above the table
+    self.assertMatchesInterp([0., 10.], [1., 2., 3.])
+    # unsorted breakpoints go through interp's linear scan
+    self.assertMatchesInterp([10., 0., 20.], [1., 2., 3.])
+
+    self.assertEqual(InterpTable([0., 1.], [0., 2.])(1), 2.)
+    with self.assertRaises(IndexError):
+      InterpTable([], [])(1.)
+
+
+if __name__ == "__main__":
+  unittest.main()
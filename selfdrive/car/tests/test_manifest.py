@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+import unittest
+
+from selfdrive.car.manifest import get_interface_names, load_manifest
+
+
+class TestManifest(unittest.TestCase):
+  def test_manifest_up_to_date(self):
+    # regenerate with selfdrive/car/manifest.py
+    self.assertEqual(load_manifest(), get_interface_names())
+
+
+if __name__ == "__main__":
+  unittest.main()
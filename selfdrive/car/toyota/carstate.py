@@ -16,7 +16,7 @@ class CarState(CarStateBase):
     # All TSS2 car have the accurate sensor
     self.accurate_steer_angle_seen = CP.carFingerprint in TSS2_CAR
 
-    # On NO_DSU cars but not TSS2 cars the cp.vl["STEER_TORQUE_SENSOR"]['STEER_ANGLE']
+    # On NO_DSU cars but not TSS2 cars the cp.STEER_TORQUE_SENSOR.STEER_ANGLE
     # is zeroed to where the steering angle is at start.
     # Need to apply an offset as soon as the steering angle measurements are both received
     self.needs_angle_offset = CP.carFingerprint not in TSS2_CAR
@@ -25,87 +25,87 @@ class CarState(CarStateBase):
   def update(self, cp, cp_cam):
     ret = car.CarState.new_message()
 
-    ret.doorOpen = any([cp.vl["SEATS_DOORS"]['DOOR_OPEN_FL'], cp.vl["SEATS_DOORS"]['DOOR_OPEN_FR'],
-                        cp.vl["SEATS_DOORS"]['DOOR_OPEN_RL'], cp.vl["SEATS_DOORS"]['DOOR_OPEN_RR']])
-    ret.seatbeltUnlatched = cp.vl["SEATS_DOORS"]['SEATBELT_DRIVER_UNLATCHED'] != 0
+    ret.doorOpen = any([cp.SEATS_DOORS.DOOR_OPEN_FL, cp.SEATS_DOORS.DOOR_OPEN_FR,
+                        cp.SEATS_DOORS.DOOR_OPEN_RL, cp.SEATS_DOORS.DOOR_OPEN_RR])
+    ret.seatbeltUnlatched = cp.SEATS_DOORS.SEATBELT_DRIVER_UNLATCHED != 0
 
-    ret.brakePressed = cp.vl["BRAKE_MODULE"]['BRAKE_PRESSED'] != 0
-    ret.brakeLights = bool(cp.vl["ESP_CONTROL"]['BRAKE_LIGHTS_ACC'] or ret.brakePressed)
+    ret.brakePressed = cp.BRAKE_MODULE.BRAKE_PRESSED != 0
+    ret.brakeLights = bool(cp.ESP_CONTROL.BRAKE_LIGHTS_ACC or ret.brakePressed)
     if self.CP.enableGasInterceptor:
-      ret.gas = (cp.vl["GAS_SENSOR"]['INTERCEPTOR_GAS'] + cp.vl["GAS_SENSOR"]['INTERCEPTOR_GAS2']) / 2.
+      ret.gas = (cp.GAS_SENSOR.INTERCEPTOR_GAS + cp.GAS_SENSOR.INTERCEPTOR_GAS2) / 2.
       ret.gasPressed = ret.gas > 15
     else:
-      ret.gas = cp.vl["GAS_PEDAL"]['GAS_PEDAL']
-      ret.gasPressed = cp.vl["PCM_CRUISE"]['GAS_RELEASED'] == 0
+      ret.gas = cp.GAS_PEDAL.GAS_PEDAL
+      ret.gasPressed = cp.PCM_CRUISE.GAS_RELEASED == 0
 
-    ret.wheelSpeeds.fl = cp.vl["WHEEL_SPEEDS"]['WHEEL_SPEED_FL'] * CV.KPH_TO_MS
-    ret.wheelSpeeds.fr = cp.vl["WHEEL_SPEEDS"]['WHEEL_SPEED_FR'] * CV.KPH_TO_MS
-    ret.wheelSpeeds.rl = cp.vl["WHEEL_SPEEDS"]['WHEEL_SPEED_RL'] * CV.KPH_TO_MS
-    ret.wheelSpeeds.rr = cp.vl["WHEEL_SPEEDS"]['WHEEL_SPEED_RR'] * CV.KPH_TO_MS
+    ret.wheelSpeeds.fl = cp.WHEEL_SPEEDS.WHEEL_SPEED_FL * CV.KPH_TO_MS
+    ret.wheelSpeeds.fr = cp.WHEEL_SPEEDS.WHEEL_SPEED_FR * CV.KPH_TO_MS
+    ret.wheelSpeeds.rl = cp.WHEEL_SPEEDS.WHEEL_SPEED_RL * CV.KPH_TO_MS
+    ret.wheelSpeeds.rr = cp.WHEEL_SPEEDS.WHEEL_SPEED_RR * CV.KPH_TO_MS
     ret.vEgoRaw = mean([ret.wheelSpeeds.fl, ret.wheelSpeeds.fr, ret.wheelSpeeds.rl, ret.wheelSpeeds.rr])
     ret.vEgo, ret.aEgo = self.update_speed_kf(ret.vEgoRaw)
 
     ret.standstill = ret.vEgoRaw < 0.001
 
     # Some newer models have a more accurate angle measurement in the TORQUE_SENSOR message. Use if non-zero
-    if abs(cp.vl["STEER_TORQUE_SENSOR"]['STEER_ANGLE']) > 1e-3:
+    if abs(cp.STEER_TORQUE_SENSOR.STEER_ANGLE) > 1e-3:
       self.accurate_steer_angle_seen = True
 
     if self.accurate_steer_angle_seen:
-      ret.steeringAngle = cp.vl["STEER_TORQUE_SENSOR"]['STEER_ANGLE'] - self.angle_offset
+      ret.steeringAngle = cp.STEER_TORQUE_SENSOR.STEER_ANGLE - self.angle_offset
 
       if self.needs_angle_offset:
-        angle_wheel = cp.vl["STEER_ANGLE_SENSOR"]['STEER_ANGLE'] + cp.vl["STEER_ANGLE_SENSOR"]['STEER_FRACTION']
+        angle_wheel = cp.STEER_ANGLE_SENSOR.STEER_ANGLE + cp.STEER_ANGLE_SENSOR.STEER_FRACTION
         if abs(angle_wheel) > 1e-3 and abs(ret.steeringAngle) > 1e-3:
           self.needs_angle_offset = False
           self.angle_offset = ret.steeringAngle - angle_wheel
     else:
-      ret.steeringAngle = cp.vl["STEER_ANGLE_SENSOR"]['STEER_ANGLE'] + cp.vl["STEER_ANGLE_SENSOR"]['STEER_FRACTION']
+      ret.steeringAngle = cp.STEER_ANGLE_SENSOR.STEER_ANGLE + cp.STEER_ANGLE_SENSOR.STEER_FRACTION
 
-    ret.steeringRate = cp.vl["STEER_ANGLE_SENSOR"]['STEER_RATE']
-    can_gear = int(cp.vl["GEAR_PACKET"]['GEAR'])
+    ret.steeringRate = cp.STEER_ANGLE_SENSOR.STEER_RATE
+    can_gear = int(cp.GEAR_PACKET.GEAR)
     ret.gearShifter = self.parse_gear_shifter(self.shifter_values.get(can_gear, None))
-    ret.leftBlinker = cp.vl["STEERING_LEVERS"]['TURN_SIGNALS'] == 1
-    ret.rightBlinker = cp.vl["STEERING_LEVERS"]['TURN_SIGNALS'] == 2
+    ret.leftBlinker = cp.STEERING_LEVERS.TURN_SIGNALS == 1
+    ret.rightBlinker = cp.STEERING_LEVERS.TURN_SIGNALS == 2
 
-    ret.steeringTorque = cp.vl["STEER_TORQUE_SENSOR"]['STEER_TORQUE_DRIVER']
-    ret.steeringTorqueEps = cp.vl["STEER_TORQUE_SENSOR"]['STEER_TORQUE_EPS']
+    ret.steeringTorque = cp.STEER_TORQUE_SENSOR.STEER_TORQUE_DRIVER
+    ret.steeringTorqueEps = cp.STEER_TORQUE_SENSOR.STEER_TORQUE_EPS
     # we could use the override bit from dbc, but it's triggered at too high torque values
     ret.steeringPressed = abs(ret.steeringTorque) > STEER_THRESHOLD
-    ret.steerWarning = cp.vl["EPS_STATUS"]['LKA_STATE'] not in [1, 5]
+    ret.steerWarning = cp.EPS_STATUS.LKA_STATE not in [1, 5]
 
     if self.CP.carFingerprint == CAR.LEXUS_IS:
-      ret.cruiseState.available = cp.vl["DSU_CRUISE"]['MAIN_ON'] != 0
-      ret.cruiseState.speed = cp.vl["DSU_CRUISE"]['SET_SPEED'] * CV.KPH_TO_MS
+      ret.cruiseState.available = cp.DSU_CRUISE.MAIN_ON != 0
+      ret.cruiseState.speed = cp.DSU_CRUISE.SET_SPEED * CV.KPH_TO_MS
       self.low_speed_lockout = False
     else:
-      ret.cruiseState.available = cp.vl["PCM_CRUISE_2"]['MAIN_ON'] != 0
-      ret.cruiseState.speed = cp.vl["PCM_CRUISE_2"]['SET_SPEED'] * CV.KPH_TO_MS
-      self.low_speed_lockout = cp.vl["PCM_CRUISE_2"]['LOW_SPEED_LOCKOUT'] == 2
-    self.pcm_acc_status = cp.vl["PCM_CRUISE"]['CRUISE_STATE']
+      ret.cruiseState.available = cp.PCM_CRUISE_2.MAIN_ON != 0
+      ret.cruiseState.speed = cp.PCM_CRUISE_2.SET_SPEED * CV.KPH_TO_MS
+      self.low_speed_lockout = cp.PCM_CRUISE_2.LOW_SPEED_LOCKOUT == 2
+    self.pcm_acc_status = cp.PCM_CRUISE.CRUISE_STATE
     if self.CP.carFingerprint in NO_STOP_TIMER_CAR or self.CP.enableGasInterceptor:
       # ignore standstill in hybrid vehicles, since pcm allows to restart without
       # receiving any special command. Also if interceptor is detected
       ret.cruiseState.standstill = False
     else:
       ret.cruiseState.standstill = self.pcm_acc_status == 7
-    ret.cruiseState.enabled = bool(cp.vl["PCM_CRUISE"]['CRUISE_ACTIVE'])
+    ret.cruiseState.enabled = bool(cp.PCM_CRUISE.CRUISE_ACTIVE)
     # TODO: CRUISE_STATE is a 4 bit signal, find any other non-adaptive cruise states
-    ret.cruiseState.nonAdaptive = cp.vl["PCM_CRUISE"]['CRUISE_STATE'] in [5]
+    ret.cruiseState.nonAdaptive = cp.PCM_CRUISE.CRUISE_STATE in [5]
 
     if self.CP.carFingerprint == CAR.PRIUS:
-      ret.genericToggle = cp.vl["AUTOPARK_STATUS"]['STATE'] != 0
+      ret.genericToggle = cp.AUTOPARK_STATUS.STATE != 0
     else:
-      ret.genericToggle = bool(cp.vl["LIGHT_STALK"]['AUTO_HIGH_BEAM'])
-    ret.stockAeb = bool(cp_cam.vl["PRE_COLLISION"]["PRECOLLISION_ACTIVE"] and cp_cam.vl["PRE_COLLISION"]["FORCE"] < -1e-5)
+      ret.genericToggle = bool(cp.LIGHT_STALK.AUTO_HIGH_BEAM)
+    ret.stockAeb = bool(cp_cam.PRE_COLLISION.PRECOLLISION_ACTIVE and cp_cam.PRE_COLLISION.FORCE < -1e-5)
 
-    ret.espDisabled = cp.vl["ESP_CONTROL"]['TC_DISABLED'] != 0
+    ret.espDisabled = cp.ESP_CONTROL.TC_DISABLED != 0
     # 2 is standby, 10 is active. TODO: check that everything else is really a faulty state
-    self.steer_state = cp.vl["EPS_STATUS"]['LKA_STATE']
+    self.steer_state = cp.EPS_STATUS.LKA_STATE
 
     if self.CP.carFingerprint in TSS2_CAR:
-      ret.leftBlindspot = (cp.vl["BSM"]['L_ADJACENT'] == 1) or (cp.vl["BSM"]['L_APPROACHING'] == 1)
-      ret.rightBlindspot = (cp.vl["BSM"]['R_ADJACENT'] == 1) or (cp.vl["BSM"]['R_APPROACHING'] == 1)
+      ret.leftBlindspot = (cp.BSM.L_ADJACENT == 1) or (cp.BSM.L_APPROACHING == 1)
+      ret.rightBlindspot = (cp.BSM.R_ADJACENT == 1) or (cp.BSM.R_APPROACHING == 1)
 
     return ret
 
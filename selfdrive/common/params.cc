@@ -8,17 +8,23 @@
 #include <stdlib.h>
 #include <unistd.h>
 #include <dirent.h>
+#include <errno.h>
+#include <poll.h>
 #include <sys/file.h>
+#include <sys/inotify.h>
 #include <sys/stat.h>
 
+#include <algorithm>
 #include <map>
 #include <string>
+#include <vector>
 #include <iostream>
 #include <csignal>
 #include <string.h>
 
 #include "common/util.h"
 #include "common/utilpp.h"
+#include "common/timing.h"
 
 
 std::string getenv_default(const char* env_var, const char * suffix, const char* default_val) {
@@ -115,24 +121,18 @@ int Params::write_db_value(std::string key, std::string dat){
 }
 
 int Params::write_db_value(const char* key, const char* value, size_t value_size) {
-  // Information about safely and atomically writing a file: https://lwn.net/Articles/457667/
-  // 1) Create temp file
-  // 2) Write data to temp file
-  // 3) fsync() the temp file
-  // 4) rename the temp file to the real name
-  // 5) fsync() the containing directory
+  return write_db_values({{std::string(key), std::string(value, value_size)}});
+}
 
-  int lock_fd = -1;
-  int tmp_fd = -1;
+static int ensure_params_d_exists(std::string params_path) {
   int result;
   std::string path;
   std::string tmp_path;
-  ssize_t bytes_written;
 
   // Make sure params path exists
   result = ensure_dir_exists(params_path);
   if (result < 0) {
-    goto cleanup;
+    return result;
   }
 
   // See if the symlink exists, otherwise create it
@@ -144,75 +144,106 @@ int Params::write_db_value(const char* key, const char* value, size_t value_size
 
     char *t = mkdtemp((char*)path.c_str());
     if (t == NULL){
-      goto cleanup;
+      return -1;
     }
     std::string tmp_dir(t);
 
     // Set permissions
     result = chmod(tmp_dir.c_str(), 0777);
     if (result < 0) {
-      goto cleanup;
+      return result;
     }
 
     // Symlink it to temp link
     tmp_path = tmp_dir + ".link";
     result = symlink(tmp_dir.c_str(), tmp_path.c_str());
     if (result < 0) {
-      goto cleanup;
+      return result;
     }
 
     // Move symlink to <params>/d
     path = params_path + "/d";
     result = rename(tmp_path.c_str(), path.c_str());
-    if (result < 0) {
-      goto cleanup;
-    }
   } else {
     // Ensure permissions are correct in case we didn't create the symlink
     result = chmod(path.c_str(), 0777);
+  }
+  return result;
+}
+
+int Params::write_db_values(const std::map<std::string, std::string> &values) {
+  // Information about safely and atomically writing a file: https://lwn.net/Articles/457667/
+  // 1) Create temp files
+  // 2) Write data to the temp files
+  // 3) fsync() the temp files
+  // 4) rename the temp files to the real names
+  // 5) fsync() the containing directory
+  // All values of a batch are renamed under one lock and share the directory fsync.
+
+  int lock_fd = -1;
+  int result = 0;
+  std::string path;
+  std::vector<std::string> tmp_paths;
+  std::vector<int> tmp_fds;
+  size_t renamed = 0;
+
+  if (values.empty()) {
+    return 0;
+  }
+
+  result = ensure_params_d_exists(params_path);
+  if (result < 0) {
+    goto cleanup;
+  }
+
+  // Write values to temp.
+  for (auto const& kv : values) {
+    std::string tmp_path = params_path + "/.tmp_value_XXXXXX";
+    int tmp_fd = mkstemp((char*)tmp_path.c_str());
+    if (tmp_fd < 0) {
+      result = -1;
+      goto cleanup;
+    }
+    tmp_paths.push_back(tmp_path);
+    tmp_fds.push_back(tmp_fd);
+
+    ssize_t bytes_written = write(tmp_fd, kv.second.data(), kv.second.size());
+    if (bytes_written < 0 || (size_t)bytes_written != kv.second.size()) {
+      result = -20;
+      goto cleanup;
+    }
+
+    // change permissions to 0666 for apks
+    result = fchmod(tmp_fd, 0666);
     if (result < 0) {
       goto cleanup;
     }
-  }
 
-  // Write value to temp.
-  tmp_path = params_path + "/.tmp_value_XXXXXX";
-  tmp_fd = mkstemp((char*)tmp_path.c_str());
-  bytes_written = write(tmp_fd, value, value_size);
-  if (bytes_written < 0 || (size_t)bytes_written != value_size) {
-    result = -20;
-    goto cleanup;
+    // fsync to force persist the changes.
+    result = fsync(tmp_fd);
+    if (result < 0) {
+      goto cleanup;
+    }
   }
 
   // Build lock path
   path = params_path + "/.lock";
   lock_fd = open(path.c_str(), O_CREAT, 0775);
 
-  // Build key path
-  path = params_path + "/d/" + std::string(key);
-
   // Take lock.
   result = flock(lock_fd, LOCK_EX);
   if (result < 0) {
     goto cleanup;
   }
 
-  // change permissions to 0666 for apks
-  result = fchmod(tmp_fd, 0666);
-  if (result < 0) {
-    goto cleanup;
-  }
-
-  // fsync to force persist the changes.
-  result = fsync(tmp_fd);
-  if (result < 0) {
-    goto cleanup;
-  }
-
-  // Move temp into place.
-  result = rename(tmp_path.c_str(), path.c_str());
-  if (result < 0) {
-    goto cleanup;
+  // Move temps into place.
+  for (auto const& kv : values) {
+    path = params_path + "/d/" + kv.first;
+    result = rename(tmp_paths[renamed].c_str(), path.c_str());
+    if (result < 0) {
+      goto cleanup;
+    }
+    renamed++;
   }
 
   // fsync parent directory
@@ -227,18 +258,23 @@ cleanup:
   if (lock_fd >= 0) {
     close(lock_fd);
   }
-  if (tmp_fd >= 0) {
-    if (result < 0) {
-      remove(tmp_path.c_str());
+  for (size_t i = 0; i < tmp_fds.size(); i++) {
+    if (result < 0 && i >= renamed) {
+      remove(tmp_paths[i].c_str());
     }
-    close(tmp_fd);
+    close(tmp_fds[i]);
   }
   return result;
 }
 
 int Params::delete_db_value(std::string key) {
+  return delete_db_values({key});
+}
+
+int Params::delete_db_values(const std::vector<std::string> &keys) {
   int lock_fd = -1;
   int result;
+  int removed = 0;
   std::string path;
 
   // Build lock path, and open lockfile
@@ -251,10 +287,14 @@ int Params::delete_db_value(std::string key) {
     goto cleanup;
   }
 
-  // Delete value.
-  path = params_path + "/d/" + key;
-  result = remove(path.c_str());
-  if (result != 0) {
+  // Delete values.
+  for (auto const& key : keys) {
+    path = params_path + "/d/" + key;
+    if (remove(path.c_str()) == 0) {
+      removed++;
+    }
+  }
+  if (removed == 0) {
     result = ERR_NO_VALUE;
     goto cleanup;
   }
@@ -308,10 +348,16 @@ int Params::read_db_value_blocking(const char* key, char** value, size_t* value_
   void (*prev_handler_sigint)(int) = std::signal(SIGINT, params_sig_handler);
   void (*prev_handler_sigterm)(int) = std::signal(SIGTERM, params_sig_handler);
 
+  // set up the watch before the first read so a write in between isn't missed
+  ParamsWatcher watcher(params_path, {key});
+
   while (!params_do_exit) {
     const int result = read_db_value(key, value, value_sz);
     if (result == 0) {
       break;
+    } else if (watcher.fd() >= 0) {
+      // the timeout only matters if the watch itself went away
+      watcher.wait(1000);
     } else {
       usleep(100000); // 0.1 s
     }
@@ -374,3 +420,84 @@ bool Params::read_db_bool(const char* param_name) {
   std::vector<char> bytes = read_db_bytes(param_name);
   return bytes.size() > 0 and bytes[0] == '1';
 }
+
+
+ParamsWatcher::ParamsWatcher(std::string path, std::vector<std::string> watch_keys)
+  : params_path(path), keys(watch_keys.begin(), watch_keys.end()) {
+  inotify_fd = inotify_init1(IN_NONBLOCK | IN_CLOEXEC);
+  if (inotify_fd < 0) return;
+
+  // d is a symlink that only shows up with the first write, watch for it being (re)created
+  ensure_dir_exists(params_path);
+  params_wd = inotify_add_watch(inotify_fd, params_path.c_str(), IN_CREATE | IN_MOVED_TO);
+  watch_d();
+}
+
+ParamsWatcher::~ParamsWatcher() {
+  if (inotify_fd >= 0) {
+    close(inotify_fd);
+  }
+}
+
+void ParamsWatcher::watch_d() {
+  if (d_wd >= 0) {
+    inotify_rm_watch(inotify_fd, d_wd);
+  }
+  // follows the symlink, values are renamed into place or removed
+  std::string path = params_path + "/d";
+  d_wd = inotify_add_watch(inotify_fd, path.c_str(), IN_MOVED_TO | IN_DELETE);
+}
+
+std::vector<std::string> ParamsWatcher::read_changed() {
+  std::set<std::string> changed;
+  char buf[4096] __attribute__((aligned(__alignof__(struct inotify_event))));
+
+  while (inotify_fd >= 0) {
+    ssize_t len = read(inotify_fd, buf, sizeof(buf));
+    if (len <= 0) break;
+
+    for (char *ptr = buf; ptr < buf + len; ptr += sizeof(struct inotify_event) + ((struct inotify_event *)ptr)->len) {
+      const struct inotify_event *event = (const struct inotify_event *)ptr;
+
+      if (event->wd == d_wd && (event->mask & IN_IGNORED)) {
+        d_wd = -1;
+      } else if (event->wd == d_wd && event->len > 0) {
+        std::string key(event->name);
+        if (keys.empty() || keys.count(key)) {
+          changed.insert(key);
+        }
+      } else if (event->wd == params_wd && event->len > 0 && strcmp(event->name, "d") == 0) {
+        // new d directory, every key may have changed
+        watch_d();
+        if (keys.empty()) {
+          changed.insert("");
+        } else {
+          changed.insert(keys.begin(), keys.end());
+        }
+      }
+    }
+  }
+  changed.erase("");
+  return std::vector<std::string>(changed.begin(), changed.end());
+}
+
+std::vector<std::string> ParamsWatcher::wait(int timeout_ms) {
+  std::vector<std::string> changed = read_changed();
+  if (inotify_fd < 0) return changed;
+
+  const double deadline = millis_since_boot() + timeout_ms;
+  while (changed.empty()) {
+    if (d_wd < 0) {
+      watch_d();
+    }
+
+    int remaining = timeout_ms < 0 ? -1 : std::max(0, (int)(deadline - millis_since_boot()));
+    struct pollfd pfd = {.fd = inotify_fd, .events = POLLIN};
+    int ret = poll(&pfd, 1, remaining);
+    if (ret <= 0) break;  // timeout or signal
+
+    // events for other keys don't end the wait
+    changed = read_changed();
+  }
+  return changed;
+}
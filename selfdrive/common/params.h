@@ -1,6 +1,7 @@
 #pragma once
 #include <stddef.h>
 #include <map>
+#include <set>
 #include <string>
 #include <vector>
 
@@ -17,6 +18,10 @@ public:
   int write_db_value(std::string key, std::string dat);
   int write_db_value(const char* key, const char* value, size_t value_size);
 
+  // Writes several values under one lock with a single fsync of the params directory.
+  // Each key ends up with either its old or its new value, the batch as a whole isn't atomic.
+  int write_db_values(const std::map<std::string, std::string> &values);
+
   // Reads a value from the params database.
   // Inputs:
   //  key: The key to read.
@@ -33,6 +38,9 @@ public:
   // Delete a value from the params database.
   // Inputs are the same as read_db_value, without value and value_sz.
   int delete_db_value(std::string key);
+  // Deletes several values under one lock with a single fsync of the params directory.
+  // Returns ERR_NO_VALUE if none of them existed.
+  int delete_db_values(const std::vector<std::string> &keys);
 
   // Reads a value from the params database, blocking until successful.
   // Inputs are the same as read_db_value.
@@ -43,4 +51,31 @@ public:
   bool read_db_bool(const char* param_name);
 
   std::string get(std::string key, bool block=false);
+  std::string get_params_path() { return params_path; }
+};
+
+// Change notification for a set of keys, backed by inotify on the params d directory.
+// fd() becomes readable when any of the keys is written or deleted, an empty key set watches all keys.
+class ParamsWatcher {
+private:
+  std::string params_path;
+  std::set<std::string> keys;
+  int inotify_fd = -1;
+  int params_wd = -1;
+  int d_wd = -1;
+
+  void watch_d();
+
+public:
+  ParamsWatcher(std::string path, std::vector<std::string> watch_keys);
+  ~ParamsWatcher();
+
+  int fd() { return inotify_fd; }
+
+  // Drains pending events without blocking and returns the watched keys that changed.
+  std::vector<std::string> read_changed();
+
+  // Waits up to timeout_ms (-1 waits forever) for a watched key to change.
+  // Returns early with no keys when interrupted by a signal.
+  std::vector<std::string> wait(int timeout_ms);
 };
@@ -3,12 +3,14 @@ import os
 from cereal import car, log
 from common.hardware import HARDWARE
 from common.numpy_fast import clip
-from common.realtime import sec_since_boot, config_realtime_process, Priority, Ratekeeper, DT_CTRL
+from common.realtime import sec_since_boot, config_realtime_process, Ratekeeper, DT_CTRL, LOOP_TIMING_INTERVAL
 from common.profiler import Profiler
 from common.params import Params, put_nonblocking
 import cereal.messaging as messaging
 from selfdrive.config import Conversions as CV
-from selfdrive.boardd.boardd import can_list_to_can_capnp
+from selfdrive.cpu_isolation import PLACEMENTS
+from selfdrive.swaglog import cloudlog
+from opendbc.can.packer import frames_to_sendcan
 from selfdrive.car.car_helpers import get_car, get_startup_event, get_one_can
 from selfdrive.controls.lib.lane_planner import CAMERA_OFFSET
 from selfdrive.controls.lib.drive_helpers import update_v_cruise, initialize_v_cruise
@@ -39,10 +41,81 @@ LaneChangeState = log.PathPlan.LaneChangeState
 LaneChangeDirection = log.PathPlan.LaneChangeDirection
 EventName = car.CarEvent.EventName
 
+SOFT_DISABLE_TIME = 300  # 3s
+
+
+def state_transition(state, events, soft_disable_timer):
+  """Next openpilot state and soft disable timer for this frame's events, and the alert types to create.
+
+     ET.ENABLE is among the alert types exactly when openpilot engages.
+  """
+  # decrease the soft disable timer at every step, as it's reset on
+  # entrance in SOFT_DISABLING state
+  soft_disable_timer = max(0, soft_disable_timer - 1)
+
+  alert_types = [ET.PERMANENT]
+
+  # ENABLED, PRE ENABLING, SOFT DISABLING
+  if state != State.disabled:
+    # user and immediate disable always have priority in a non-disabled state
+    if events.any(ET.USER_DISABLE):
+      state = State.disabled
+      alert_types.append(ET.USER_DISABLE)
+
+    elif events.any(ET.IMMEDIATE_DISABLE):
+      state = State.disabled
+      alert_types.append(ET.IMMEDIATE_DISABLE)
+
+    else:
+      # ENABLED
+      if state == State.enabled:
+        if events.any(ET.SOFT_DISABLE):
+          state = State.softDisabling
+          soft_disable_timer = SOFT_DISABLE_TIME
+          alert_types.append(ET.SOFT_DISABLE)
+
+      # SOFT DISABLING
+      elif state == State.softDisabling:
+        if not events.any(ET.SOFT_DISABLE):
+          # no more soft disabling condition, so go back to ENABLED
+          state = State.enabled
+
+        elif events.any(ET.SOFT_DISABLE) and soft_disable_timer > 0:
+          alert_types.append(ET.SOFT_DISABLE)
+
+        elif soft_disable_timer <= 0:
+          state = State.disabled
+
+      # PRE ENABLING
+      elif state == State.preEnabled:
+        if not events.any(ET.PRE_ENABLE):
+          state = State.enabled
+        else:
+          alert_types.append(ET.PRE_ENABLE)
+
+  # DISABLED
+  elif state == State.disabled:
+    if events.any(ET.ENABLE):
+      if events.any(ET.NO_ENTRY):
+        alert_types.append(ET.NO_ENTRY)
+
+      else:
+        if events.any(ET.PRE_ENABLE):
+          state = State.preEnabled
+        else:
+          state = State.enabled
+        alert_types.append(ET.ENABLE)
+
+  # Check if actuators are enabled
+  if state == State.enabled or state == State.softDisabling:
+    alert_types.append(ET.WARNING)
+
+  return state, soft_disable_timer, alert_types
+
 
 class Controls:
   def __init__(self, sm=None, pm=None, can_sock=None):
-    config_realtime_process(3, Priority.CTRL_HIGH)
+    config_realtime_process(*PLACEMENTS['controlsd'])
 
     # Setup sockets
     self.pm = pm
@@ -113,6 +186,7 @@ class Controls:
     self.enabled = False
     self.active = False
     self.can_rcv_error = False
+    self.can_invalid = False
     self.soft_disable_timer = 0
     self.v_cruise_kph = 255
     self.v_cruise_kph_last = 0
@@ -145,7 +219,7 @@ class Controls:
       self.events.add(EventName.whitePandaUnsupported, static=True)
 
     # controlsd is driven by can recv, expected at 100Hz
-    self.rk = Ratekeeper(100, print_delay_threshold=None)
+    self.rk = Ratekeeper(100, print_delay_threshold=None, timing_interval=LOOP_TIMING_INTERVAL)
     self.prof = Profiler(False)  # off by default
 
   def update_events(self, CS):
@@ -203,8 +277,13 @@ class Controls:
                                                  LaneChangeState.laneChangeFinishing]:
       self.events.add(EventName.laneChange)
 
-    if self.can_rcv_error or (not CS.canValid and self.sm.frame > 5 / DT_CTRL):
+    can_invalid = not CS.canValid and self.sm.frame > 5 / DT_CTRL
+    if self.can_rcv_error or can_invalid:
       self.events.add(EventName.canError)
+    if can_invalid and not self.can_invalid:
+      # once per dropout, which messages timed out
+      cloudlog.event("can_invalid", messages=self.CI.invalid_can_messages())
+    self.can_invalid = can_invalid
     if self.mismatch_counter >= 200:
       self.events.add(EventName.controlsMismatch)
     if not self.sm.alive['plan'] and self.sm.alive['pathPlan']:
@@ -289,68 +368,14 @@ class Controls:
     elif self.CP.enableCruise and CS.cruiseState.enabled:
       self.v_cruise_kph = CS.cruiseState.speed * CV.MS_TO_KPH
 
-    # decrease the soft disable timer at every step, as it's reset on
-    # entrance in SOFT_DISABLING state
-    self.soft_disable_timer = max(0, self.soft_disable_timer - 1)
-
-    self.current_alert_types = [ET.PERMANENT]
-
-    # ENABLED, PRE ENABLING, SOFT DISABLING
-    if self.state != State.disabled:
-      # user and immediate disable always have priority in a non-disabled state
-      if self.events.any(ET.USER_DISABLE):
-        self.state = State.disabled
-        self.current_alert_types.append(ET.USER_DISABLE)
-
-      elif self.events.any(ET.IMMEDIATE_DISABLE):
-        self.state = State.disabled
-        self.current_alert_types.append(ET.IMMEDIATE_DISABLE)
-
-      else:
-        # ENABLED
-        if self.state == State.enabled:
-          if self.events.any(ET.SOFT_DISABLE):
-            self.state = State.softDisabling
-            self.soft_disable_timer = 300   # 3s
-            self.current_alert_types.append(ET.SOFT_DISABLE)
-
-        # SOFT DISABLING
-        elif self.state == State.softDisabling:
-          if not self.events.any(ET.SOFT_DISABLE):
-            # no more soft disabling condition, so go back to ENABLED
-            self.state = State.enabled
-
-          elif self.events.any(ET.SOFT_DISABLE) and self.soft_disable_timer > 0:
-            self.current_alert_types.append(ET.SOFT_DISABLE)
-
-          elif self.soft_disable_timer <= 0:
-            self.state = State.disabled
-
-        # PRE ENABLING
-        elif self.state == State.preEnabled:
-          if not self.events.any(ET.PRE_ENABLE):
-            self.state = State.enabled
-          else:
-            self.current_alert_types.append(ET.PRE_ENABLE)
-
-    # DISABLED
-    elif self.state == State.disabled:
-      if self.events.any(ET.ENABLE):
-        if self.events.any(ET.NO_ENTRY):
-          self.current_alert_types.append(ET.NO_ENTRY)
+    self.state, self.soft_disable_timer, self.current_alert_types = \
+      state_transition(self.state, self.events, self.soft_disable_timer)
 
-        else:
-          if self.events.any(ET.PRE_ENABLE):
-            self.state = State.preEnabled
-          else:
-            self.state = State.enabled
-          self.current_alert_types.append(ET.ENABLE)
-          self.v_cruise_kph = initialize_v_cruise(CS.vEgo, CS.buttonEvents, self.v_cruise_kph_last)
+    if ET.ENABLE in self.current_alert_types:
+      self.v_cruise_kph = initialize_v_cruise(CS.vEgo, CS.buttonEvents, self.v_cruise_kph_last)
 
     # Check if actuators are enabled
     self.active = self.state == State.enabled or self.state == State.softDisabling
-    if self.active:
-      self.current_alert_types.append(ET.WARNING)
 
     # Check if openpilot is engaged
     self.enabled = self.active or self.state == State.preEnabled
@@ -461,7 +486,7 @@ class Controls:
     if not self.read_only:
       # send car controls over can
       can_sends = self.CI.apply(CC)
-      self.pm.send('sendcan', can_list_to_can_capnp(can_sends, msgtype='sendcan', valid=CS.canValid))
+      self.pm.send('sendcan', frames_to_sendcan(can_sends, valid=CS.canValid))
 
     force_decel = (self.sm['dMonitoringState'].awarenessStatus < 0.) or \
                   (self.state == State.softDisabling)
@@ -579,6 +604,10 @@ class Controls:
       self.rk.monitor_time()
       self.prof.display()
 
+      timing = self.rk.pop_timing()
+      if timing is not None:
+        cloudlog.event("loop_timing", **timing)
+
 def main(sm=None, pm=None, logcan=None):
   controls = Controls(sm, pm, logcan)
   controls.controlsd_thread()
@@ -1,7 +1,8 @@
 import os
 import copy
 import json
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
 
 from cereal import car, log
 from common.basedir import BASEDIR
@@ -26,10 +27,30 @@ def set_offroad_alert(alert: str, show_alert: bool, extra_text: Optional[str] =
     Params().delete(alert)
 
 
+class ActiveAlert():
+  """An alert in the AlertManager heap, ordered by priority and then by start time, newest first."""
+  def __init__(self, alert: Alert, start_time: float, seq: int):
+    self.idx = -1
+    self.update(alert, start_time, seq)
+
+  def update(self, alert: Alert, start_time: float, seq: int) -> None:
+    self.alert = alert
+    self.start_time = start_time
+    self.end_time = start_time + max(alert.duration_sound, alert.duration_hud_alert, alert.duration_text)
+    # seq breaks ties between alerts added in the same frame, the first one added wins
+    self.key = (-alert.alert_priority, -start_time, seq)
+
+
 class AlertManager:
 
   def __init__(self):
-    self.activealerts: List[Alert] = []
+    # indexed min-heap of the active alerts, one entry per alert type that is updated in place
+    self.heap: List[ActiveAlert] = []
+    self.alerts: Dict[str, ActiveAlert] = {}
+    self.event_types: Dict[Optional[str], Set[str]] = defaultdict(set)
+    self.seq = 0
+
+    self.current_alert: Optional[Alert] = None
     self.clear_current_alert()
 
   def clear_current_alert(self) -> None:
@@ -42,42 +63,98 @@ class AlertManager:
     self.audible_alert = car.CarControl.HUDControl.AudibleAlert.none
     self.alert_rate: float = 0.
 
+  def _swap(self, i: int, j: int) -> None:
+    h = self.heap
+    h[i], h[j] = h[j], h[i]
+    h[i].idx = i
+    h[j].idx = j
+
+  def _sift_up(self, i: int) -> None:
+    h = self.heap
+    while i > 0:
+      parent = (i - 1) // 2
+      if h[i].key >= h[parent].key:
+        break
+      self._swap(i, parent)
+      i = parent
+
+  def _sift_down(self, i: int) -> None:
+    h = self.heap
+    n = len(h)
+    while True:
+      smallest = i
+      for child in (2 * i + 1, 2 * i + 2):
+        if child < n and h[child].key < h[smallest].key:
+          smallest = child
+      if smallest == i:
+        break
+      self._swap(i, smallest)
+      i = smallest
+
+  def _remove(self, alert_type: str) -> None:
+    entry = self.alerts.pop(alert_type)
+    self.event_types[entry.alert.event_type].discard(alert_type)
+
+    last = self.heap.pop()
+    if last is not entry:
+      self.heap[entry.idx] = last
+      last.idx = entry.idx
+      self._sift_up(last.idx)
+      self._sift_down(last.idx)
+
   def add_many(self, frame: int, alerts: List[Alert], enabled: bool = True) -> None:
+    start_time = frame * DT_CTRL
     for alert in alerts:
-      added_alert = copy.copy(alert)
-      added_alert.start_time = frame * DT_CTRL
-
       # if new alert is higher priority, log it
-      if not len(self.activealerts) or added_alert.alert_priority > self.activealerts[0].alert_priority:
-        cloudlog.event('alert_add', alert_type=added_alert.alert_type, enabled=enabled)
-
-      self.activealerts.append(added_alert)
+      if self.current_alert is None or alert.alert_priority > self.current_alert.alert_priority:
+        cloudlog.event('alert_add', alert_type=alert.alert_type, enabled=enabled)
+      if self.current_alert is None:
+        self.current_alert = alert
+
+      entry = self.alerts.get(alert.alert_type)
+      if entry is None:
+        entry = ActiveAlert(alert, start_time, self.seq)
+        entry.idx = len(self.heap)
+        self.heap.append(entry)
+        self.alerts[alert.alert_type] = entry
+        self.event_types[alert.event_type].add(alert.alert_type)
+      elif entry.start_time != start_time:
+        # only the newest copy of an alert type can be current, so refresh it in place
+        entry.update(alert, start_time, self.seq)
+      else:
+        continue
+
+      self.seq += 1
+      self._sift_up(entry.idx)
+      self._sift_down(entry.idx)
 
   def process_alerts(self, frame: int, clear_event_type=None) -> None:
     cur_time = frame * DT_CTRL
 
-    # first get rid of all the expired alerts
-    self.activealerts = [a for a in self.activealerts if a.event_type != clear_event_type and
-                         a.start_time + max(a.duration_sound, a.duration_hud_alert, a.duration_text) > cur_time]
+    for alert_type in list(self.event_types.get(clear_event_type, ())):
+      self._remove(alert_type)
 
-    # sort by priority first and then by start_time
-    self.activealerts.sort(key=lambda k: (k.alert_priority, k.start_time), reverse=True)
+    # expired alerts are only dropped once they reach the top
+    while len(self.heap) and self.heap[0].end_time <= cur_time:
+      self._remove(self.heap[0].alert.alert_type)
 
     # start with assuming no alerts
     self.clear_current_alert()
+    self.current_alert = None
 
-    if len(self.activealerts):
-      current_alert = self.activealerts[0]
+    if len(self.heap):
+      current = self.heap[0]
+      current_alert = self.current_alert = current.alert
 
       self.alert_type = current_alert.alert_type
 
-      if current_alert.start_time + current_alert.duration_sound > cur_time:
+      if current.start_time + current_alert.duration_sound > cur_time:
         self.audible_alert = current_alert.audible_alert
 
-      if current_alert.start_time + current_alert.duration_hud_alert > cur_time:
+      if current.start_time + current_alert.duration_hud_alert > cur_time:
         self.visual_alert = current_alert.visual_alert
 
-      if current_alert.start_time + current_alert.duration_text > cur_time:
+      if current.start_time + current_alert.duration_text > cur_time:
         self.alert_text_1 = current_alert.alert_text_1
         self.alert_text_2 = current_alert.alert_text_2
         self.alert_status = current_alert.alert_status
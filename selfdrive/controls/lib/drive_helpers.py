@@ -1,4 +1,4 @@
-from common.numpy_fast import clip, interp
+from common.numpy_fast import clip
 from selfdrive.config import Conversions as CV
 from cereal import car
 
@@ -37,10 +37,6 @@ def rate_limit(new_value, last_value, dw_step, up_step):
   return clip(new_value, last_value + dw_step, last_value + up_step)
 
 
-def get_steer_max(CP, v_ego):
-  return interp(v_ego, CP.steerMaxBP, CP.steerMaxV)
-
-
 def update_v_cruise(v_cruise_kph, v_ego, gas_pressed, buttonEvents, enabled, metric):
   # handle button presses. TODO: this should be in state_control, but a decelCruise press
   # would have the effect of both enabling and changing speed is checked after the state transition
@@ -0,0 +1,63 @@
+from common.realtime import sec_since_boot
+from selfdrive.controls.lib.lateral_mpc import libmpc_py
+from selfdrive.controls.lib.drive_helpers import MPC_COST_LAT
+
+
+class WarmStart:
+  REUSE = 0  # start from the last solution as is
+  SHIFT = 1  # start from the last solution shifted one step
+  COLD = 2  # start from the initial guess every solve
+
+
+class LateralMpc():
+  def __init__(self, steer_rate_cost, path_cost=MPC_COST_LAT.PATH):
+    self.libmpc = libmpc_py.libmpc
+    self.steer_rate_cost = steer_rate_cost
+    self.path_cost = path_cost
+    self.libmpc.init(self.path_cost, MPC_COST_LAT.LANE, MPC_COST_LAT.HEADING, self.steer_rate_cost)
+
+    self.solution = libmpc_py.ffi.new("log_t *")
+    self.cur_state = libmpc_py.ffi.new("state_t *")
+    self.cur_state[0].x = 0.0
+    self.cur_state[0].y = 0.0
+    self.cur_state[0].psi = 0.0
+    self.cur_state[0].delta = 0.0
+
+    # reused every cycle, so cffi doesn't allocate arrays from python lists on each call
+    self.l_poly = libmpc_py.ffi.new("double[4]")
+    self.r_poly = libmpc_py.ffi.new("double[4]")
+    self.d_poly = libmpc_py.ffi.new("double[4]")
+
+    self.warm_start = WarmStart.REUSE
+
+    # profiling of the last solve
+    self.qp_iterations = 0
+    self.calculation_time = 0  # ns
+
+  def set_path_cost(self, path_cost):
+    # the weights only depend on the lane change state, skip the call when nothing changed
+    if path_cost != self.path_cost:
+      self.path_cost = path_cost
+      self.libmpc.init_weights(self.path_cost, MPC_COST_LAT.LANE, MPC_COST_LAT.HEADING, self.steer_rate_cost)
+
+  def set_warm_start(self, warm_start):
+    if warm_start != self.warm_start:
+      self.warm_start = warm_start
+      self.libmpc.set_warm_start(warm_start)
+
+  def reset(self):
+    self.libmpc.reset_solution()
+
+  def run(self, l_poly, r_poly, d_poly, l_prob, r_prob, curvature_factor, v_ref, lane_width):
+    """Solve once from cur_state, returns True if the solution contains NaNs."""
+    self.l_poly[0:4] = l_poly
+    self.r_poly[0:4] = r_poly
+    self.d_poly[0:4] = d_poly
+
+    t = sec_since_boot()
+    self.qp_iterations = max(0, self.libmpc.run_mpc(self.cur_state, self.solution,
+                                                    self.l_poly, self.r_poly, self.d_poly,
+                                                    l_prob, r_prob, curvature_factor, v_ref, lane_width))
+    self.calculation_time = int((sec_since_boot() - t) * 1e9)
+
+    return bool(self.solution[0].has_nans)
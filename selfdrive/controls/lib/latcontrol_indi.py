@@ -5,9 +5,9 @@ from cereal import log
 from common.op_params import opParams
 from common.realtime import DT_CTRL
 from common.numpy_fast import clip
+from common.interp_table import InterpTable  # pylint: disable=no-name-in-module, import-error
 from selfdrive.car.toyota.values import SteerLimitParams
 from selfdrive.car import apply_toyota_steer_torque_limits
-from selfdrive.controls.lib.drive_helpers import get_steer_max
 
 
 class LatControlINDI():
@@ -43,6 +43,7 @@ class LatControlINDI():
 
     self.sat_count_rate = 1.0 * DT_CTRL
     self.sat_limit = CP.steerLimitTimer
+    self.get_steer_max = InterpTable(CP.steerMaxBP, CP.steerMaxV)
 
     self.reset()
 
@@ -114,7 +115,7 @@ class LatControlINDI():
       else:
         self.output_steer = self.delayed_output + delta_u
 
-      steers_max = get_steer_max(CP, CS.vEgo)
+      steers_max = self.get_steer_max(CS.vEgo)
       self.output_steer = clip(self.output_steer, -steers_max, steers_max)
 
       indi_log.active = True
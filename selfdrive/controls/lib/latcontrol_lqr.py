@@ -1,6 +1,6 @@
 import numpy as np
-from selfdrive.controls.lib.drive_helpers import get_steer_max
 from common.numpy_fast import clip
+from common.interp_table import InterpTable  # pylint: disable=no-name-in-module, import-error
 from common.realtime import DT_CTRL
 from cereal import log
 
@@ -23,6 +23,7 @@ class LatControlLQR():
 
     self.sat_count_rate = 1.0 * DT_CTRL
     self.sat_limit = CP.steerLimitTimer
+    self.get_steer_max = InterpTable(CP.steerMaxBP, CP.steerMaxV)
 
     self.reset()
 
@@ -46,7 +47,7 @@ class LatControlLQR():
   def update(self, active, CS, CP, path_plan):
     lqr_log = log.ControlsState.LateralLQRState.new_message()
 
-    steers_max = get_steer_max(CP, CS.vEgo)
+    steers_max = self.get_steer_max(CS.vEgo)
     torque_scale = (0.45 + CS.vEgo / 60.0)**2  # Scale actuator model with speed
 
     steering_angle = CS.steeringAngle
@@ -1,5 +1,5 @@
 from selfdrive.controls.lib.pid import PIController
-from selfdrive.controls.lib.drive_helpers import get_steer_max
+from common.interp_table import InterpTable  # pylint: disable=no-name-in-module, import-error
 from cereal import car
 from cereal import log
 
@@ -11,6 +11,7 @@ class LatControlPID():
                             (CP.lateralTuning.pid.kfBP, CP.lateralTuning.pid.kfV),
                              pos_limit=1.0, neg_limit=-1.0, sat_limit=CP.steerLimitTimer)
     self.angle_steers_des = 0.
+    self.get_steer_max = InterpTable(CP.steerMaxBP, CP.steerMaxV)
 
   def reset(self):
     self.pid.reset()
@@ -27,7 +28,7 @@ class LatControlPID():
     else:
       self.angle_steers_des = path_plan.angleSteers  # get from MPC/PathPlanner
 
-      steers_max = get_steer_max(CP, CS.vEgo)
+      steers_max = self.get_steer_max(CS.vEgo)
       self.pid.pos_limit = steers_max
       self.pid.neg_limit = -steers_max
       steer_feedforward = self.angle_steers_des   # feedforward desired angle
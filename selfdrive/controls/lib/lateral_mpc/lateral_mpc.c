@@ -2,6 +2,7 @@
 #include "acado_auxiliary_functions.h"
 
 #include <stdio.h>
+#include <math.h>
 
 #define NX          ACADO_NX  /* Number of differential state variables.  */
 #define NXA         ACADO_NXA /* Number of algebraic variables. */
@@ -28,8 +29,35 @@ typedef struct {
   double delta[N+1];
   double rate[N];
   double cost;
+  int has_nans;
 } log_t;
 
+// What run_mpc starts the next solve from
+#define WARM_START_REUSE 0  // last solution as is
+#define WARM_START_SHIFT 1  // last solution shifted by one step
+#define WARM_START_COLD  2  // initial guess, as after init
+
+static int warm_start = WARM_START_REUSE;
+
+static void init_guess(){
+  int    i;
+
+  /* Initialize the states and controls. */
+  for (i = 0; i < NX * (N + 1); ++i)  acadoVariables.x[ i ] = 0.0;
+  for (i = 0; i < NU * N; ++i)  acadoVariables.u[ i ] = 0.1;
+
+  /* Initialize the measurements/reference. */
+  for (i = 0; i < NY * N; ++i)  acadoVariables.y[ i ] = 0.0;
+  for (i = 0; i < NYN; ++i)  acadoVariables.yN[ i ] = 0.0;
+
+  /* MPC: initialize the current state feedback. */
+  for (i = 0; i < NX; ++i) acadoVariables.x0[ i ] = 0.0;
+}
+
+void set_warm_start(int mode){
+  warm_start = mode;
+}
+
 void init_weights(double pathCost, double laneCost, double headingCost, double steerRateCost){
   int    i;
   const int STEP_MULTIPLIER = 3;
@@ -54,22 +82,16 @@ void init_weights(double pathCost, double laneCost, double headingCost, double s
 
 void init(double pathCost, double laneCost, double headingCost, double steerRateCost){
   acado_initializeSolver();
-  int    i;
-
-  /* Initialize the states and controls. */
-  for (i = 0; i < NX * (N + 1); ++i)  acadoVariables.x[ i ] = 0.0;
-  for (i = 0; i < NU * N; ++i)  acadoVariables.u[ i ] = 0.1;
-
-  /* Initialize the measurements/reference. */
-  for (i = 0; i < NY * N; ++i)  acadoVariables.y[ i ] = 0.0;
-  for (i = 0; i < NYN; ++i)  acadoVariables.yN[ i ] = 0.0;
-
-  /* MPC: initialize the current state feedback. */
-  for (i = 0; i < NX; ++i) acadoVariables.x0[ i ] = 0.0;
-
+  init_guess();
   init_weights(pathCost, laneCost, headingCost, steerRateCost);
 }
 
+// Recover from a bad solve, keeps the weights set by init/init_weights
+void reset_solution(){
+  acado_initializeSolver();
+  init_guess();
+}
+
 int run_mpc(state_t * x0, log_t * solution,
              double l_poly[4], double r_poly[4], double d_poly[4],
              double l_prob, double r_prob, double curvature_factor, double v_ref, double lane_width){
@@ -107,6 +129,10 @@ int run_mpc(state_t * x0, log_t * solution,
   acadoVariables.x0[2] = x0->psi;
   acadoVariables.x0[3] = x0->delta;
 
+  if (warm_start == WARM_START_COLD){
+    for (i = 0; i < NX * (N + 1); ++i)  acadoVariables.x[ i ] = 0.0;
+    for (i = 0; i < NU * N; ++i)  acadoVariables.u[ i ] = 0.1;
+  }
 
   acado_preparationStep();
   acado_feedbackStep();
@@ -114,6 +140,7 @@ int run_mpc(state_t * x0, log_t * solution,
   /* printf("lat its: %d\n", acado_getNWSR());  // n iterations
   printf("Objective: %.6f\n", acado_getObjective());  // solution cost */
 
+  solution->has_nans = 0;
   for (i = 0; i <= N; i++){
     solution->x[i] = acadoVariables.x[i*NX];
     solution->y[i] = acadoVariables.x[i*NX+1];
@@ -122,13 +149,18 @@ int run_mpc(state_t * x0, log_t * solution,
     if (i < N){
       solution->rate[i] = acadoVariables.u[i];
     }
+    if (isnan(solution->delta[i])){
+      solution->has_nans = 1;
+    }
   }
   solution->cost = acado_getObjective();
 
-  // Dont shift states here. Current solution is closer to next timestep than if
+  // By default don't shift states here. Current solution is closer to next timestep than if
   // we use the old solution as a starting point
-  //acado_shiftStates(2, 0, 0);
-  //acado_shiftControls( 0 );
+  if (warm_start == WARM_START_SHIFT){
+    acado_shiftStates(2, 0, 0);
+    acado_shiftControls( 0 );
+  }
 
   return acado_getNWSR();
 }
@@ -19,10 +19,13 @@ typedef struct {
     double delta[21];
     double rate[20];
     double cost;
+    int has_nans;
 } log_t;
 
 void init(double pathCost, double laneCost, double headingCost, double steerRateCost);
 void init_weights(double pathCost, double laneCost, double headingCost, double steerRateCost);
+void reset_solution();
+void set_warm_start(int mode);
 int run_mpc(state_t * x0, log_t * solution,
              double l_poly[4], double r_poly[4], double d_poly[4],
              double l_prob, double r_prob, double curvature_factor, double v_ref, double lane_width);
@@ -18,6 +18,12 @@ TrY = [1., 1.2, 1.8, 1.3, 1.2,  1., .85]
 BpvlTr = [-20. , -10., -3., -1.5, -.8, 2.5]
 TrvlY = [  1.8,  2.8, 2.5, 2.2,  1.6, 0.8]
 
+# a solve is reused while its inputs stay this close: v_ego, a_ego, x_lead, v_lead, a_lead, a_lead_tau, TR
+REUSE_TOLERANCE = [0.01, 0.01, 0.05, 0.01, 0.02, 0.01, 0.002]
+SETTLED_TOLERANCE = 0.005  # each solve is one sqp iteration, only reuse once v_mpc and a_mpc stopped moving
+MAX_REUSE = 10  # cycles before solving again anyway
+REPORT_INTERVAL = 60.  # s
+
 class LongitudinalMpc():
   def __init__(self, mpc_id):
     self.mpc_id = mpc_id
@@ -35,6 +41,11 @@ class LongitudinalMpc():
     self.last_TR = 1.8
     self.last_cloudlog_t = 0.0
 
+    self.a_lead = 0.0
+    self.TR = self.last_TR
+    self.has_solution = True  # False while skipped by the scheduler, see LongitudinalMpcScheduler
+    self.needs_init = False
+
   def send_mpc_solution(self, pm, qp_iterations, calculation_time):
     qp_iterations = max(0, qp_iterations)
     dat = messaging.new_message('liveLongitudinalMpc')
@@ -66,8 +77,11 @@ class LongitudinalMpc():
     self.cur_state[0].a_ego = a
 
   def update(self, pm, CS, lead):
-    v_ego = CS.vEgo
+    self.update_lead(CS.vEgo, lead)
+    self.run(pm, CS)
 
+  def update_lead(self, v_ego, lead):
+    """Sets up the lead and follow distance for the next solve, initializing the mpc on a new lead"""
     # Setup current mpc state
     self.cur_state[0].x_ego = 0.0
 
@@ -82,9 +96,10 @@ class LongitudinalMpc():
 
       self.a_lead_tau = lead.aLeadTau
       self.new_lead = False
-      if not self.prev_lead_status or abs(x_lead - self.prev_lead_x) > 2.5:
+      if not self.prev_lead_status or abs(x_lead - self.prev_lead_x) > 2.5 or self.needs_init:
         self.libmpc.init_with_simulation(self.v_mpc, x_lead, v_lead, a_lead, self.a_lead_tau)
         self.new_lead = True
+        self.needs_init = False
 
       self.prev_lead_status = True
       self.prev_lead_x = x_lead
@@ -100,8 +115,7 @@ class LongitudinalMpc():
       self.v_lead = 0.
       self.x_lead = 0.
 
-    # Calculate mpc
-    t = sec_since_boot()
+    # Calculate follow distance
     maxTR = interp(v_ego, BpTr, TrY)
     if v_ego < 25. or self.x_lead < 25.:
       maxTR = max(maxTR, interp((self.v_lead - v_ego), BpvlTr, TrvlY))
@@ -128,7 +142,35 @@ class LongitudinalMpc():
       TR = clip(TR, 0.25, maxTR)
     self.last_TR = TR
 
-    n_its = self.libmpc.run_mpc(self.cur_state, self.mpc_solution, self.a_lead_tau, a_lead, TR)
+    self.a_lead = a_lead
+    self.TR = TR
+
+  def inputs(self):
+    """Everything the next solve depends on, besides the warm start"""
+    return (self.cur_state[0].v_ego, self.cur_state[0].a_ego, self.cur_state[0].x_l, self.cur_state[0].v_l,
+            self.a_lead, self.a_lead_tau, self.TR)
+
+  def copy_solution(self, other):
+    """Takes the solution of an mpc following the same lead, the next own solve starts from scratch"""
+    self.v_mpc = other.v_mpc
+    self.a_mpc = other.a_mpc
+    self.v_mpc_future = other.v_mpc_future
+    self.prev_lead_status = other.prev_lead_status
+    self.prev_lead_x = other.prev_lead_x
+    self.new_lead = False
+    self.v_lead = other.v_lead
+    self.x_lead = other.x_lead
+    self.a_lead_tau = other.a_lead_tau
+    self.last_TR = other.last_TR
+    self.has_solution = other.has_solution
+    self.needs_init = True
+
+  def run(self, pm, CS):
+    v_ego = CS.vEgo
+
+    # Calculate mpc
+    t = sec_since_boot()
+    n_its = self.libmpc.run_mpc(self.cur_state, self.mpc_solution, self.a_lead_tau, self.a_lead, self.TR)
     duration = int((sec_since_boot() - t) * 1e9)
 
     if LOG_MPC:
@@ -138,6 +180,7 @@ class LongitudinalMpc():
     self.v_mpc = self.mpc_solution[0].v_ego[1]
     self.a_mpc = self.mpc_solution[0].a_ego[1]
     self.v_mpc_future = self.mpc_solution[0].v_ego[10]
+    self.has_solution = True
 
     # Reset if NaN or goes through lead car
     crashing = any(lead - ego < -50 for (lead, ego) in zip(self.mpc_solution[0].x_l, self.mpc_solution[0].x_ego))
@@ -157,3 +200,92 @@ class LongitudinalMpc():
       self.v_mpc = v_ego
       self.a_mpc = CS.aEgo
       self.prev_lead_status = False
+
+
+def same_lead(lead, other):
+  return lead.status and other.status and lead.dRel == other.dRel and lead.vLead == other.vLead and \
+         lead.aLeadK == other.aLeadK and lead.aLeadTau == other.aLeadTau
+
+
+class LongitudinalMpcScheduler():
+  """Only solves the mpcs whose solution the planner can use.
+
+  An mpc without a lead only runs to keep its warm start, which init_with_simulation replaces once a lead
+  shows up, so it's skipped and left out of the plan. An mpc whose lead is the same radar cluster as an earlier
+  one takes that solution, and once an mpc settled, inputs within REUSE_TOLERANCE of its last solve keep that solution.
+  """
+  def __init__(self, mpcs):
+    self.mpcs = mpcs
+    self.enabled = True
+
+    self.last_inputs = [None] * len(mpcs)
+    self.last_solution = [None] * len(mpcs)
+    self.settled = [False] * len(mpcs)
+    self.reused = [0] * len(mpcs)
+
+    self.counts = {'solve': 0, 'reuse': 0, 'absent': 0, 'duplicate': 0}
+    self.solve_time = 0.
+    self.last_report = sec_since_boot()
+
+  def solve(self, i, pm, CS):
+    mpc = self.mpcs[i]
+    t = sec_since_boot()
+    mpc.run(pm, CS)
+    self.solve_time += sec_since_boot() - t
+    self.counts['solve'] += 1
+
+    solution = (mpc.v_mpc, mpc.a_mpc)
+    self.settled[i] = self.last_solution[i] is not None and not mpc.new_lead and \
+                      all(abs(x - y) < SETTLED_TOLERANCE for x, y in zip(solution, self.last_solution[i]))
+    self.last_solution[i] = solution
+
+    # a reset starts over with the next lead
+    self.last_inputs[i] = mpc.inputs() if mpc.prev_lead_status else None
+    self.reused[i] = 0
+
+  def update(self, pm, CS, leads):
+    for i, (mpc, lead) in enumerate(zip(self.mpcs, leads)):
+      if not self.enabled:
+        mpc.update(pm, CS, lead)
+        continue
+
+      dup = next((j for j in range(i) if same_lead(lead, leads[j])), None)
+      if dup is not None:
+        mpc.copy_solution(self.mpcs[dup])
+        self.last_inputs[i] = None
+        self.counts['duplicate'] += 1
+        continue
+
+      mpc.update_lead(CS.vEgo, lead)
+      if not mpc.prev_lead_status:
+        mpc.v_mpc = mpc.cur_state[0].v_ego
+        mpc.a_mpc = mpc.cur_state[0].a_ego
+        mpc.has_solution = False
+        self.last_inputs[i] = None
+        self.counts['absent'] += 1
+        continue
+
+      inputs = mpc.inputs()
+      if not mpc.new_lead and self.settled[i] and self.last_inputs[i] is not None and self.reused[i] < MAX_REUSE and \
+         all(abs(x - y) <= tol for x, y, tol in zip(inputs, self.last_inputs[i], REUSE_TOLERANCE)):
+        self.reused[i] += 1
+        self.counts['reuse'] += 1
+      else:
+        self.solve(i, pm, CS)
+
+    t = sec_since_boot()
+    if self.enabled and t - self.last_report > REPORT_INTERVAL:
+      cloudlog.event("long_mpc_schedule", **self.stats(t - self.last_report))
+      self.counts = {k: 0 for k in self.counts}
+      self.solve_time = 0.
+      self.last_report = t
+
+  def stats(self, dt):
+    """Share of mpc updates handled each way and the cpu the skipped solves would have taken"""
+    total = max(sum(self.counts.values()), 1)
+    solves = max(self.counts['solve'], 1)
+    skipped = total - self.counts['solve']
+    ret = {k + '_rate': v / total for k, v in self.counts.items()}
+    ret['solve_time_ms'] = self.solve_time / solves * 1e3
+    ret['cpu_saved_pct'] = skipped * self.solve_time / solves / max(dt, 1e-3) * 100.
+    return ret
@@ -6,7 +6,7 @@ from numpy import interp
 from common.op_params import opParams
 from common.realtime import sec_since_boot, DT_MDL
 from selfdrive.swaglog import cloudlog
-from selfdrive.controls.lib.lateral_mpc import libmpc_py
+from selfdrive.controls.lib.lat_mpc import LateralMpc
 from selfdrive.controls.lib.drive_helpers import MPC_COST_LAT
 from selfdrive.controls.lib.lane_planner import LanePlanner
 from selfdrive.config import Conversions as CV
@@ -62,7 +62,11 @@ class PathPlanner():
 
     self.setup_mpc()
     self.solution_invalid_cnt = 0
-    self.lane_change_enabled = Params().get('LaneChangeEnabled') == b'1'
+    self.params = Params()
+    self.lane_change_enabled = self.params.get('LaneChangeEnabled') == b'1'
+    # IsMetric can be toggled while driving, only re-read it when it changes
+    self.params_watcher = self.params.watch(['IsMetric'])
+    self.is_metric = self.params.get("IsMetric", encoding='utf8') == "1"
     self.lane_change_state = LaneChangeState.off
     self.lane_change_direction = LaneChangeDirection.none
     self.lane_change_timer = 0.0
@@ -71,15 +75,9 @@ class PathPlanner():
     self.pre_auto_LCA_timer = 0.0
 
   def setup_mpc(self):
-    self.libmpc = libmpc_py.libmpc
-    self.libmpc.init(MPC_COST_LAT.PATH, MPC_COST_LAT.LANE, MPC_COST_LAT.HEADING, self.steer_rate_cost)
-
-    self.mpc_solution = libmpc_py.ffi.new("log_t *")
-    self.cur_state = libmpc_py.ffi.new("state_t *")
-    self.cur_state[0].x = 0.0
-    self.cur_state[0].y = 0.0
-    self.cur_state[0].psi = 0.0
-    self.cur_state[0].delta = 0.0
+    self.mpc = LateralMpc(self.steer_rate_cost)
+    self.mpc_solution = self.mpc.solution
+    self.cur_state = self.mpc.cur_state
 
     self.angle_steers_des = 0.0
     self.angle_steers_des_mpc = 0.0
@@ -93,7 +91,10 @@ class PathPlanner():
 
     angle_offset = sm['liveParameters'].angleOffset
 
-    if Params().get("IsMetric", encoding='utf8') == "1":
+    if self.params_watcher.read():
+      self.is_metric = self.params.get("IsMetric", encoding='utf8') == "1"
+
+    if self.is_metric:
       LANE_CHANGE_SPEED_MIN = opParams().get('LCA_Min_Speed') * CV.KPH_TO_MS
     else:
       LANE_CHANGE_SPEED_MIN = opParams().get('LCA_Min_Speed') * CV.MPH_TO_MS
@@ -182,9 +183,9 @@ class PathPlanner():
     if desire == log.PathPlan.Desire.laneChangeRight or desire == log.PathPlan.Desire.laneChangeLeft:
       self.LP.l_prob *= self.lane_change_ll_prob
       self.LP.r_prob *= self.lane_change_ll_prob
-      self.libmpc.init_weights(MPC_COST_LAT.PATH / 3.0, MPC_COST_LAT.LANE, MPC_COST_LAT.HEADING, self.steer_rate_cost)
+      self.mpc.set_path_cost(MPC_COST_LAT.PATH / 3.0)
     else:
-      self.libmpc.init_weights(MPC_COST_LAT.PATH, MPC_COST_LAT.LANE, MPC_COST_LAT.HEADING, self.steer_rate_cost)
+      self.mpc.set_path_cost(MPC_COST_LAT.PATH)
 
     self.LP.update_d_poly(v_ego)
 
@@ -194,9 +195,8 @@ class PathPlanner():
     self.cur_state = calc_states_after_delay(self.cur_state, v_ego, angle_steers - angle_offset, curvature_factor, VM.sR, sad)
 
     v_ego_mpc = max(v_ego, 5.0)  # avoid mpc roughness due to low speed
-    self.libmpc.run_mpc(self.cur_state, self.mpc_solution,
-                        list(self.LP.l_poly), list(self.LP.r_poly), list(self.LP.d_poly),
-                        self.LP.l_prob, self.LP.r_prob, curvature_factor, v_ego_mpc, self.LP.lane_width)
+    mpc_nans = self.mpc.run(self.LP.l_poly, self.LP.r_poly, self.LP.d_poly,
+                            self.LP.l_prob, self.LP.r_prob, curvature_factor, v_ego_mpc, self.LP.lane_width)
 
     # reset to current steer angle if not active or overriding
     if active:
@@ -211,10 +211,9 @@ class PathPlanner():
     self.angle_steers_des_mpc = float(math.degrees(delta_desired * VM.sR) + angle_offset)
 
     #  Check for infeasable MPC solution
-    mpc_nans = any(math.isnan(x) for x in self.mpc_solution[0].delta)
     t = sec_since_boot()
     if mpc_nans:
-      self.libmpc.init(MPC_COST_LAT.PATH, MPC_COST_LAT.LANE, MPC_COST_LAT.HEADING, CP.steerRateCost)
+      self.mpc.reset()
       self.cur_state[0].delta = math.radians(angle_steers - angle_offset) / VM.sR
 
       if t > self.last_cloudlog_t + 5.0:
@@ -255,4 +254,6 @@ class PathPlanner():
       dat.liveMpc.psi = list(self.mpc_solution[0].psi)
       dat.liveMpc.delta = list(self.mpc_solution[0].delta)
       dat.liveMpc.cost = self.mpc_solution[0].cost
+      dat.liveMpc.qpIterations = self.mpc.qp_iterations
+      dat.liveMpc.calculationTime = self.mpc.calculation_time
       pm.send('liveMpc', dat)
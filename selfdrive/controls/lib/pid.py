@@ -1,5 +1,6 @@
 import numpy as np
-from common.numpy_fast import clip, interp
+from common.numpy_fast import clip
+from common.interp_table import InterpTable  # pylint: disable=no-name-in-module, import-error
 
 GainSaS_BP = [0., 1.9, 2., 5., 10., 20., 40.]
 Gain_g = [0.15, .024, .025, .085, .12, .14, .16]
@@ -7,6 +8,9 @@ Gain_g = [0.15, .024, .025, .085, .12, .14, .16]
 GainV_BP = [0., 20., 20.01, 30.]
 Gain_V = [0.3, .5, .65, 1.2]
 
+gain_sas_table = InterpTable(GainSaS_BP, Gain_g)
+gain_v_table = InterpTable(GainV_BP, Gain_V)
+
 def apply_deadzone(error, deadzone):
   if error > deadzone:
     error -= deadzone
@@ -22,6 +26,9 @@ class PIController:
     self._k_p = k_p  # proportional gain
     self._k_i = k_i  # integral gain
     self._k_f = k_f  # feedforward gain
+    self._k_p_table = InterpTable(*k_p)
+    self._k_i_table = InterpTable(*k_i)
+    self._k_f_table = InterpTable(*k_f)
 
     self.pos_limit = pos_limit
     self.neg_limit = neg_limit
@@ -36,15 +43,15 @@ class PIController:
 
   @property
   def k_p(self):
-    return interp(self.speed, self._k_p[0], self._k_p[1])
+    return self._k_p_table(self.speed)
 
   @property
   def k_i(self):
-    return interp(self.speed, self._k_i[0], self._k_i[1])
+    return self._k_i_table(self.speed)
 
   @property
   def k_f(self):
-    return interp(self.speed, self._k_f[0], self._k_f[1])
+    return self._k_f_table(self.speed)
 
   def _check_saturation(self, control, check_saturation, error):
     saturated = (control < self.neg_limit) or (control > self.pos_limit)
@@ -69,7 +76,7 @@ class PIController:
   def update(self, setpoint, measurement, speed=0.0, check_saturation=True, override=False, feedforward=0., deadzone=0., freeze_integrator=False):
     self.speed = speed
 
-    self.nl_p = interp(abs(setpoint), GainSaS_BP, Gain_g) * interp(self.speed, GainV_BP, Gain_V)
+    self.nl_p = gain_sas_table(abs(setpoint)) * gain_v_table(self.speed)
     setpoint = clip(setpoint, -120., 120.)
 
     error = float(apply_deadzone(setpoint - measurement, deadzone))
@@ -109,6 +116,10 @@ class PIDController:
     self._k_i = k_i  # integral gain
     self._k_d = k_d  # derivative gain
     self._k_f = k_f  # feedforward gain
+    self._k_p_table = InterpTable(*k_p)
+    self._k_i_table = InterpTable(*k_i)
+    self._k_d_table = InterpTable(*k_d)
+    self._k_f_table = InterpTable(*k_f)
 
     self.max_accel_d = 0.22352  # 0.5 mph/s
 
@@ -129,19 +140,19 @@ class PIDController:
 
   @property
   def k_p(self):
-    return interp(self.speed, self._k_p[0], self._k_p[1])
+    return self._k_p_table(self.speed)
 
   @property
   def k_i(self):
-    return interp(self.speed, self._k_i[0], self._k_i[1])
+    return self._k_i_table(self.speed)
 
   @property
   def k_d(self):
-    return interp(self.speed, self._k_d[0], self._k_d[1])
+    return self._k_d_table(self.speed)
 
   @property
   def k_f(self):
-    return interp(self.speed, self._k_f[0], self._k_f[1])
+    return self._k_f_table(self.speed)
 
   def _check_saturation(self, control, check_saturation, error):
     saturated = (control < self.neg_limit) or (control > self.pos_limit)
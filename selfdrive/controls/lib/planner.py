@@ -12,7 +12,7 @@ from selfdrive.config import Conversions as CV
 from selfdrive.controls.lib.speed_smoother import speed_smoother
 from selfdrive.controls.lib.longcontrol import LongCtrlState, MIN_CAN_SPEED
 from selfdrive.controls.lib.fcw import FCWChecker
-from selfdrive.controls.lib.long_mpc import LongitudinalMpc
+from selfdrive.controls.lib.long_mpc import LongitudinalMpc, LongitudinalMpcScheduler
 from selfdrive.controls.lib.drive_helpers import V_CRUISE_MAX
 
 LON_MPC_STEP = 0.2  # first step is 0.2s
@@ -64,6 +64,7 @@ class Planner():
 
     self.mpc1 = LongitudinalMpc(1)
     self.mpc2 = LongitudinalMpc(2)
+    self.mpc_scheduler = LongitudinalMpcScheduler([self.mpc1, self.mpc2])
 
     self.v_acc_start = 0.0
     self.a_acc_start = 0.0
@@ -103,7 +104,7 @@ class Planner():
         self.v_acc = self.v_cruise
         self.a_acc = self.a_cruise
 
-    self.v_acc_future = min([self.mpc1.v_mpc_future, self.mpc2.v_mpc_future, v_cruise_setpoint])
+    self.v_acc_future = min([mpc.v_mpc_future for mpc in (self.mpc1, self.mpc2) if mpc.has_solution] + [v_cruise_setpoint])
 
   def update(self, sm, pm, CP, VM, PP):
     """Gets called when new radarState is available"""
@@ -157,8 +158,7 @@ class Planner():
     self.mpc1.set_cur_state(self.v_acc_start, self.a_acc_start)
     self.mpc2.set_cur_state(self.v_acc_start, self.a_acc_start)
 
-    self.mpc1.update(pm, sm['carState'], lead_1)
-    self.mpc2.update(pm, sm['carState'], lead_2)
+    self.mpc_scheduler.update(pm, sm['carState'], [lead_1, lead_2])
 
     self.choose_solution(v_cruise_setpoint, enabled)
 
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 from cereal import car
 from common.params import Params
-from common.realtime import Priority, config_realtime_process
+from common.realtime import config_realtime_process
 from selfdrive.swaglog import cloudlog
+from selfdrive.cpu_isolation import PLACEMENTS
 from selfdrive.controls.lib.planner import Planner
 from selfdrive.controls.lib.vehicle_model import VehicleModel
 from selfdrive.controls.lib.pathplanner import PathPlanner
@@ -11,7 +12,7 @@ import cereal.messaging as messaging
 
 def plannerd_thread(sm=None, pm=None):
 
-  config_realtime_process(2, Priority.CTRL_LOW)
+  config_realtime_process(*PLACEMENTS['plannerd'])
 
   cloudlog.info("plannerd is waiting for CarParams")
   CP = car.CarParams.from_bytes(Params().get("CarParams", block=True))
@@ -7,8 +7,9 @@ import cereal.messaging as messaging
 from cereal import car
 from common.numpy_fast import interp
 from common.params import Params
-from common.realtime import Ratekeeper, Priority, config_realtime_process
+from common.realtime import Ratekeeper, config_realtime_process, LOOP_TIMING_INTERVAL
 from selfdrive.config import RADAR_TO_CAMERA
+from selfdrive.cpu_isolation import PLACEMENTS
 from selfdrive.controls.lib.cluster.fastcluster_py import cluster_points_centroid
 from selfdrive.controls.lib.radar_helpers import Cluster, Track
 from selfdrive.swaglog import cloudlog
@@ -172,7 +173,7 @@ class RadarD():
 
 # fuses camera and radar data for best lead detection
 def radard_thread(sm=None, pm=None, can_sock=None):
-  config_realtime_process(2, Priority.CTRL_LOW)
+  config_realtime_process(*PLACEMENTS['radard'])
 
   # wait for stats about the car to come in from controls
   cloudlog.info("radard is waiting for CarParams")
@@ -193,7 +194,7 @@ def radard_thread(sm=None, pm=None, can_sock=None):
 
   RI = RadarInterface(CP)
 
-  rk = Ratekeeper(1.0 / CP.radarTimeStep, print_delay_threshold=None)
+  rk = Ratekeeper(1.0 / CP.radarTimeStep, print_delay_threshold=None, timing_interval=LOOP_TIMING_INTERVAL)
   RD = RadarD(CP.radarTimeStep, RI.delay)
 
   # TODO: always log leads once we can hide them conditionally
@@ -228,6 +229,10 @@ def radard_thread(sm=None, pm=None, can_sock=None):
 
     rk.monitor_time()
 
+    timing = rk.pop_timing()
+    if timing is not None:
+      cloudlog.event("loop_timing", **timing)
+
 
 def main(sm=None, pm=None, can_sock=None):
   radard_thread(sm, pm, can_sock)
@@ -0,0 +1,58 @@
+# shared by the AlertManager test and the alert benchmarks
+import copy
+
+from cereal import car, log
+from common.realtime import DT_CTRL
+from selfdrive.controls.lib.alertmanager import AlertManager, cloudlog
+from selfdrive.controls.lib.events import ET
+
+# all the alert types, as in cycle_alerts.py
+ALERT_TYPES = [ET.PERMANENT, ET.USER_DISABLE, ET.IMMEDIATE_DISABLE,
+               ET.SOFT_DISABLE, ET.PRE_ENABLE, ET.NO_ENTRY,
+               ET.ENABLE, ET.WARNING]
+
+
+class ListAlertManager(AlertManager):
+  """The previous implementation, copying every alert and sorting the whole list each frame."""
+  def __init__(self):
+    super().__init__()
+    self.activealerts = []
+
+  def log(self, *args, **kwargs):
+    cloudlog.event(*args, **kwargs)
+
+  def add_many(self, frame, alerts, enabled=True):
+    for alert in alerts:
+      added_alert = copy.copy(alert)
+      added_alert.start_time = frame * DT_CTRL
+      if not len(self.activealerts) or added_alert.alert_priority > self.activealerts[0].alert_priority:
+        self.log('alert_add', alert_type=added_alert.alert_type, enabled=enabled)
+      self.activealerts.append(added_alert)
+
+  def process_alerts(self, frame, clear_event_type=None):
+    cur_time = frame * DT_CTRL
+    self.activealerts = [a for a in self.activealerts if a.event_type != clear_event_type and
+                         a.start_time + max(a.duration_sound, a.duration_hud_alert, a.duration_text) > cur_time]
+    self.activealerts.sort(key=lambda k: (k.alert_priority, k.start_time), reverse=True)
+
+    self.clear_current_alert()
+    if len(self.activealerts):
+      current_alert = self.activealerts[0]
+      self.alert_type = current_alert.alert_type
+      if current_alert.start_time + current_alert.duration_sound > cur_time:
+        self.audible_alert = current_alert.audible_alert
+      if current_alert.start_time + current_alert.duration_hud_alert > cur_time:
+        self.visual_alert = current_alert.visual_alert
+      if current_alert.start_time + current_alert.duration_text > cur_time:
+        self.alert_text_1 = current_alert.alert_text_1
+        self.alert_text_2 = current_alert.alert_text_2
+        self.alert_status = current_alert.alert_status
+        self.alert_size = current_alert.alert_size
+        self.alert_rate = current_alert.alert_rate
+
+
+def callback_args():
+  CP = car.CarParams.new_message(carName="honda", minSteerSpeed=12.)
+  sm = {'liveCalibration': log.LiveCalibrationData.new_message(calPerc=42),
+        'health': log.HealthData.new_message()}
+  return [CP, sm, False]
@@ -0,0 +1,146 @@
+# synthetic planner inputs replayed through Planner, shared by test_long_mpc_scheduler and
+# selfdrive/debug/long_mpc_scheduler_benchmark.py
+
+import math
+import time
+
+import numpy as np
+
+from cereal import car, log
+from selfdrive.controls.lib.longcontrol import LongCtrlState
+from selfdrive.controls.lib.planner import Planner
+
+DT = 0.05  # radarState rate
+PLAN_FIELDS = ["vStart", "aStart", "vTarget", "aTarget", "vTargetFuture"]
+# the cruise plan jumps when aStart changes sign, it's only compared while followed
+CRUISE_FIELDS = ["vCruise", "aCruise"]
+EXACT_FIELDS = ["hasLead", "fcw"]
+V_FUTURE_CLIP = 1.0  # longcontrol only compares vTargetFuture against speeds below this
+
+
+class ReplaySubMaster():
+  def __init__(self):
+    self.msgs = {}
+    self.alive = {'carState': True, 'controlsState': True, 'radarState': True}
+    self.rcv_time = {'radarState': 0.}
+    self.logMonoTime = {'model': 0, 'radarState': 0}
+
+  def __getitem__(self, s):
+    return self.msgs[s]
+
+  def all_alive_and_valid(self, service_list=None):
+    return True
+
+
+class ReplayPubMaster():
+  def __init__(self):
+    self.plans = []
+
+  def send(self, s, dat):
+    if s == 'plan':
+      self.plans.append(dat.plan.as_reader())
+
+
+def lead_data(lead, d_rel, v_lead, v_ego, a_lead=0.):
+  lead.status = True
+  lead.dRel = d_rel
+  lead.vLead = v_lead
+  lead.vRel = v_lead - v_ego
+  lead.aLeadK = a_lead
+  lead.aLeadTau = 1.5
+  lead.modelProb = 1.
+  lead.radar = True
+
+
+def scenario(name, seconds):
+  """carState, controlsState and radarState per radarState frame, with an open loop ego speed profile"""
+  n = int(seconds / DT)
+  frames = []
+  v_ego, d_1 = 0., 40.
+  for i in range(n):
+    t = i * DT
+    CS = car.CarState.new_message()
+    controls = log.ControlsState.new_message()
+    radar = log.RadarState.new_message()
+    controls.longControlState = LongCtrlState.pid
+    controls.vCruise = 90.
+    controls.active = True
+
+    if name == "cruise":
+      v, a = 25. + 0.5 * math.sin(0.2 * t), 0.1 * math.cos(0.2 * t)
+    elif name == "follow":
+      # the model's lead and future lead match the same radar cluster
+      v, a = 20. + 0.3 * math.sin(0.3 * t), 0.09 * math.cos(0.3 * t)
+      d_1 += (20. - v) * DT
+      lead_data(radar.leadOne, d_1, 20., v)
+      lead_data(radar.leadTwo, d_1, 20., v)
+    elif name == "stop_and_go":
+      # stop behind a lead for a while, then pull away, with a second car further ahead
+      phase = t % 30.
+      v_lead = 15. * min(max(1. - phase / 8., 0.), 1.) if phase < 18. else min(1.5 * (phase - 18.), 15.)
+      v = max(v_lead - 1. + 0.5 * math.cos(0.5 * t), 0.) if v_lead > 0. else max(v_ego - 2. * DT, 0.)
+      a = (v - v_ego) / DT
+      d_1 = max(d_1 + (v_lead - v) * DT, 4.)
+      lead_data(radar.leadOne, d_1, v_lead, v)
+      lead_data(radar.leadTwo, d_1 + 20., v_lead, v)
+    elif name == "cut_in":
+      # a slower car cuts in for 10s out of every 15s
+      v, a = 25., 0.
+      if t % 15. > 5.:
+        d_1 = 30. + (20. - v) * (t % 15. - 5.)
+        lead_data(radar.leadOne, max(d_1, 5.), 20., v)
+    else:
+      raise ValueError(f"unknown scenario {name}")
+
+    v_ego = v
+    CS.vEgo = v
+    CS.aEgo = a
+    CS.standstill = v < 0.01
+    frames.append((CS.as_reader(), controls.as_reader(), radar.as_reader()))
+  return frames
+
+
+def car_params():
+  CP = car.CarParams.new_message()
+  CP.radarTimeStep = DT
+  CP.steerRatio = 15.
+  CP.wheelbase = 2.7
+  CP.startAccel = 1.2
+  return CP.as_reader()
+
+
+def replay(frames, schedule):
+  CP = car_params()
+  PL = Planner(CP)
+  PL.mpc_scheduler.enabled = schedule
+  sm, pm = ReplaySubMaster(), ReplayPubMaster()
+
+  times = []
+  for i, (CS, controls, radar) in enumerate(frames):
+    sm.msgs = {'carState': CS, 'controlsState': controls, 'radarState': radar}
+    sm.rcv_time['radarState'] = i * DT
+
+    t = time.process_time()
+    PL.update(sm, pm, CP, None, None)
+    times.append(time.process_time() - t)
+  return pm.plans, np.array(times) * 1e3, PL.mpc_scheduler.stats(sum(times))
+
+
+def compare(ref, plans):
+  """Max difference per plan field and the number of frames planned from a different source"""
+  diffs = {}
+  for f in PLAN_FIELDS:
+    a, b = np.array([getattr(p, f) for p in ref]), np.array([getattr(p, f) for p in plans])
+    if f == "vTargetFuture":
+      a, b = np.minimum(a, V_FUTURE_CLIP), np.minimum(b, V_FUTURE_CLIP)
+    diffs[f] = float(np.max(np.abs(a - b))) if len(a) else 0.
+  cruise = [(p, q) for p, q in zip(ref, plans) if p.longitudinalPlanSource == 'cruise']
+  for f in CRUISE_FIELDS:
+    diffs[f] = max((abs(getattr(p, f) - getattr(q, f)) for p, q in cruise), default=0.)
+  for f in EXACT_FIELDS:
+    diffs[f] = sum(getattr(p, f) != getattr(q, f) for p, q in zip(ref, plans))
+
+  # both mpcs may follow the same car, then either one is the same plan
+  same = lambda p, q: p == q or {p, q} <= {'mpc1', 'mpc2'}
+  diffs['source'] = sum(not same(str(p.longitudinalPlanSource), str(q.longitudinalPlanSource)) for p, q in zip(ref, plans))
+  return diffs
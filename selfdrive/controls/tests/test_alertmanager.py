@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+import random
+import unittest
+from unittest import mock
+
+from selfdrive.controls.lib.alertmanager import AlertManager
+from selfdrive.controls.lib.events import ET, EVENTS, Events
+from selfdrive.controls.tests.alert_helpers import ALERT_TYPES, ListAlertManager, callback_args
+
+
+def state(AM):
+  return (AM.alert_type, AM.alert_text_1, AM.alert_text_2, AM.alert_status, AM.alert_size,
+          AM.visual_alert, AM.audible_alert, AM.alert_rate)
+
+
+class TestAlertManager(unittest.TestCase):
+
+  def run_frames(self, frames):
+    """Runs (event names, alert types, clear event type) per frame through both managers and compares them."""
+    args = callback_args()
+    ref_log, new_log = [], []
+    ref, new = ListAlertManager(), AlertManager()
+    ref.log = lambda *a, **kw: ref_log.append((a, kw))
+
+    events = Events()
+    with mock.patch('selfdrive.controls.lib.alertmanager.cloudlog.event', lambda *a, **kw: new_log.append((a, kw))):
+      for frame, (names, alert_types, clear_event) in enumerate(frames):
+        events.clear()
+        for name in names:
+          events.add(name)
+        alerts = events.create_alerts(alert_types, args)
+
+        for AM in (ref, new):
+          AM.add_many(frame, alerts)
+          AM.process_alerts(frame, clear_event)
+
+        self.assertEqual(state(ref), state(new), f"frame {frame}")
+        self.assertEqual(ref_log, new_log, f"frame {frame}")
+        ref_log.clear()
+        new_log.clear()
+
+  def test_cycle_alerts(self):
+    # every event on its own, the way selfdrive/debug/cycle_alerts.py shows them
+    frames = []
+    for name in EVENTS:
+      frames += [([name], ALERT_TYPES, None)] * 50
+      frames += [([], ALERT_TYPES, None)] * 10
+    self.run_frames(frames)
+
+  def test_random_events(self):
+    random.seed(0)
+    names = list(EVENTS.keys())
+    active = set()
+
+    frames = []
+    for _ in range(3000):
+      if random.random() < 0.05:
+        active ^= {random.choice(names)}
+      current = list(active)
+      random.shuffle(current)
+      if random.random() < 0.01 and len(current):
+        current.append(current[0])  # same event added twice in a frame
+
+      alert_types = ALERT_TYPES if random.random() < 0.9 else random.sample(ALERT_TYPES, 3)
+      clear_event = ET.WARNING if ET.WARNING not in alert_types else None
+      frames.append((current, alert_types, clear_event))
+    self.run_frames(frames)
+
+
+if __name__ == "__main__":
+  unittest.main()
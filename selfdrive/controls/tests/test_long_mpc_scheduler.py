@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+import unittest
+
+from selfdrive.config import Conversions as CV
+
+try:
+  from selfdrive.controls.tests import planner_replay
+except OSError:  # libmpc isn't built
+  planner_replay = None
+
+TOLERANCE = 0.05  # m/s and m/s^2
+SECONDS = 60.
+SCENARIOS = ("cruise", "follow", "stop_and_go", "cut_in")
+
+
+@unittest.skipIf(planner_replay is None, "libmpc not built")
+class TestLongitudinalMpcScheduler(unittest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.replays = {}
+    for name in SCENARIOS:
+      frames = planner_replay.scenario(name, SECONDS)
+      ref, _, _ = planner_replay.replay(frames, False)
+      plans, _, stats = planner_replay.replay(frames, True)
+      cls.replays[name] = (frames, ref, plans, stats)
+
+  def test_scenarios(self):
+    for name, (_, ref, plans, stats) in self.replays.items():
+      diffs = planner_replay.compare(ref, plans)
+
+      with self.subTest(scenario=name):
+        self.assertEqual(len(plans), len(ref))
+        for f in planner_replay.PLAN_FIELDS + planner_replay.CRUISE_FIELDS:
+          self.assertLessEqual(diffs[f], TOLERANCE, f)
+        for f in planner_replay.EXACT_FIELDS + ['source']:
+          self.assertEqual(diffs[f], 0, f)
+        self.assertLess(stats['solve_rate'], 1.)
+
+  def test_v_target_future(self):
+    # an mpc without a lead is left out of vTargetFuture, before it planned for its fake lead
+    for name, (frames, ref, plans, _) in self.replays.items():
+      for i, ((_, controls, radar), p, q) in enumerate(zip(frames, ref, plans)):
+        with self.subTest(scenario=name, frame=i):
+          if not radar.leadOne.status and not radar.leadTwo.status:
+            self.assertEqual(q.vTargetFuture, controls.vCruise * CV.KPH_TO_MS)
+          elif radar.leadOne.status and radar.leadTwo.status:
+            self.assertLessEqual(abs(q.vTargetFuture - p.vTargetFuture), TOLERANCE)
+          elif abs(q.vTargetFuture - p.vTargetFuture) > TOLERANCE:
+            # only ever higher, and far above where longcontrol looks at it
+            self.assertGreater(q.vTargetFuture, p.vTargetFuture)
+            self.assertGreater(p.vTargetFuture, planner_replay.V_FUTURE_CLIP)
+
+  def test_duplicate_lead(self):
+    # leadOne and leadTwo are the same cluster, mpc2 takes mpc1's solution
+    frames = planner_replay.scenario("follow", SECONDS)
+    for schedule in (False, True):
+      CP = planner_replay.car_params()
+      PL = planner_replay.Planner(CP)
+      PL.mpc_scheduler.enabled = schedule
+      sm, pm = planner_replay.ReplaySubMaster(), planner_replay.ReplayPubMaster()
+
+      for i, (CS, controls, radar) in enumerate(frames):
+        sm.msgs = {'carState': CS, 'controlsState': controls, 'radarState': radar}
+        sm.rcv_time['radarState'] = i * planner_replay.DT
+        PL.update(sm, pm, CP, None, None)
+
+        # solved on its own it's the same solution to the bit
+        with self.subTest(schedule=schedule, frame=i):
+          self.assertEqual((PL.mpc2.v_mpc, PL.mpc2.a_mpc, PL.mpc2.v_mpc_future),
+                           (PL.mpc1.v_mpc, PL.mpc1.a_mpc, PL.mpc1.v_mpc_future))
+
+      if schedule:
+        self.assertGreater(PL.mpc_scheduler.counts['duplicate'], 0)
+
+
+if __name__ == "__main__":
+  unittest.main()
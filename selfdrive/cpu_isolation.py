@@ -0,0 +1,244 @@
+"""Places managed processes on their cores and keeps everything else off the realtime cores."""
+import os
+from collections import namedtuple
+
+from common.hardware import EON, TICI
+from common.realtime import Priority, sec_since_boot
+from selfdrive.swaglog import cloudlog
+
+CPUSET_ROOT = "/dev/cpuset"
+PROC_ROOT = "/proc"
+SYS_ROOT = "/sys"
+
+SWEEP_INTERVAL = 5.  # s between looking for new tasks on the realtime cores
+REPORT_INTERVAL = 10.  # s between per core scheduler reports
+
+# core and SCHED_FIFO priority for a managed process, None leaves it as inherited. Not pandad, it flashes the
+# panda before it execs boardd, which moves itself to core 3 at priority 54
+Placement = namedtuple('Placement', ['core', 'priority'])
+
+PLACEMENTS = {
+  'controlsd': Placement(3, Priority.CTRL_HIGH),
+  'radard': Placement(2, Priority.CTRL_LOW),
+  'plannerd': Placement(2, Priority.CTRL_LOW),
+  'modeld': Placement(4 if TICI else 2, 51),
+  'dmonitoringmodeld': Placement(5 if TICI else None, 51),
+  'camerad': Placement(6 if TICI else 2, 51),
+}
+if TICI:
+  PLACEMENTS['ui'] = Placement(7, None)
+
+# nothing but the processes placed there may run on these
+RT_CORES = [3] if EON else []
+
+
+def parse_cpu_list(s):
+  """Parses a cpuset list like '0-2,4' into a set of cores."""
+  ret = set()
+  for part in s.strip().split(','):
+    if not part:
+      continue
+    lo, _, hi = part.partition('-')
+    ret.update(range(int(lo), int(hi or lo) + 1))
+  return ret
+
+
+def format_cpu_list(cores):
+  return ','.join(str(c) for c in sorted(cores))
+
+
+def parse_cpu_mask(s):
+  mask = int(s.strip().replace(',', ''), 16)
+  return {i for i in range(mask.bit_length()) if mask & (1 << i)}
+
+
+def format_cpu_mask(cores):
+  return "%x" % sum(1 << c for c in cores)
+
+
+def read_schedstat(proc_root=PROC_ROOT):
+  """Per core wakeups, total runqueue delay in ns and timeslices from /proc/schedstat, empty without CONFIG_SCHEDSTATS."""
+  ret = {}
+  try:
+    with open(os.path.join(proc_root, "schedstat")) as f:
+      for line in f:
+        # cpu<N> yld_count 0 sched_count sched_goidle ttwu_count ttwu_local rq_cpu_time run_delay pcount
+        if not line.startswith("cpu"):
+          continue
+        fields = line.split()
+        ret[int(fields[0][3:])] = (int(fields[5]), int(fields[8]), int(fields[9]))
+  except (OSError, ValueError, IndexError):
+    pass
+  return ret
+
+
+class CoreStats():
+  """Wakeup rate and mean runqueue latency per core between calls to update."""
+  def __init__(self, proc_root=PROC_ROOT):
+    self.proc_root = proc_root
+    self.last = read_schedstat(proc_root)
+    self.last_t = sec_since_boot()
+
+  def update(self):
+    cur, t = read_schedstat(self.proc_root), sec_since_boot()
+    dt = max(t - self.last_t, 1e-3)
+
+    ret = []
+    for core in sorted(cur):
+      if core not in self.last:
+        continue
+      wakeups, run_delay, timeslices = (c - l for c, l in zip(cur[core], self.last[core]))
+      ret.append({
+        'core': core,
+        'wakeups': wakeups / dt,
+        'run_delay_ms': run_delay / max(timeslices, 1) * 1e-6,
+      })
+
+    self.last, self.last_t = cur, t
+    return ret
+
+
+class CpuIsolation():
+  """Applies PLACEMENTS to managed processes and reserves RT_CORES for them.
+
+  Android cpusets have the realtime cores removed, which holds for anything the system moves between them. Tasks
+  in the root cpuset, unbound workqueues and irqs get their affinity masks trimmed instead, and tasks that show
+  up later are picked up by periodic sweeps. Per cpu kthreads and tasks pinned only to the realtime cores are
+  left alone.
+  """
+  def __init__(self, placements=PLACEMENTS, rt_cores=RT_CORES, cpuset_root=CPUSET_ROOT, proc_root=PROC_ROOT,
+               sys_root=SYS_ROOT):
+    self.placements = placements
+    self.rt_cores = set(rt_cores)
+    self.cpuset_root = cpuset_root
+    self.proc_root = proc_root
+    self.sys_root = sys_root
+
+    self.swept = set()
+    self.moved = 0
+    self.last_sweep = self.last_report = sec_since_boot()
+    self.core_stats = CoreStats(proc_root)
+
+  def _trim_mask(self, path):
+    try:
+      with open(path) as f:
+        cores = parse_cpu_mask(f.read())
+      if cores & self.rt_cores and cores - self.rt_cores:
+        with open(path, 'w') as f:
+          f.write(format_cpu_mask(cores - self.rt_cores))
+    except (OSError, ValueError):
+      # per cpu and chained irqs can't be moved
+      pass
+
+  def reserve_cpusets(self):
+    """Removes the realtime cores from every cpuset except the ones this process runs in."""
+    if not os.path.isdir(self.cpuset_root):
+      return 0
+
+    try:
+      with open(os.path.join(self.proc_root, "self/cpuset")) as f:
+        own = os.path.join(self.cpuset_root, f.read().strip().lstrip('/'))
+    except OSError:
+      own = self.cpuset_root
+
+    count = 0
+    # children first, a cpuset can't hold cores its parent doesn't
+    for d, _, _ in os.walk(self.cpuset_root, topdown=False):
+      if os.path.commonpath([d, own]) == os.path.normpath(d):
+        continue
+
+      fn = os.path.join(d, "cpus")
+      try:
+        with open(fn) as f:
+          cores = parse_cpu_list(f.read())
+        if cores & self.rt_cores and cores - self.rt_cores:
+          with open(fn, 'w') as f:
+            f.write(format_cpu_list(cores - self.rt_cores))
+          count += 1
+      except (OSError, ValueError):
+        cloudlog.exception(f"failed to reserve cores in {d}")
+    return count
+
+  def reserve_irqs(self):
+    irq_root = os.path.join(self.proc_root, "irq")
+    if not os.path.isdir(irq_root):
+      return
+
+    self._trim_mask(os.path.join(irq_root, "default_smp_affinity"))
+    for irq in os.listdir(irq_root):
+      if irq.isdigit():
+        self._trim_mask(os.path.join(irq_root, irq, "smp_affinity"))
+    self._trim_mask(os.path.join(self.sys_root, "devices/virtual/workqueue/cpumask"))
+
+  def tasks_to_move(self):
+    """Yields (tid, allowed cores) for new tasks allowed on both realtime and other cores."""
+    seen = set()
+    for pid in os.listdir(self.proc_root):
+      if not pid.isdigit():
+        continue
+      try:
+        tids = os.listdir(os.path.join(self.proc_root, pid, "task"))
+      except OSError:
+        continue
+
+      for tid in tids:
+        tid = int(tid)
+        seen.add(tid)
+        if tid in self.swept:
+          continue
+        try:
+          cores = os.sched_getaffinity(tid)
+        except OSError:
+          continue
+        if cores & self.rt_cores and cores - self.rt_cores:
+          yield tid, cores
+    self.swept = seen
+
+  def sweep(self):
+    for tid, cores in self.tasks_to_move():
+      try:
+        os.sched_setaffinity(tid, cores - self.rt_cores)
+        self.moved += 1
+      except OSError:
+        pass
+
+  def reserve(self):
+    if not self.rt_cores:
+      return
+
+    cpusets = self.reserve_cpusets()
+    self.reserve_irqs()
+    self.sweep()
+    cloudlog.event("cpu_isolation_reserve", rt_cores=sorted(self.rt_cores), cpusets=cpusets, moved=self.moved)
+
+  def place(self, name, pid):
+    """Moves every thread of a newly started managed process to its planned core and priority."""
+    placement = self.placements.get(name)
+    if placement is None or pid is None:
+      return
+
+    try:
+      tids = [int(t) for t in os.listdir(os.path.join(self.proc_root, str(pid), "task"))]
+    except OSError:
+      tids = [pid]
+
+    for tid in tids:
+      try:
+        if placement.core is not None:
+          os.sched_setaffinity(tid, [placement.core])
+        if placement.priority is not None:
+          os.sched_setscheduler(tid, os.SCHED_FIFO, os.sched_param(placement.priority))
+      except OSError:
+        cloudlog.exception(f"failed to place {name}")
+        return
+
+  def update(self):
+    """Sweeps for new tasks and reports per core scheduler stats, call periodically from manager."""
+    t = sec_since_boot()
+    if self.rt_cores and t - self.last_sweep > SWEEP_INTERVAL:
+      self.sweep()
+      self.last_sweep = t
+
+    if t - self.last_report > REPORT_INTERVAL:
+      cloudlog.event("cpu_isolation", rt_cores=sorted(self.rt_cores), moved=self.moved, cores=self.core_stats.update())
+      self.last_report = t
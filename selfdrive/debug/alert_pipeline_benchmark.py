@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+import argparse
+import bz2
+import contextlib
+import random
+import sys
+import time
+from collections import defaultdict
+from unittest import mock
+
+import numpy as np
+
+from cereal import log
+from selfdrive.controls.controlsd import State, state_transition
+from selfdrive.controls.lib.alertmanager import AlertManager
+from selfdrive.controls.lib.events import ET, EVENTS, EVENT_NAME, Alert, EventName, Events
+from selfdrive.controls.tests.alert_helpers import ALERT_TYPES, callback_args
+
+FRAMES_PER_MIN = 6000
+
+
+class AlertPipeline():
+  """controlsd's events -> alerts -> controlsState path for one frame at a time, without sockets or a car."""
+  def __init__(self, CP, is_metric):
+    self.CP = CP
+    self.is_metric = is_metric
+    self.events = Events()
+    self.AM = AlertManager()
+    self.state = State.disabled
+    self.soft_disable_timer = 0
+    self.enabled = False
+
+  def alert_types(self):
+    self.state, self.soft_disable_timer, types = state_transition(self.state, self.events, self.soft_disable_timer)
+    self.enabled = self.state in (State.enabled, State.softDisabling, State.preEnabled)
+    return types
+
+  def step(self, frame, names, sm, timings):
+    """Runs one controlsd frame of events and returns its controlsState alert fields."""
+    t0 = time.perf_counter()
+    self.events.clear()
+    for name in names:
+      self.events.add(name)
+    types = self.alert_types()
+    clear_event = ET.WARNING if ET.WARNING not in types else None
+    alerts = self.events.create_alerts(types, [self.CP, sm, self.is_metric])
+
+    t1 = time.perf_counter()
+    self.AM.add_many(frame, alerts, self.enabled)
+    self.AM.process_alerts(frame, clear_event)
+
+    t2 = time.perf_counter()
+    dat = log.ControlsState.new_message()
+    dat.alertText1 = self.AM.alert_text_1
+    dat.alertText2 = self.AM.alert_text_2
+    dat.alertSize = self.AM.alert_size
+    dat.alertStatus = self.AM.alert_status
+    dat.alertBlinkingRate = self.AM.alert_rate
+    dat.alertType = self.AM.alert_type
+    dat.alertSound = self.AM.audible_alert
+    t3 = time.perf_counter()
+
+    timings['create_alerts'].append((t1 - t0) * 1e6)
+    timings['AlertManager'].append((t2 - t1) * 1e6)
+    timings['controlsState'].append((t3 - t2) * 1e6)
+    timings['frame'].append((t3 - t0) * 1e6)
+    return (dat.alertType, dat.alertText1, dat.alertText2, dat.alertSize, dat.alertStatus,
+            dat.alertBlinkingRate, dat.alertSound, self.AM.visual_alert)
+
+
+# ********** event sequences, (event names, callback sm) per 100Hz frame **********
+
+def alert_events():
+  return [e for e in EVENTS if any(et in EVENTS[e] for et in ALERT_TYPES)]
+
+
+def cycle_frames(duration, sm):
+  # every event with an alert in turn, engaging before each one like cycle_alerts.py
+  ret = []
+  for e in alert_events():
+    ret.append(([EventName.pcmEnable], sm))
+    ret += [([e], sm)] * duration
+  return ret
+
+
+def drive_frames(sm):
+  # startup and calibration, then engaged with intermittent warnings and a distracted driver
+  ret = [([EventName.startup], sm)] * 500
+  ret += [([EventName.calibrationIncomplete], sm)] * 1000
+  ret.append(([EventName.pcmEnable], sm))
+  for i in range(6000):
+    names = []
+    if i % 1000 < 150:
+      names.append(EventName.belowSteerSpeed)
+    if i % 700 < 50:
+      names.append(EventName.steerSaturated)
+    if 3000 <= i < 3400:
+      names.append(EventName.preDriverDistracted)
+    elif 3400 <= i < 3700:
+      names.append(EventName.promptDriverDistracted)
+    elif 3700 <= i < 3800:
+      names.append(EventName.driverDistracted)
+    ret.append((names, sm))
+  ret.append(([EventName.pcmDisable], sm))
+  ret += [([EventName.wrongCarMode, EventName.buttonEnable], sm)] * 100
+  return ret
+
+
+def random_frames(n, n_events, sm, seed=0):
+  # n_events active at a time, swapping one out about every 5s and engaging about every 10s
+  rng = random.Random(seed)
+  names = alert_events()
+  active = rng.sample(names, n_events)
+  ret = []
+  for _ in range(n):
+    if rng.random() < 0.002:
+      active[rng.randrange(n_events)] = rng.choice(names)
+    ret.append((list(active) + ([EventName.pcmEnable] if rng.random() < 0.001 else []), sm))
+  return ret
+
+
+def logged_frames(fn):
+  """carEvents from an rlog, with the liveCalibration, health and carParams the callbacks see at the time."""
+  with open(fn, "rb") as f:
+    dat = f.read()
+  if fn.endswith(".bz2"):
+    dat = bz2.decompress(dat)
+
+  CP, sm, _ = callback_args()
+  ret = []
+  for msg in log.Event.read_multiple_bytes(dat):
+    which = msg.which()
+    if which == 'carParams':
+      CP = msg.carParams
+    elif which in ('liveCalibration', 'health'):
+      sm = dict(sm, **{which: getattr(msg, which)})
+    elif which == 'carEvents':
+      ret.append(([e.name.raw for e in msg.carEvents], sm))
+  return CP, ret
+
+
+# ********** measurements **********
+
+@contextlib.contextmanager
+def timed_callbacks(costs):
+  """Times every callback alert in EVENTS, by alert type."""
+  with contextlib.ExitStack() as stack:
+    for e, alerts in EVENTS.items():
+      for et, alert in alerts.items():
+        if not isinstance(alert, Alert):
+          stack.enter_context(mock.patch.dict(alerts, {et: timed(alert, costs[f"{EVENT_NAME[e]}/{et}"])}))
+    yield
+
+
+def timed(f, costs):
+  def wrapped(*args):
+    t = time.perf_counter()
+    try:
+      return f(*args)
+    finally:
+      costs.append((time.perf_counter() - t) * 1e6)
+  return wrapped
+
+
+def replay(CP, frames, is_metric):
+  pipeline = AlertPipeline(CP, is_metric)
+  timings, callback_costs = defaultdict(list), defaultdict(list)
+  adds = []
+
+  selected = []
+  with timed_callbacks(callback_costs), \
+       mock.patch('selfdrive.controls.lib.alertmanager.cloudlog.event', lambda *a, **kw: adds.append(a)):
+    for frame, (names, sm) in enumerate(frames):
+      selected.append(pipeline.step(frame, names, sm, timings))
+  return selected, timings, callback_costs, len(adds)
+
+
+def first_difference(a, b):
+  return next((i for i, (x, y) in enumerate(zip(a, b)) if x != y), None if len(a) == len(b) else min(len(a), len(b)))
+
+
+def report(name, frames, selected, timings, callback_costs, adds):
+  minutes = len(frames) / FRAMES_PER_MIN
+  changes = sum(a[0] != b[0] for a, b in zip(selected, selected[1:]))
+  shown = {s[0] for s in selected if s[0]}
+
+  print(f"{name}: {len(frames)} frames")
+  print("  per frame       " + ", ".join(f"{k} p50 {np.percentile(v, 50):.1f} p99 {np.percentile(v, 99):.1f} us"
+                                         for k, v in timings.items()))
+  print(f"  alert churn     {changes / minutes:.1f} changes/min, {adds / minutes:.1f} alert_add/min, {len(shown)} alerts shown")
+  for k, v in sorted(((k, v) for k, v in callback_costs.items() if len(v)), key=lambda kv: -sum(kv[1])):
+    print(f"  callback        {k:45s} {len(v):6d} calls {np.mean(v):8.1f} us mean {np.max(v):8.1f} us max")
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Replays event sequences through create_alerts, AlertManager and the controlsState alert fields")
+  parser.add_argument("scenarios", nargs="*", default=["cycle", "drive", "random"], help="cycle, drive, random or an rlog")
+  parser.add_argument("--duration", type=int, default=200, help="frames per event when cycling")
+  parser.add_argument("--frames", type=int, default=12000, help="frames of random events")
+  parser.add_argument("--events", type=int, default=3, help="active random events")
+  parser.add_argument("--metric", action="store_true")
+  parser.add_argument("--runs", type=int, default=2, help="replays that must select the same alerts")
+  args = parser.parse_args()
+
+  failed = False
+  for name in args.scenarios:
+    CP, sm, _ = callback_args()
+    if name == "cycle":
+      frames = cycle_frames(args.duration, sm)
+    elif name == "drive":
+      frames = drive_frames(sm)
+    elif name == "random":
+      frames = random_frames(args.frames, args.events, sm)
+    else:
+      CP, frames = logged_frames(name)
+
+    runs = [replay(CP, frames, args.metric) for _ in range(args.runs)]
+    report(name, frames, *runs[0])
+
+    for i, run in enumerate(runs[1:], 1):
+      diff = first_difference(runs[0][0], run[0])
+      if diff is not None:
+        print(f"  NOT DETERMINISTIC: run {i} selects {run[0][diff] if diff < len(run[0]) else None} " +
+              f"instead of {runs[0][0][diff] if diff < len(runs[0][0]) else None} at frame {diff}")
+        failed = True
+
+  if failed:
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+  main()
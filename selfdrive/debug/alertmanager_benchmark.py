@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+import argparse
+import random
+import time
+from unittest import mock
+
+import numpy as np
+
+from selfdrive.controls.lib.alertmanager import AlertManager
+from selfdrive.controls.lib.events import ET, EVENTS, Events
+from selfdrive.controls.tests.alert_helpers import ALERT_TYPES, ListAlertManager, callback_args
+
+
+def generate_frames(n_events, frames, seed=0):
+  # each frame keeps n_events active, swapping one out about every 5s
+  random.seed(seed)
+  names = [e for e in EVENTS if any(et in EVENTS[e] for et in ALERT_TYPES)]
+  active = random.sample(names, n_events)
+  events = Events()
+  args = callback_args()
+
+  ret = []
+  for _ in range(frames):
+    if random.random() < 0.002:
+      active[random.randrange(n_events)] = random.choice(names)
+    events.clear()
+    for name in active:
+      events.add(name)
+    ret.append(events.create_alerts(ALERT_TYPES, args))
+  return ret
+
+
+def run(AM, frames):
+  costs = []
+  # alert_add events aren't what is being measured
+  with mock.patch('selfdrive.controls.lib.alertmanager.cloudlog.event'):
+    for frame, alerts in enumerate(frames):
+      t = time.perf_counter()
+      AM.add_many(frame, alerts)
+      AM.process_alerts(frame, ET.WARNING)
+      costs.append((time.perf_counter() - t) * 1e6)
+  return np.percentile(costs, 50), np.percentile(costs, 99)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Per frame cost of AlertManager.add_many and process_alerts")
+  parser.add_argument("--events", type=int, nargs='+', default=[1, 3, 8])
+  parser.add_argument("--frames", type=int, default=6000, help="controlsd frames, 100 per second")
+  args = parser.parse_args()
+
+  for n in args.events:
+    frames = generate_frames(n, args.frames)
+    for name, AM in [("list", ListAlertManager()), ("heap", AlertManager())]:
+      p50, p99 = run(AM, frames)
+      print(f"{n:2d} events {name:5s} p50 {p50:8.1f} us  p99 {p99:8.1f} us per frame")
+
+
+if __name__ == "__main__":
+  main()
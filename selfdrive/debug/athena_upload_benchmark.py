@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from selfdrive.athena import athenad
+from selfdrive.athena.tests.helpers import HTTPSink
+
+
+def rpc(method, **params):
+  # same path as a request coming in over the websocket
+  athenad.payload_queue.put_nowait(json.dumps({"method": method, "params": params, "jsonrpc": "2.0", "id": 0}))
+  return json.loads(athenad.response_queue.get(timeout=10).json)
+
+
+def run(workers, files, bandwidth):
+  end_event = threading.Event()
+  handlers = [threading.Thread(target=athenad.jsonrpc_handler, args=(end_event,)) for _ in range(athenad.HANDLER_THREADS)]
+  uploaders = [threading.Thread(target=athenad.upload_handler, args=(end_event, i)) for i in range(workers)]
+  for thread in handlers:
+    thread.start()
+
+  with HTTPSink(bandwidth=bandwidth) as sink:
+    for fn in files:
+      rpc("uploadFileToUrl", fn=fn, url=sink.url + '/' + fn, headers={})
+
+    t = time.monotonic()
+    for thread in uploaders:
+      thread.start()
+
+    # RPC latency while the uploads are running
+    latencies = []
+    while len(sink.uploads) < len(files):
+      t_rpc = time.monotonic()
+      rpc("listUploadQueue")
+      latencies.append((time.monotonic() - t_rpc) * 1000.)
+      time.sleep(0.01)
+    dt = time.monotonic() - t
+
+    end_event.set()
+    for thread in handlers + uploaders:
+      thread.join()
+
+    size = sum(s for _, s in sink.uploads)
+  return size / dt / 1e6, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Upload throughput and RPC latency of athenad against a local HTTP sink")
+  parser.add_argument("--files", type=int, default=8)
+  parser.add_argument("--size", type=int, default=4, help="MB per file")
+  parser.add_argument("--bandwidth", type=float, default=2., help="MB/s per connection")
+  parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+  args = parser.parse_args()
+
+  root = tempfile.mkdtemp()
+  athenad.ROOT = root
+  try:
+    files = []
+    for i in range(args.files):
+      fn = "file%d" % i
+      with open(os.path.join(root, fn), "wb") as f:
+        f.write(os.urandom(args.size * 1024 * 1024))
+      files.append(fn)
+
+    for workers in args.workers:
+      mb_s, p50, p99 = run(workers, files, args.bandwidth * 1e6)
+      print(f"{workers} workers: {mb_s:6.2f} MB/s, listUploadQueue p50 {p50:6.2f} ms p99 {p99:6.2f} ms")
+  finally:
+    shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+import argparse
+import struct
+import time
+
+import numpy as np
+
+from panda.python import parse_can_buffer, parse_can_buffer_array, pack_can_buffer_array
+
+
+def synthetic_buffer(n, seed=0):
+  # mix of standard and extended ids, random lengths, on all three buses
+  rng = np.random.RandomState(seed)
+  address = np.where(rng.rand(n) < 0.9, rng.randint(0, 0x800, n), rng.randint(0x800, 0x20000000, n))
+  length = rng.randint(0, 9, n)
+  bus = rng.randint(0, 3, n)
+  dat = rng.randint(0, 256, (n, 8)).astype(np.uint8)
+  dat[np.arange(8)[None, :] >= length[:, None]] = 0
+  return pack_can_buffer_array(address, dat, length, bus)
+
+
+def parse_can_buffer_loop(dat):
+  # the previous per message implementation
+  ret = []
+  for j in range(0, len(dat), 0x10):
+    ddat = dat[j:j + 0x10]
+    f1, f2 = struct.unpack("II", ddat[0:8])
+    if f1 & 4:
+      address = f1 >> 3
+    else:
+      address = f1 >> 21
+    ret.append((address, f2 >> 16, ddat[8:8 + (f2 & 0xF)], (f2 >> 4) & 0xFF))
+  return ret
+
+
+def bench(f, dat, n):
+  t = time.perf_counter()
+  for _ in range(n):
+    f(dat)
+  return (time.perf_counter() - t) / n * 1e3
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Benchmark decoding panda USB CAN buffers")
+  parser.add_argument("--msgs", type=int, default=256, help="messages per buffer, a full bulk read is 256")
+  parser.add_argument("-n", type=int, default=1000)
+  args = parser.parse_args()
+
+  dat = synthetic_buffer(args.msgs)
+  assert parse_can_buffer(dat) == parse_can_buffer_loop(dat)
+
+  print(f"{args.msgs} messages per buffer")
+  print(f"struct loop:       {bench(parse_can_buffer_loop, dat, args.n):8.3f} ms")
+  print(f"parse_can_buffer:  {bench(parse_can_buffer, dat, args.n):8.3f} ms")
+  print(f"arrays:            {bench(parse_can_buffer_array, dat, args.n):8.3f} ms")
+
+
+if __name__ == "__main__":
+  main()
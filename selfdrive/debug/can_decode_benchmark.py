@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import time
+
+import numpy as np
+
+from opendbc import DBC_PATH
+from opendbc.can.dbc import dbc
+from opendbc.can.parser import decode_can_columns
+
+
+def synthetic_can(can_dbc, n, seed=0):
+  # random payloads for every message in the dbc, 100Hz-ish timestamps
+  rng = np.random.RandomState(seed)
+  all_addresses = np.array(sorted(can_dbc.msgs.keys()), dtype=np.uint32)
+  addresses = all_addresses[rng.randint(0, len(all_addresses), n)]
+  buses = np.zeros(n, dtype=np.uint8)
+  timestamps = np.arange(n, dtype=np.uint64) * 10000
+  dats = rng.randint(0, 256, (n, 8)).astype(np.uint8)
+  return addresses, buses, timestamps, dats
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Benchmark columnar CAN decoding against per frame dbc.decode")
+  parser.add_argument("--dbc", default="hyundai_kia_generic")
+  parser.add_argument("--frames", type=int, default=1000000)
+  args = parser.parse_args()
+
+  can_dbc = dbc(os.path.join(DBC_PATH, args.dbc + ".dbc"))
+  signals = [(m[0][0], s.name) for m in can_dbc.msgs.values() for s in m[1]]
+  addresses, buses, timestamps, dats = synthetic_can(can_dbc, args.frames)
+  print("%d frames, %d signals from %s" % (args.frames, len(signals), args.dbc))
+
+  t = time.monotonic()
+  decode_can_columns(args.dbc, signals, addresses, buses, timestamps, dats)
+  dt = time.monotonic() - t
+  print("decode_can_columns: %.3f s, %.0f frames/s" % (dt, args.frames / dt))
+
+  # python per frame path, on a slice to keep the runtime sane
+  n = min(args.frames, 100000)
+  frames = [(int(a), 0, d.tobytes()) for a, d in zip(addresses[:n], dats[:n])]
+  t = time.monotonic()
+  for f in frames:
+    can_dbc.decode(f)
+  dt = time.monotonic() - t
+  print("dbc.decode:         %.3f s, %.0f frames/s" % (dt, n / dt))
+
+
+if __name__ == "__main__":
+  main()
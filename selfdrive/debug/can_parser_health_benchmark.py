@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+import argparse
+import time
+
+import numpy as np
+
+from cereal import log
+from opendbc.can.dbc import dbc
+from opendbc.can.parser import CANParser
+from common.basedir import BASEDIR
+
+DBC_NAME = "hyundai_kia_generic"
+
+
+def can_events(addresses, n, drop_rate, seed=0):
+  # 100Hz frames of every message, with a few messages dropping out for a while now and then
+  rng = np.random.RandomState(seed)
+  dropped = set()
+  events = []
+  for i in range(n):
+    if i % 100 == 0:
+      dropped = set(rng.choice(addresses, int(len(addresses) * drop_rate), replace=False))
+
+    evt = log.Event.new_message()
+    evt.logMonoTime = int(1e9 + i * 1e7)
+    frames = [a for a in addresses if a not in dropped]
+    evt.init('can', len(frames))
+    for j, address in enumerate(frames):
+      evt.can[j] = {'address': int(address), 'busTime': 0, 'dat': b'\x00' * 8, 'src': 0}
+    events.append(evt.to_bytes())
+  return events
+
+
+def main():
+  parser = argparse.ArgumentParser(description=f"CANParser update cost with timeout checks on every message of {DBC_NAME}")
+  parser.add_argument("-n", type=int, default=2000, help="number of 100Hz updates")
+  parser.add_argument("--drop-rate", type=float, default=0.05, help="share of messages missing at a time")
+  args = parser.parse_args()
+
+  addresses = sorted(dbc(f"{BASEDIR}/opendbc/{DBC_NAME}.dbc").msgs.keys())
+
+  for num_checked in [10, 50, len(addresses)]:
+    checks = [(a, 100) for a in addresses[:num_checked]]
+    cp = CANParser(DBC_NAME, [], checks, 0)
+    events = can_events(addresses[:num_checked], args.n, args.drop_rate)
+
+    t = time.perf_counter()
+    for dat in events:
+      cp.update_string(dat)
+    update_us = (time.perf_counter() - t) / args.n * 1e6
+
+    t = time.perf_counter()
+    for _ in range(100):
+      cp.invalid_messages()
+    invalid_us = (time.perf_counter() - t) / 100 * 1e6
+
+    stats = cp.message_stats()
+    timeouts = sum(s['timeouts'] for s in stats.values())
+    print(f"{num_checked:4d} checked messages: update_string {update_us:8.2f} us, invalid_messages {invalid_us:8.2f} us, {timeouts} timeouts")
+
+
+if __name__ == "__main__":
+  main()
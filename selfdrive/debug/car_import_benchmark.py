@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import subprocess
+import sys
+
+from common.basedir import BASEDIR
+from selfdrive.car.manifest import load_manifest
+
+# runs in a fresh interpreter so every measurement starts with a cold module cache
+IMPORT_SNIPPET = """
+import json, resource, sys, time
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t = time.perf_counter()
+from selfdrive.car.fingerprints import all_known_cars
+from selfdrive.car.car_helpers import load_interface
+for brand_name in json.loads(sys.argv[1]):
+  load_interface(brand_name)
+dt = time.perf_counter() - t
+print(json.dumps([dt, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss]))
+"""
+
+
+def measure(brand_names, n):
+  times, rss = [], []
+  for _ in range(n):
+    out = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET, json.dumps(brand_names)], cwd=BASEDIR)
+    dt, drss = json.loads(out)
+    times.append(dt)
+    rss.append(drss)
+  return min(times), min(rss)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Compare importing every car brand at startup with importing only the fingerprinted one")
+  parser.add_argument("--brand", default="toyota", help="brand to load lazily")
+  parser.add_argument("-n", type=int, default=5, help="runs per measurement, the fastest is reported")
+  args = parser.parse_args()
+
+  all_brands = list(load_manifest())
+  eager_t, eager_rss = measure(all_brands, args.n)
+  lazy_t, lazy_rss = measure([args.brand], args.n)
+
+  print(f"all {len(all_brands)} brands: {eager_t * 1000.:8.1f} ms, {eager_rss / 1024.:6.1f} MB RSS")
+  print(f"{args.brand:14s}: {lazy_t * 1000.:8.1f} ms, {lazy_rss / 1024.:6.1f} MB RSS")
+  print(f"saved         : {(eager_t - lazy_t) * 1000.:8.1f} ms, {(eager_rss - lazy_rss) / 1024.:6.1f} MB RSS")
+
+
+if __name__ == "__main__":
+  main()
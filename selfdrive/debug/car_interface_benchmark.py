@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+import argparse
+import importlib
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+import numpy as np
+
+from cereal import car, log
+from common.basedir import BASEDIR
+from opendbc.can.dbc import dbc
+from opendbc.can.packer import CANPacker
+from selfdrive.car.car_helpers import interfaces
+from selfdrive.car.fingerprints import all_known_cars
+from selfdrive.car.fingerprints import _FINGERPRINTS as FINGERPRINTS
+from selfdrive.controls.lib.events import Events
+
+DT = 0.01
+BUSES = [0, 1, 2]
+WARMUP_FRAMES = 10
+BASELINE = os.getenv("CAR_BENCHMARK_BASELINE", os.path.join(tempfile.gettempdir(), "car_interface_baseline.json"))
+
+METRICS = ["CarInterface.update", "CarState.update", "Events.to_msg", "CarInterface.apply", "CarController.update", "CANPacker"]
+
+
+class FrameTimer():
+  """Time spent per frame in the calls it wraps."""
+  def __init__(self):
+    self.current = 0.
+    self.frames = []
+
+  def wrap(self, f):
+    def wrapped(*args, **kwargs):
+      t = time.perf_counter()
+      try:
+        return f(*args, **kwargs)
+      finally:
+        self.current += time.perf_counter() - t
+    return wrapped
+
+  def end_frame(self):
+    self.frames.append(self.current * 1e6)
+    self.current = 0.
+
+  def percentiles(self):
+    frames = self.frames[WARMUP_FRAMES:]
+    if not len(frames):
+      return [0., 0.]
+    return [float(np.percentile(frames, 50)), float(np.percentile(frames, 99))]
+
+
+class TimedPacker():
+  def __init__(self, packer, timer):
+    self.packer = packer
+    self.make_can_msg = timer.wrap(packer.make_can_msg)
+
+  def __getattr__(self, name):
+    return getattr(self.packer, name)
+
+
+def signal_values(signals, frame):
+  # stationary values, but a cruising speed and running counters so checks pass
+  values = {}
+  for sig in signals:
+    name = sig.name.upper()
+    if 'COUNTER' in name or 'ALIVE' in name or 'MSGCOUNT' in name:
+      values[sig.name] = frame % (1 << sig.size)
+      continue
+
+    value = 50. if 'SPEED' in name or 'SPD' in name else 0.
+    if sig.tmax > sig.tmin:
+      value = min(max(value, sig.tmin), sig.tmax)
+    values[sig.name] = value
+  return values
+
+
+def can_frames(car_name, CP, n):
+  """A serialized can Event per 100Hz frame, with every message in the car's fingerprint on each bus."""
+  fingerprint = FINGERPRINTS[car_name][0]
+  dbc_name = importlib.import_module(f"selfdrive.car.{CP.carName}.values").DBC[car_name]['pt']
+  msgs = dbc(os.path.join(BASEDIR, "opendbc", dbc_name + ".dbc")).msgs
+  packer = CANPacker(dbc_name)
+
+  frames = []
+  for i in range(n):
+    dats = []
+    for address, size in sorted(fingerprint.items()):
+      if address in msgs:
+        dats.append((address, packer.make_can_msg(address, 0, signal_values(msgs[address][1], i))[2]))
+      else:
+        dats.append((address, b'\x00' * size))
+
+    evt = log.Event.new_message()
+    evt.logMonoTime = int((1. + i * DT) * 1e9)
+    evt.init('can', len(dats) * len(BUSES))
+    for j, (bus, (address, dat)) in enumerate((bus, d) for bus in BUSES for d in dats):
+      evt.can[j] = {'address': address, 'busTime': 0, 'dat': dat, 'src': bus}
+    frames.append(evt.to_bytes())
+  return frames
+
+
+def car_controls(n):
+  # disengaged for the first second, then steering and accelerating back and forth
+  ret = []
+  for i in range(n):
+    t = i * DT
+    CC = car.CarControl.new_message()
+    CC.enabled = i >= 100
+    CC.actuators.steer = 0.5 * math.sin(t)
+    CC.actuators.steerAngle = 10. * math.sin(t)
+    CC.actuators.gas = 0.3 * max(math.sin(0.5 * t), 0.)
+    CC.actuators.brake = 0.3 * max(-math.sin(0.5 * t), 0.)
+    CC.hudControl.setSpeed = 25.
+    CC.hudControl.speedVisible = CC.enabled
+    CC.hudControl.lanesVisible = True
+    CC.hudControl.leadVisible = True
+    ret.append(CC)
+  return ret
+
+
+def bench_car(car_name, n):
+  CarInterface, CarController, CarState = interfaces[car_name]
+  fingerprint = FINGERPRINTS[car_name][0]
+  CP = CarInterface.get_params(car_name, {0: fingerprint, 1: fingerprint, 2: fingerprint}, True, [])
+  CI = CarInterface(CP, CarController, CarState)
+
+  frames = can_frames(car_name, CP, n)
+  controls = car_controls(n)
+
+  timers = {m: FrameTimer() for m in METRICS}
+  CI.CS.update = timers["CarState.update"].wrap(CI.CS.update)
+  if CI.CC is not None:
+    CI.CC.update = timers["CarController.update"].wrap(CI.CC.update)
+    for k, v in list(vars(CI.CC).items()):
+      if isinstance(v, CANPacker):
+        setattr(CI.CC, k, TimedPacker(v, timers["CANPacker"]))
+  update = timers["CarInterface.update"].wrap(CI.update)
+  apply = timers["CarInterface.apply"].wrap(CI.apply)
+
+  with mock.patch.object(Events, 'to_msg', timers["Events.to_msg"].wrap(Events.to_msg)):
+    for can, CC in zip(frames, controls):
+      update(CC, [can])
+      apply(CC)
+      for timer in timers.values():
+        timer.end_frame()
+
+  return {m: timers[m].percentiles() for m in METRICS}
+
+
+def compare(results, baseline, tolerance, min_us):
+  regressions = []
+  for car_name, metrics in results.items():
+    for metric, (p50, p99) in metrics.items():
+      base = baseline.get(car_name, {}).get(metric)
+      if base is not None and p50 > base[0] * (1. + tolerance) and p50 - base[0] > min_us:
+        regressions.append(f"{car_name} {metric}: p50 {base[0]:.1f} -> {p50:.1f} us")
+  return regressions
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Per car p50/p99 cost of the CarInterface hot path on synthetic 100Hz CAN traffic")
+  parser.add_argument("cars", nargs="*", help="defaults to every known car")
+  parser.add_argument("--brand", action="append", help="only cars of this brand, can be repeated")
+  parser.add_argument("-n", type=int, default=1000, help="100Hz frames per car")
+  parser.add_argument("--baseline", default=BASELINE)
+  parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+  parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 slowdown against the baseline")
+  parser.add_argument("--min-us", type=float, default=2., help="ignore p50 slowdowns smaller than this")
+  args = parser.parse_args()
+
+  cars = args.cars or sorted(all_known_cars())
+  if args.brand:
+    cars = [c for c in cars if interfaces[c][0].__module__.split('.')[2] in args.brand]
+
+  print(f"{'p50/p99 us':40s} " + " ".join(f"{m:>22s}" for m in METRICS))
+  results = {}
+  for car_name in cars:
+    results[car_name] = bench_car(car_name, args.n)
+    print(f"{car_name:40s} " + " ".join(f"{p50:10.1f} /{p99:10.1f}" for p50, p99 in results[car_name].values()))
+
+  if args.save:
+    baseline = {}
+    if os.path.isfile(args.baseline):
+      with open(args.baseline) as f:
+        baseline = json.load(f)
+    baseline.update(results)
+    with open(args.baseline, 'w') as f:
+      json.dump(baseline, f, indent=2, sort_keys=True)
+    print(f"saved baseline to {args.baseline}")
+  elif os.path.isfile(args.baseline):
+    with open(args.baseline) as f:
+      regressions = compare(results, json.load(f), args.tolerance, args.min_us)
+    for r in regressions:
+      print(f"REGRESSION {r}")
+    if len(regressions):
+      sys.exit(1)
+    print(f"no regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+  main()
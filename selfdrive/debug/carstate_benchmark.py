@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+import argparse
+import time
+
+from cereal import car
+from opendbc.can.parser import CANParser
+from selfdrive.car.car_helpers import interfaces
+from selfdrive.car.fingerprints import _FINGERPRINTS as FINGERPRINTS
+
+DEFAULT_CARS = ["HYUNDAI SONATA 2020", "HONDA CIVIC 2016 TOURING", "TOYOTA RAV4 2017"]
+
+
+def bench(f, n):
+  t = time.perf_counter()
+  for _ in range(n):
+    f()
+  return (time.perf_counter() - t) / n * 1e6
+
+
+def read_vl(parsers):
+  for cp, sigs in parsers:
+    for msg, sig in sigs:
+      cp.vl[msg][sig]
+
+
+def read_accessors(parsers):
+  for cp, sigs in parsers:
+    for msg, sig in sigs:
+      getattr(getattr(cp, msg), sig)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Time CarInterface.update and signal access through vl vs the typed accessors")
+  parser.add_argument("cars", nargs="*", default=DEFAULT_CARS)
+  parser.add_argument("-n", type=int, default=10000)
+  args = parser.parse_args()
+
+  for car_name in args.cars:
+    CarInterface, CarController, CarState = interfaces[car_name]
+    fingerprint = FINGERPRINTS[car_name][0]
+    CP = CarInterface.get_params(car_name, {0: fingerprint, 1: fingerprint, 2: fingerprint}, True, [])
+    CI = CarInterface(CP, CarController, CarState)
+    CC = car.CarControl.new_message()
+
+    parsers = []
+    for cp in vars(CI).values():
+      if isinstance(cp, CANParser):
+        # every parsed signal, as a CarState would read it
+        sigs = [(msg, sig) for msg in list(vars(cp)) for sig in type(getattr(cp, msg)).__slots__]
+        parsers.append((cp, sigs))
+    n_sigs = sum(len(sigs) for _, sigs in parsers)
+
+    update_us = bench(lambda: CI.update(CC, []), args.n)
+    vl_us = bench(lambda: read_vl(parsers), args.n)
+    accessor_us = bench(lambda: read_accessors(parsers), args.n)
+
+    print(f"{car_name}")
+    print(f"  CarInterface.update {update_us:8.2f} us")
+    print(f"  {n_sigs} signals: vl {vl_us:8.2f} us, accessors {accessor_us:8.2f} us")
+
+
+if __name__ == "__main__":
+  main()
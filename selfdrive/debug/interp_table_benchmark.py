@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+import argparse
+import time
+
+from cereal import car
+from common.numpy_fast import interp
+from common.interp_table import InterpTable  # pylint: disable=no-name-in-module, import-error
+
+
+def car_params():
+  # typical tables, 2 to 5 breakpoints
+  CP = car.CarParams.new_message()
+  CP.gasMaxBP = [0., 10., 20., 35.]
+  CP.gasMaxV = [0.5, 0.4, 0.3, 0.2]
+  CP.brakeMaxBP = [0., 20.]
+  CP.brakeMaxV = [1., 0.8]
+  CP.steerMaxBP = [0.]
+  CP.steerMaxV = [1.]
+  CP.longitudinalTuning.kpBP = [0., 5., 10., 20., 35.]
+  CP.longitudinalTuning.kpV = [1.2, 0.8, 0.5, 0.4, 0.3]
+  return CP.as_reader()
+
+
+def main():
+  parser = argparse.ArgumentParser(description="numpy_fast.interp on CarParams lists against precompiled InterpTables")
+  parser.add_argument("-n", type=int, default=100000)
+  args = parser.parse_args()
+
+  CP = car_params()
+  curves = [(CP.gasMaxBP, CP.gasMaxV), (CP.brakeMaxBP, CP.brakeMaxV), (CP.steerMaxBP, CP.steerMaxV),
+            (CP.longitudinalTuning.kpBP, CP.longitudinalTuning.kpV)]
+  tables = [InterpTable(xp, fp) for xp, fp in curves]
+  speeds = [i * 0.037 % 40. for i in range(args.n)]
+
+  t = time.perf_counter()
+  for v in speeds:
+    for xp, fp in curves:
+      interp(v, xp, fp)
+  interp_us = (time.perf_counter() - t) / args.n * 1e6
+
+  t = time.perf_counter()
+  for v in speeds:
+    for table in tables:
+      table(v)
+  table_us = (time.perf_counter() - t) / args.n * 1e6
+
+  print(f"{len(curves)} lookups per frame")
+  print(f"interp on capnp lists: {interp_us:8.2f} us per frame")
+  print(f"InterpTable:           {table_us:8.2f} us per frame")
+
+
+if __name__ == "__main__":
+  main()
@@ -74,6 +74,10 @@ if __name__ == "__main__":
 
       print("CPU %.2f%% - RAM: %.2f - Temp %.2f" % (100. * np.mean(cores), last_mem, last_temp))
 
+      # the messages in between only hold the managed processes
+      if not m.allProcs:
+        continue
+
       if args.cpu and prev_proclog is not None:
         procs = {}
         dt = (sm.logMonoTime['procLog'] - prev_proclog_t) / 1e9
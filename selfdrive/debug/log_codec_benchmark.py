@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+import argparse
+import bz2
+import random
+import time
+import zlib
+
+from cereal import log
+
+
+def synthetic_log(n, seed=0):
+  # a mix of the high frequency services that make up most of an rlog
+  rng = random.Random(seed)
+  dat = bytearray()
+  for i in range(n):
+    evt = log.Event.new_message()
+    evt.logMonoTime = i * 10000000
+    evt.valid = True
+    which = i % 3
+    if which == 0:
+      can = evt.init('can', 40)
+      for j, c in enumerate(can):
+        c.address = 0x100 + j
+        c.busTime = rng.randint(0, 0xffff)
+        c.dat = bytes(rng.randint(0, 255) for _ in range(8))
+        c.src = j % 3
+    elif which == 1:
+      evt.init('carState')
+      evt.carState.vEgo = rng.uniform(0., 30.)
+      evt.carState.steeringAngle = rng.uniform(-10., 10.)
+      evt.carState.gas = rng.uniform(0., 1.)
+    else:
+      evt.init('controlsState')
+      evt.controlsState.vPid = rng.uniform(0., 30.)
+      evt.controlsState.angleSteers = rng.uniform(-10., 10.)
+    dat += evt.to_bytes()
+  return bytes(dat)
+
+
+def bench(name, compress, dat, chunk_size):
+  t = time.process_time()
+  out = 0
+  c = compress()
+  for i in range(0, len(dat), chunk_size):
+    out += len(c.compress(dat[i:i+chunk_size]))
+  out += len(c.flush())
+  dt = time.process_time() - t
+
+  mb = len(dat) / 1e6
+  print(f"{name:8s} {dt / mb * 1000.:8.2f} ms CPU/MB {len(dat) / out:6.2f}x ratio {out / 1e6:8.2f} MB out")
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Compare CPU cost and compression ratio of the loggerd codecs")
+  parser.add_argument("rlog", nargs="?", help="rlog.bz2 or uncompressed rlog, synthetic events when omitted")
+  parser.add_argument("--events", type=int, default=30000)
+  parser.add_argument("--chunk-size", type=int, default=4096, help="bytes per write, loggerd writes one event at a time")
+  args = parser.parse_args()
+
+  if args.rlog is None:
+    dat = synthetic_log(args.events)
+  else:
+    with open(args.rlog, "rb") as f:
+      dat = f.read()
+    if args.rlog.endswith(".bz2"):
+      dat = bz2.decompress(dat)
+
+  print(f"{len(dat) / 1e6:.2f} MB of events")
+  bench("bz2 -9", lambda: bz2.BZ2Compressor(9), dat, args.chunk_size)
+  bench("gz -1", lambda: zlib.compressobj(1, zlib.DEFLATED, 16 + zlib.MAX_WBITS), dat, args.chunk_size)
+  bench("gz -6", lambda: zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS), dat, args.chunk_size)
+
+
+if __name__ == "__main__":
+  main()
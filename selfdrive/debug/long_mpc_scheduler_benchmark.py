@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+
+import numpy as np
+
+from selfdrive.controls.tests.planner_replay import CRUISE_FIELDS, EXACT_FIELDS, PLAN_FIELDS, compare, replay, scenario
+
+
+def main():
+  parser = argparse.ArgumentParser(description="plannerd cpu with and without longitudinal mpc scheduling, and the plans compared")
+  parser.add_argument("scenarios", nargs="*", default=["cruise", "follow", "stop_and_go", "cut_in"])
+  parser.add_argument("--seconds", type=float, default=60.)
+  parser.add_argument("--tolerance", type=float, default=0.05, help="allowed difference in m/s and m/s^2")
+  args = parser.parse_args()
+
+  failed = False
+  for name in args.scenarios:
+    frames = scenario(name, args.seconds)
+    ref, ref_times, _ = replay(frames, False)
+    plans, times, stats = replay(frames, True)
+    diffs = compare(ref, plans)
+
+    print(f"{name}: {len(frames)} updates")
+    print(f"  Planner.update  p50 {np.median(ref_times):.3f} -> {np.median(times):.3f} ms, " +
+          f"total {ref_times.sum():.0f} -> {times.sum():.0f} ms ({(1. - times.sum() / ref_times.sum()) * 100.:.0f}% saved)")
+    print("  mpc updates     " + ", ".join(f"{k[:-5]} {v * 100.:.0f}%" for k, v in stats.items() if k.endswith('_rate')) +
+          f", {stats['solve_time_ms']:.3f} ms per solve")
+    print("  max diff        " + ", ".join(f"{k} {v:.4f}" if isinstance(v, float) else f"{k} {v}" for k, v in diffs.items()))
+
+    if any(diffs[f] > args.tolerance for f in PLAN_FIELDS + CRUISE_FIELDS) or any(diffs[f] for f in EXACT_FIELDS + ['source']):
+      print("  NOT EQUIVALENT")
+      failed = True
+
+  if failed:
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+  main()
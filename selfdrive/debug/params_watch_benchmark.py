@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from common.params import Params
+
+KEY = "IsMetric"
+
+
+def poll_wait(params, last, interval):
+  # how blocking reads and per frame checks used to find out about changes
+  while True:
+    val = params.get(KEY)
+    if val != last:
+      return val
+    time.sleep(interval)
+
+
+def watch_wait(params, last, watcher):
+  while True:
+    watcher.wait()
+    val = params.get(KEY)
+    if val != last:
+      return val
+
+
+def run(d, wait, n, period):
+  params = Params(d)
+  params.put(KEY, "0")
+  latencies = []
+  done = threading.Event()
+  ready = threading.Event()
+  cpu = []
+
+  def reader():
+    t_cpu = time.thread_time()
+    last = b"0"
+    ready.set()
+    for _ in range(n):
+      last = wait(params, last)
+      latencies.append((time.monotonic() - float(last.split(b" ")[1])) * 1000.)
+    cpu.append(time.thread_time() - t_cpu)
+    done.set()
+
+  thread = threading.Thread(target=reader)
+  thread.start()
+  ready.wait()
+
+  # jitter the writes so they don't line up with the poll interval
+  rng = np.random.RandomState(0)
+  t = time.monotonic()
+  for i in range(n):
+    time.sleep(period * rng.uniform(0.5, 1.5))
+    params.put(KEY, "%d %f" % (i + 1, time.monotonic()))
+  done.wait()
+  thread.join()
+  dt = time.monotonic() - t
+  return np.percentile(latencies, 50), np.percentile(latencies, 99), cpu[0] / dt * 100.
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Change latency and reader CPU of polling params against the inotify watcher")
+  parser.add_argument("-n", type=int, default=50, help="number of writes")
+  parser.add_argument("--period", type=float, default=0.2, help="s between writes")
+  parser.add_argument("--poll-interval", type=float, default=0.1, help="s between polls, the old blocking read used 0.1")
+  args = parser.parse_args()
+
+  d = tempfile.mkdtemp()
+  try:
+    params = Params(d)
+    watcher = params.watch([KEY])
+    for name, wait in [("poll", lambda p, last: poll_wait(p, last, args.poll_interval)),
+                       ("inotify", lambda p, last: watch_wait(p, last, watcher))]:
+      p50, p99, cpu = run(d, wait, args.n, args.period)
+      print(f"{name:8s} latency p50 {p50:7.2f} ms p99 {p99:7.2f} ms, reader cpu {cpu:5.2f}%")
+
+    # cost of checking for a change from a loop, like pathplanner does every model frame
+    n = 10000
+    t = time.perf_counter()
+    for _ in range(n):
+      Params(d).get(KEY)
+    get_us = (time.perf_counter() - t) / n * 1e6
+    t = time.perf_counter()
+    for _ in range(n):
+      watcher.read()
+    read_us = (time.perf_counter() - t) / n * 1e6
+    print(f"per frame check: get {get_us:.2f} us, watcher.read {read_us:.2f} us")
+  finally:
+    shutil.rmtree(d)
+
+
+if __name__ == "__main__":
+  main()
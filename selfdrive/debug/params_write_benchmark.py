@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+
+from common.params import Params, ParamsWriter
+from common.params_pyx import keys  # pylint: disable=no-name-in-module, import-error
+
+PERSISTENT, CLEAR_ON_MANAGER_START = 1, 2  # TxType in params_pyx
+WRITE_KEYS = ["CarBatteryCapacity", "CalibrationParams", "LiveParameters", "CarParamsCache"]
+
+
+def put_thread_per_call(d, key, val):
+  # the previous put_nonblocking
+  t = threading.Thread(target=lambda: Params(d).put(key, val))
+  t.start()
+  return t
+
+
+def bench_throughput(d, n):
+  threads = []
+  t = time.monotonic()
+  for i in range(n):
+    threads.append(put_thread_per_call(d, WRITE_KEYS[i % len(WRITE_KEYS)], str(i)))
+  for thread in threads:
+    thread.join()
+  thread_rate = n / (time.monotonic() - t)
+
+  writer = ParamsWriter(d)
+  t = time.monotonic()
+  for i in range(n):
+    writer.put(WRITE_KEYS[i % len(WRITE_KEYS)], str(i))
+  writer.flush()
+  writer_rate = n / (time.monotonic() - t)
+  return thread_rate, writer_rate
+
+
+def bench_manager_start(d, default_params):
+  params = Params(d)
+  cleared = {k.decode(): "1" for k in keys if CLEAR_ON_MANAGER_START in keys[k]}
+
+  # per key deletes and writes, like manager used to do
+  params.put_many(cleared)
+  for k in default_params:
+    params.delete(k)
+  t = time.monotonic()
+  for key in keys:
+    if CLEAR_ON_MANAGER_START in keys[key]:
+      params.delete(key)
+  for k, v in default_params.items():
+    if params.get(k) is None:
+      params.put(k, v)
+  per_key = time.monotonic() - t
+
+  params.put_many(cleared)
+  for k in default_params:
+    params.delete(k)
+  t = time.monotonic()
+  params.manager_start()
+  params.put_many({k: v for k, v in default_params.items() if params.get(k) is None})
+  batched = time.monotonic() - t
+  return per_key * 1000., batched * 1000.
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Params write throughput and manager startup cost, per key vs batched commits")
+  parser.add_argument("-n", type=int, default=200, help="number of nonblocking writes")
+  parser.add_argument("--dir", help="params directory to use, defaults to a temp dir. Use one on the target filesystem, fsync cost dominates")
+  args = parser.parse_args()
+
+  d = args.dir if args.dir is not None else tempfile.mkdtemp()
+  try:
+    thread_rate, writer_rate = bench_throughput(d, args.n)
+    print(f"thread per put:   {thread_rate:10.1f} writes/s")
+    print(f"coalesced writer: {writer_rate:10.1f} writes/s")
+
+    # first boot, all of manager's persistent defaults are unset
+    default_params = {k.decode(): "0" for k in keys if keys[k] == [PERSISTENT]}
+    per_key_ms, batched_ms = bench_manager_start(d, default_params)
+    print(f"manager start, a write per key: {per_key_ms:8.2f} ms total")
+    print(f"manager start, batched:         {batched_ms:8.2f} ms total")
+  finally:
+    if args.dir is None:
+      shutil.rmtree(d)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from selfdrive.cpu_isolation import SWEEP_INTERVAL, CoreStats, CpuIsolation
+
+# the loop selfdrive/rtshield.py used to run
+RTSHIELD = """
+import os, time
+os.sched_setaffinity(0, [%d])
+try:
+  os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(1))
+except PermissionError:
+  pass
+while True:
+  time.sleep(0.000001)
+"""
+
+
+def proc_cpu_time(pid):
+  with open(f"/proc/{pid}/stat") as f:
+    fields = f.read().rsplit(')', 1)[1].split()
+  return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def proc_ctx_switches(pid):
+  ret = 0
+  with open(f"/proc/{pid}/status") as f:
+    for line in f:
+      if line.startswith(("voluntary_ctxt_switches", "nonvoluntary_ctxt_switches")):
+        ret += int(line.split()[1])
+  return ret
+
+
+def bench_rtshield(core, seconds):
+  proc = subprocess.Popen([sys.executable, "-c", RTSHIELD % core])
+  try:
+    time.sleep(0.5)
+    core_stats = CoreStats()
+    cpu, ctx = proc_cpu_time(proc.pid), proc_ctx_switches(proc.pid)
+    time.sleep(seconds)
+    cpu, ctx = proc_cpu_time(proc.pid) - cpu, proc_ctx_switches(proc.pid) - ctx
+    stats = [s for s in core_stats.update() if s['core'] == core]
+  finally:
+    proc.kill()
+    proc.wait()
+  return cpu / seconds * 100., ctx / seconds, stats
+
+
+def bench_sweep(core, n):
+  cpu = CpuIsolation(rt_cores=[core])
+
+  # only measures finding tasks to move, nothing is moved
+  t = time.process_time()
+  cold = sum(1 for _ in cpu.tasks_to_move())
+  cold_s = time.process_time() - t
+
+  t = time.process_time()
+  for _ in range(n):
+    for _ in cpu.tasks_to_move():
+      pass
+  warm_s = (time.process_time() - t) / n
+  return cold, cold_s, warm_s
+
+
+def main():
+  parser = argparse.ArgumentParser(description="CPU cost of the rtshield spin loop against cpu_isolation affinity sweeps")
+  parser.add_argument("--core", type=int, default=os.cpu_count() - 1, help="core to reserve")
+  parser.add_argument("--seconds", type=float, default=10.)
+  parser.add_argument("-n", type=int, default=100, help="sweeps to average")
+  args = parser.parse_args()
+
+  cpu_pct, wakeups, stats = bench_rtshield(args.core, args.seconds)
+  print(f"rtshield:      {cpu_pct:6.2f}% cpu  {wakeups:10.0f} wakeups/s")
+  for s in stats:
+    print(f"  core {s['core']}: {s['wakeups']:.0f} wakeups/s, {s['run_delay_ms']:.3f} ms mean runqueue delay")
+
+  cold, cold_s, warm_s = bench_sweep(args.core, args.n)
+  # sweeps run from manager's existing loop, they don't add wakeups of their own
+  print(f"cpu_isolation: {warm_s / SWEEP_INTERVAL * 100.:6.2f}% cpu  {0:10.0f} wakeups/s")
+  print(f"  first sweep {cold_s * 1e3:.1f} ms finds {cold} tasks to move, later sweeps {warm_s * 1e3:.2f} ms every {SWEEP_INTERVAL:.0f}s")
+
+
+if __name__ == "__main__":
+  main()
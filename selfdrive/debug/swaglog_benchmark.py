@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+import threading
+import time
+
+import numpy as np
+import zmq
+
+from common.logging_extra import SwagLogger, SwagFormatter
+from selfdrive.swaglog import AsyncLogMessageHandler, LogMessageHandler
+
+BENCH_ADDR = "ipc:///tmp/logmessage_benchmark"
+
+
+def sink(ctx, stop):
+  sock = ctx.socket(zmq.PULL)
+  sock.bind(BENCH_ADDR)
+  while not stop.is_set():
+    if sock.poll(100):
+      sock.recv_multipart()
+  sock.close()
+
+
+def run(log, handler, hz, seconds, logs_per_tick):
+  log.addHandler(handler)
+
+  costs = []
+  next_t = time.monotonic()
+  for i in range(int(hz * seconds)):
+    t = time.perf_counter()
+    for j in range(logs_per_tick):
+      log.warning("lead %d lost track, dRel %f", j, i * 0.1)
+    costs.append((time.perf_counter() - t) * 1e6)
+
+    next_t += 1. / hz
+    time.sleep(max(0., next_t - time.monotonic()))
+
+  if hasattr(handler, 'flush'):
+    handler.flush()
+  log.removeHandler(handler)
+  return np.percentile(costs, 50), np.percentile(costs, 99)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Per tick cost of logging from a 100Hz loop, sync vs batched swaglog transport")
+  parser.add_argument("--hz", type=float, default=100.)
+  parser.add_argument("--seconds", type=float, default=5.)
+  parser.add_argument("--logs-per-tick", type=int, default=1)
+  args = parser.parse_args()
+
+  ctx = zmq.Context()
+  stop = threading.Event()
+  sink_thread = threading.Thread(target=sink, args=(ctx, stop))
+  sink_thread.start()
+
+  log = SwagLogger()
+  log.setLevel(logging.DEBUG)
+
+  try:
+    for name, handler in [("sync", LogMessageHandler(SwagFormatter(log), addr=BENCH_ADDR)),
+                          ("async", AsyncLogMessageHandler(SwagFormatter(log), addr=BENCH_ADDR))]:
+      p50, p99 = run(log, handler, args.hz, args.seconds, args.logs_per_tick)
+      print(f"{name:6s} p50 {p50:8.1f} us  p99 {p99:8.1f} us per tick")
+  finally:
+    stop.set()
+    sink_thread.join()
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from selfdrive.thermald.hardware_sampler import SysfsReader
+
+# what thermald reads every tick on an EON
+THERMAL_ZONES = [5, 7, 10, 12, 16, 2, 29, 25]
+POWER_SUPPLY = ["battery/capacity", "battery/status", "battery/current_now", "battery/voltage_now", "usb/present"]
+
+
+def paths():
+  ret = ["/sys/devices/virtual/thermal/thermal_zone%d/temp" % z for z in THERMAL_ZONES]
+  ret += ["/sys/class/power_supply/%s" % p for p in POWER_SUPPLY]
+  return ret
+
+
+def read_open(root, path):
+  try:
+    with open(os.path.join(root, path.lstrip('/'))) as f:
+      return f.read()
+  except Exception:
+    return None
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Compare open/read/close against persistent fds with pread for thermald's sysfs nodes")
+  parser.add_argument("--root", help="sysfs root, defaults to a fake tree in a temp dir")
+  parser.add_argument("-n", type=int, default=10000)
+  args = parser.parse_args()
+
+  root = args.root
+  if root is None:
+    root = tempfile.mkdtemp()
+    for p in paths():
+      fn = os.path.join(root, p.lstrip('/'))
+      os.makedirs(os.path.dirname(fn), exist_ok=True)
+      with open(fn, 'w') as f:
+        f.write("12345\n")
+
+  try:
+    reader = SysfsReader(root)
+    all_paths = paths()
+
+    t = time.perf_counter()
+    for _ in range(args.n):
+      for p in all_paths:
+        read_open(root, p)
+    open_us = (time.perf_counter() - t) / args.n * 1e6
+
+    t = time.perf_counter()
+    for _ in range(args.n):
+      for p in all_paths:
+        reader.read(p, str, None)
+    pread_us = (time.perf_counter() - t) / args.n * 1e6
+
+    print(f"{len(all_paths)} nodes per tick")
+    print(f"open/read/close: {open_us:8.2f} us per tick")
+    print(f"pread:           {pread_us:8.2f} us per tick")
+  finally:
+    if args.root is None:
+      shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+  main()
@@ -27,6 +27,69 @@ static void log_sentinel(LoggerState *s, cereal::Sentinel::SentinelType type) {
   logger_log(s, bytes.begin(), bytes.size(), true);
 }
 
+const char* log_codec_ext(LogCodec codec) {
+  return codec == LOG_CODEC_GZ ? "gz" : "bz2";
+}
+
+LogCodec log_codec_from_env() {
+  const char* codec = getenv("LOGGERD_CODEC");
+  if (codec && strcmp(codec, "gz") == 0) {
+    return LOG_CODEC_GZ;
+  }
+  return LOG_CODEC_BZ2;
+}
+
+static bool log_stream_open(LogStream *ls, const char* path, LogCodec codec) {
+  memset(ls, 0, sizeof(*ls));
+  ls->codec = codec;
+
+  if (codec == LOG_CODEC_GZ) {
+    ls->gz = gzopen(path, "wb1");
+    return ls->gz != NULL;
+  }
+
+  ls->file = fopen(path, "wb");
+  if (ls->file == NULL) return false;
+
+  int bzerror;
+  ls->bz = BZ2_bzWriteOpen(&bzerror, ls->file, 9, 0, 30);
+  if (bzerror != BZ_OK) {
+    ls->bz = NULL;
+    return false;
+  }
+  return true;
+}
+
+static bool log_stream_write(LogStream *ls, uint8_t* data, size_t data_size) {
+  if (ls->codec == LOG_CODEC_GZ) {
+    return gzwrite(ls->gz, data, data_size) == (int)data_size;
+  }
+
+  int bzerror;
+  BZ2_bzWrite(&bzerror, ls->bz, data, data_size);
+  return bzerror == BZ_OK;
+}
+
+static void log_stream_close(LogStream *ls) {
+  if (ls->gz) {
+    gzclose(ls->gz);
+    ls->gz = NULL;
+  }
+  if (ls->bz) {
+    int bzerror;
+    BZ2_bzWriteClose(&bzerror, ls->bz, 0, NULL, NULL);
+    ls->bz = NULL;
+  }
+  if (ls->file) {
+    fclose(ls->file);
+    ls->file = NULL;
+  }
+}
+
+static bool log_stream_is_open(LogStream *ls) {
+  return ls->gz != NULL || ls->bz != NULL;
+}
+
 static int mkpath(char* file_path) {
   assert(file_path && *file_path);
   char* p;
@@ -43,7 +106,8 @@ static int mkpath(char* file_path) {
   return 0;
 }
 
-void logger_init(LoggerState *s, const char* log_name, const uint8_t* init_data, size_t init_data_len, bool has_qlog) {
+void logger_init(LoggerState *s, const char* log_name, const uint8_t* init_data, size_t init_data_len, bool has_qlog,
+                 LogCodec codec) {
   memset(s, 0, sizeof(*s));
   if (init_data) {
     s->init_data = (uint8_t*)malloc(init_data_len);
@@ -58,6 +122,7 @@ void logger_init(LoggerState *s, const char* log_name, const uint8_t* init_data,
 
   s->part = -1;
   s->has_qlog = has_qlog;
+  s->codec = codec;
 
   time_t rawtime = time(NULL);
   struct tm timeinfo;
@@ -83,8 +148,8 @@ static LoggerHandle* logger_open(LoggerState *s, const char* root_path) {
   snprintf(h->segment_path, sizeof(h->segment_path),
           "%s/%s--%d", root_path, s->route_name, s->part);
 
-  snprintf(h->log_path, sizeof(h->log_path), "%s/%s.bz2", h->segment_path, s->log_name);
-  snprintf(h->qlog_path, sizeof(h->qlog_path), "%s/qlog.bz2", h->segment_path);
+  snprintf(h->log_path, sizeof(h->log_path), "%s/%s.%s", h->segment_path, s->log_name, log_codec_ext(s->codec));
+  snprintf(h->qlog_path, sizeof(h->qlog_path), "%s/qlog.%s", h->segment_path, log_codec_ext(s->codec));
   snprintf(h->lock_path, sizeof(h->lock_path), "%s.lock", h->log_path);
 
   err = mkpath(h->log_path);
@@ -94,31 +159,18 @@ static LoggerHandle* logger_open(LoggerState *s, const char* root_path) {
   if (lock_file == NULL) return NULL;
   fclose(lock_file);
 
-  h->log_file = fopen(h->log_path, "wb");
-  if (h->log_file == NULL) goto fail;
+  if (!log_stream_open(&h->log, h->log_path, s->codec)) goto fail;
 
   if (s->has_qlog) {
-    h->qlog_file = fopen(h->qlog_path, "wb");
-    if (h->qlog_file == NULL) goto fail;
-  }
-
-  int bzerror;
-  h->bz_file = BZ2_bzWriteOpen(&bzerror, h->log_file, 9, 0, 30);
-  if (bzerror != BZ_OK) goto fail;
-
-  if (s->has_qlog) {
-    h->bz_qlog = BZ2_bzWriteOpen(&bzerror, h->qlog_file, 9, 0, 30);
-    if (bzerror != BZ_OK) goto fail;
+    if (!log_stream_open(&h->qlog, h->qlog_path, s->codec)) goto fail;
   }
 
   if (s->init_data) {
-    BZ2_bzWrite(&bzerror, h->bz_file, s->init_data, s->init_data_len);
-    if (bzerror != BZ_OK) goto fail;
+    if (!log_stream_write(&h->log, s->init_data, s->init_data_len)) goto fail;
 
     if (s->has_qlog) {
       // init data goes in the qlog too
-      BZ2_bzWrite(&bzerror, h->bz_qlog, s->init_data, s->init_data_len);
-      if (bzerror != BZ_OK) goto fail;
+      if (!log_stream_write(&h->qlog, s->init_data, s->init_data_len)) goto fail;
     }
   }
 
@@ -127,22 +179,8 @@ static LoggerHandle* logger_open(LoggerState *s, const char* root_path) {
   return h;
 fail:
   LOGE("logger failed to open files");
-  if (h->bz_file) {
-    BZ2_bzWriteClose(&bzerror, h->bz_file, 0, NULL, NULL);
-    h->bz_file = NULL;
-  }
-  if (h->bz_qlog) {
-    BZ2_bzWriteClose(&bzerror, h->bz_qlog, 0, NULL, NULL);
-    h->bz_qlog = NULL;
-  }
-  if (h->qlog_file) {
-    fclose(h->qlog_file);
-    h->qlog_file = NULL;
-  }
-  if (h->log_file) {
-    fclose(h->log_file);
-    h->log_file = NULL;
-  }
+  log_stream_close(&h->log);
+  log_stream_close(&h->qlog);
   return NULL;
 }
 
@@ -213,11 +251,10 @@ void logger_close(LoggerState *s) {
 void lh_log(LoggerHandle* h, uint8_t* data, size_t data_size, bool in_qlog) {
   pthread_mutex_lock(&h->lock);
   assert(h->refcnt > 0);
-  int bzerror;
-  BZ2_bzWrite(&bzerror, h->bz_file, data, data_size);
+  log_stream_write(&h->log, data, data_size);
 
-  if (in_qlog && h->bz_qlog != NULL) {
-    BZ2_bzWrite(&bzerror, h->bz_qlog, data, data_size);
+  if (in_qlog && log_stream_is_open(&h->qlog)) {
+    log_stream_write(&h->qlog, data, data_size);
   }
   pthread_mutex_unlock(&h->lock);
 }
@@ -227,22 +264,8 @@ void lh_close(LoggerHandle* h) {
   assert(h->refcnt > 0);
   h->refcnt--;
   if (h->refcnt == 0) {
-    if (h->bz_file){
-      int bzerror;
-      BZ2_bzWriteClose(&bzerror, h->bz_file, 0, NULL, NULL);
-      h->bz_file = NULL;
-    }
-    if (h->bz_qlog){
-      int bzerror;
-      BZ2_bzWriteClose(&bzerror, h->bz_qlog, 0, NULL, NULL);
-      h->bz_qlog = NULL;
-    }
-    if (h->qlog_file) {
-      fclose(h->qlog_file);
-      h->qlog_file = NULL;
-    }
-    fclose(h->log_file);
-    h->log_file = NULL;
+    log_stream_close(&h->log);
+    log_stream_close(&h->qlog);
     unlink(h->lock_path);
     pthread_mutex_unlock(&h->lock);
     pthread_mutex_destroy(&h->lock);
@@ -5,6 +5,7 @@
 #include <stdint.h>
 #include <pthread.h>
 #include <bzlib.h>
+#include <zlib.h>
 
 #ifdef __cplusplus
 extern "C" {
@@ -12,18 +13,29 @@ extern "C" {
 
 #define LOGGER_MAX_HANDLES 16
 
+// The codec is part of the file name (rlog.bz2, rlog.gz), so readers can tell them apart
+typedef enum LogCodec {
+  LOG_CODEC_BZ2,  // bzip2 -9, what all existing tooling expects
+  LOG_CODEC_GZ,   // gzip -1, several times cheaper to write at a worse ratio
+} LogCodec;
+
+typedef struct LogStream {
+  LogCodec codec;
+  FILE* file;
+  BZFILE* bz;
+  gzFile gz;
+} LogStream;
+
 typedef struct LoggerHandle {
   pthread_mutex_t lock;
   int refcnt;
   char segment_path[4096];
   char log_path[4096];
   char lock_path[4096];
-  FILE* log_file;
-  BZFILE* bz_file;
+  LogStream log;
 
-  FILE* qlog_file;
   char qlog_path[4096];
-  BZFILE* bz_qlog;
+  LogStream qlog;
 } LoggerHandle;
 
 typedef struct LoggerState {
@@ -36,12 +48,17 @@ typedef struct LoggerState {
   char route_name[64];
   char log_name[64];
   bool has_qlog;
+  LogCodec codec;
 
   LoggerHandle handles[LOGGER_MAX_HANDLES];
   LoggerHandle* cur_handle;
 } LoggerState;
 
-void logger_init(LoggerState *s, const char* log_name, const uint8_t* init_data, size_t init_data_len, bool has_qlog);
+const char* log_codec_ext(LogCodec codec);
+LogCodec log_codec_from_env();
+
+void logger_init(LoggerState *s, const char* log_name, const uint8_t* init_data, size_t init_data_len, bool has_qlog,
+                 LogCodec codec);
 int logger_next(LoggerState *s, const char* root_path,
                             char* out_segment_path, size_t out_segment_path_len,
                             int* out_part);
@@ -574,7 +574,7 @@ static void bootlog() {
   {
     auto words = gen_init_data();
     auto bytes = words.asBytes();
-    logger_init(&s.logger, "bootlog", bytes.begin(), bytes.size(), false);
+    logger_init(&s.logger, "bootlog", bytes.begin(), bytes.size(), false, log_codec_from_env());
   }
 
   err = logger_next(&s.logger, LOG_ROOT, s.segment_path, sizeof(s.segment_path), &s.rotate_segment);
@@ -658,7 +658,7 @@ int main(int argc, char** argv) {
   {
     auto words = gen_init_data();
     auto bytes = words.asBytes();
-    logger_init(&s.logger, "rlog", bytes.begin(), bytes.size(), true);
+    logger_init(&s.logger, "rlog", bytes.begin(), bytes.size(), true, log_codec_from_env());
   }
 
   s.rotate_seq_id = 0;
@@ -82,8 +82,8 @@ class Uploader():
     self.last_resp = None
     self.last_exc = None
 
-    self.immediate_priority = {"qlog.bz2": 0, "qcamera.ts": 1}
-    self.high_priority = {"rlog.bz2": 0, "fcamera.hevc": 1, "dcamera.hevc": 2, "ecamera.hevc": 3}
+    self.immediate_priority = {"qlog.bz2": 0, "qlog.gz": 0, "qcamera.ts": 1}
+    self.high_priority = {"rlog.bz2": 0, "rlog.gz": 0, "fcamera.hevc": 1, "dcamera.hevc": 2, "ecamera.hevc": 3}
 
   def get_upload_sort(self, name):
     if name in self.immediate_priority:
@@ -1,7 +1,19 @@
 #!/usr/bin/env python3
 import zmq
 import cereal.messaging as messaging
-from selfdrive.swaglog import get_le_handler
+from selfdrive.swaglog import get_le_handler, BATCH_MARKER, LOG_ADDR
+
+
+def unpack_records(parts):
+  """(levelnum, json) per record of a message from swaglog, a batch or a single record from the C++ swaglog."""
+  if parts[0] == BATCH_MARKER:
+    records = parts[1:]
+  else:
+    records = [b''.join(parts)]
+
+  for dat in records:
+    dat = dat.decode('utf8')
+    yield ord(dat[0]), dat[1:]
 
 
 def main():
@@ -10,29 +22,24 @@ def main():
 
   ctx = zmq.Context().instance()
   sock = ctx.socket(zmq.PULL)
-  sock.bind("ipc:///tmp/logmessage")
+  sock.bind(LOG_ADDR)
 
   # and we publish them
   pub_sock = messaging.pub_sock('logMessage')
 
   while True:
-    dat = b''.join(sock.recv_multipart())
-    dat = dat.decode('utf8')
-
-    # print "RECV", repr(dat)
-
-    levelnum = ord(dat[0])
-    dat = dat[1:]
-
-    if levelnum >= le_level:
-      # push to logentries
-      # TODO: push to athena instead
-      le_handler.emit_raw(dat)
-
-    # then we publish them
-    msg = messaging.new_message()
-    msg.logMessage = dat
-    pub_sock.send(msg.to_bytes())
+    for levelnum, dat in unpack_records(sock.recv_multipart()):
+      # print "RECV", repr(dat)
+
+      if levelnum >= le_level:
+        # push to logentries
+        # TODO: push to athena instead
+        le_handler.emit_raw(dat)
+
+      # then we publish them
+      msg = messaging.new_message()
+      msg.logMessage = dat
+      pub_sock.send(msg.to_bytes())
 
 
 if __name__ == "__main__":
@@ -156,6 +156,7 @@ from selfdrive.registration import register
 from selfdrive.version import version, dirty
 from selfdrive.loggerd.config import ROOT
 from selfdrive.launcher import launcher
+from selfdrive.cpu_isolation import CpuIsolation
 from common.apk import update_apks, pm_apply_packages, start_offroad
 
 ThermalStatus = cereal.log.ThermalData.ThermalStatus
@@ -188,7 +189,6 @@ managed_processes = {
   "updated": "selfdrive.updated",
   "dmonitoringmodeld": ("selfdrive/modeld", ["./dmonitoringmodeld"]),
   "modeld": ("selfdrive/modeld", ["./modeld"]),
-  "rtshield": "selfdrive.rtshield",
 }
 
 daemon_processes = {
@@ -196,6 +196,7 @@ daemon_processes = {
 }
 
 running: Dict[str, Process] = {}
+cpu_isolation = CpuIsolation()
 def get_running():
   return running
 
@@ -259,7 +260,6 @@ if not PC:
 if ANDROID:
   car_started_processes += [
     'gpsd',
-    'rtshield',
   ]
 
 # starting dmonitoringmodeld when modeld is initializing can sometimes \
@@ -299,6 +299,9 @@ def start_managed_process(name):
     running[name] = Process(name=name, target=nativelauncher, args=(pargs, cwd))
   running[name].start()
 
+  if not PC:
+    cpu_isolation.place(name, running[name].pid)
+
 def start_daemon_process(name):
   params = Params()
   proc, pid_param = daemon_processes[name]
@@ -452,6 +455,9 @@ def manager_thread():
 
   params = Params()
 
+  # keep everything else off the realtime cores
+  cpu_isolation.reserve()
+
   # start daemon processes
   for p in daemon_processes:
     start_daemon_process(p)
@@ -507,6 +513,7 @@ def manager_thread():
         send_managed_process_signal("updated", signal.SIGHUP)
 
     started_prev = msg.thermal.started
+    cpu_isolation.update()
 
     # check the status of all processes, did any of them die?
     running_list = ["%s%s\u001b[0m" % ("\u001b[32m" if running[p].is_alive() else "\u001b[31m", p) for p in running]
@@ -569,9 +576,7 @@ def main():
   ]
 
   # set unset params
-  for k, v in default_params:
-    if params.get(k) is None:
-      params.put(k, v)
+  params.put_many({k: v for k, v in default_params if params.get(k) is None})
 
   # is this chffrplus?
   if os.getenv("PASSIVE") is not None:
@@ -0,0 +1,171 @@
+#include "proclog.h"
+
+#include <cstdio>
+#include <cstdlib>
+#include <cctype>
+
+#include <fcntl.h>
+#include <dirent.h>
+
+#include "common/utilpp.h"
+
+namespace {
+
+// /proc files report a size of 0, read them until EOF
+bool read_proc_file(const std::string &path, std::string &out) {
+  int fd = open(path.c_str(), O_RDONLY | O_CLOEXEC);
+  if (fd < 0) return false;
+
+  out.clear();
+  char buf[4096];
+  ssize_t n;
+  while ((n = read(fd, buf, sizeof(buf))) > 0) {
+    out.append(buf, n);
+  }
+  close(fd);
+  return n == 0 && out.size() > 0;
+}
+
+std::vector<pid_t> list_pids(const std::string &dir) {
+  std::vector<pid_t> ret;
+  DIR *d = opendir(dir.c_str());
+  if (!d) return ret;
+
+  struct dirent *de = NULL;
+  while ((de = readdir(d))) {
+    if (isdigit(de->d_name[0])) {
+      ret.push_back(atoi(de->d_name));
+    }
+  }
+  closedir(d);
+  return ret;
+}
+
+}
+
+bool parse_proc_stat(const std::string &stat, ProcStat &s) {
+  // the name can hold spaces and parentheses, it ends at the last ')'
+  size_t name_start = stat.find('(');
+  size_t name_end = stat.rfind(')');
+  if (name_start == std::string::npos || name_end == std::string::npos || name_end < name_start) return false;
+
+  s.pid = atoi(stat.c_str());
+  s.name = stat.substr(name_start + 1, name_end - name_start - 1);
+
+  int count = sscanf(stat.c_str() + name_end + 1,
+    " %c %d %*s %*s %*s %*s %*s %*s %*s %*s %*s "
+    "%lu %lu %ld %ld %ld %ld %ld %*s %llu "
+    "%lu %lu %*s %*s %*s %*s %*s %*s %*s "
+    "%*s %*s %*s %*s %*s %*s %*s %d",
+    &s.state, &s.ppid,
+    &s.utime, &s.stime, &s.cutime, &s.cstime, &s.priority, &s.nice, &s.num_threads, &s.starttime,
+    &s.vms, &s.rss, &s.processor);
+  return count == 13;
+}
+
+ProcSampler::ProcSampler(const std::string &proc_root, pid_t manager_pid) : root(proc_root), manager_pid(manager_pid) {}
+
+const ProcInfo *ProcSampler::get_info(const ProcStat &stat) {
+  auto it = cache.find(stat.pid);
+  if (it != cache.end() && it->second.starttime == stat.starttime && it->second.name == stat.name && use_cache) {
+    it->second.last_seen = generation;
+    return &it->second;
+  }
+
+  // new process, a reused pid or an exec
+  ProcInfo &info = cache[stat.pid];
+  info.starttime = stat.starttime;
+  info.name = stat.name;
+  info.exe = util::readlink(util::string_format("%s/%d/exe", root.c_str(), stat.pid));
+  info.last_seen = generation;
+
+  // null-delimited cmdline arguments to vector
+  info.cmdline.clear();
+  std::string cmdline_s;
+  read_proc_file(util::string_format("%s/%d/cmdline", root.c_str(), stat.pid), cmdline_s);
+  const char* cmdline_p = cmdline_s.c_str();
+  const char* cmdline_ep = cmdline_p + cmdline_s.size();
+
+  // strip trailing null bytes
+  while ((cmdline_ep-1) > cmdline_p && *(cmdline_ep-1) == 0) {
+    cmdline_ep--;
+  }
+
+  while (cmdline_p < cmdline_ep) {
+    std::string arg(cmdline_p);
+    info.cmdline.push_back(arg);
+    cmdline_p += arg.size() + 1;
+  }
+  return &info;
+}
+
+void ProcSampler::read_threads(pid_t pid, std::vector<ThreadStat> &threads) {
+  threads.clear();
+
+  std::string task_dir = util::string_format("%s/%d/task", root.c_str(), pid);
+  std::string stat_s;
+  ProcStat stat;
+  for (pid_t tid : list_pids(task_dir)) {
+    if (!read_proc_file(util::string_format("%s/%d/stat", task_dir.c_str(), tid), stat_s)) continue;
+    if (!parse_proc_stat(stat_s, stat)) continue;
+    threads.push_back((ThreadStat){
+      .tid = tid,
+      .name = stat.name,
+      .utime = stat.utime,
+      .stime = stat.stime,
+      .processor = stat.processor,
+    });
+  }
+}
+
+bool ProcSampler::sample(pid_t pid, ProcSample &s) {
+  std::string stat_s;
+  if (!read_proc_file(util::string_format("%s/%d/stat", root.c_str(), pid), stat_s)) return false;
+  if (!parse_proc_stat(stat_s, s.stat)) return false;
+
+  s.managed = s.stat.pid == manager_pid || s.stat.ppid == manager_pid;
+  s.info = get_info(s.stat);
+  if (s.managed) {
+    read_threads(pid, s.threads);
+  } else {
+    s.threads.clear();
+  }
+  return true;
+}
+
+void ProcSampler::sample_all(std::vector<ProcSample> &procs) {
+  generation++;
+  managed_pids.clear();
+
+  std::vector<pid_t> pids = list_pids(root);
+  procs.resize(pids.size());
+
+  size_t n = 0;
+  for (pid_t pid : pids) {
+    if (sample(pid, procs[n])) {
+      if (procs[n].managed) managed_pids.push_back(pid);
+      n++;
+    }
+  }
+  procs.resize(n);
+
+  // drop processes that exited
+  for (auto it = cache.begin(); it != cache.end();) {
+    if (it->second.last_seen != generation) {
+      it = cache.erase(it);
+    } else {
+      ++it;
+    }
+  }
+}
+
+void ProcSampler::sample_managed(std::vector<ProcSample> &procs) {
+  procs.resize(managed_pids.size());
+
+  size_t n = 0;
+  for (pid_t pid : managed_pids) {
+    // the pid may have been reused since the last full sample
+    if (sample(pid, procs[n]) && procs[n].managed) n++;
+  }
+  procs.resize(n);
+}
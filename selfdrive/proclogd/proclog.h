@@ -0,0 +1,74 @@
+#pragma once
+
+#include <string>
+#include <vector>
+#include <unordered_map>
+
+#include <unistd.h>
+#include <sys/types.h>
+
+struct ProcStat {
+  pid_t pid;
+  std::string name;
+  char state;
+  int ppid;
+  unsigned long utime, stime;
+  long cutime, cstime, priority, nice, num_threads;
+  unsigned long long starttime;
+  unsigned long vms, rss;
+  int processor;
+};
+
+// doesn't change for the life of a process, unless it execs
+struct ProcInfo {
+  unsigned long long starttime;
+  std::string name;
+  std::vector<std::string> cmdline;
+  std::string exe;
+  uint64_t last_seen;
+};
+
+struct ThreadStat {
+  pid_t tid;
+  std::string name;
+  unsigned long utime, stime;
+  int processor;
+};
+
+struct ProcSample {
+  ProcStat stat;
+  const ProcInfo *info;
+  bool managed;
+  std::vector<ThreadStat> threads;
+};
+
+bool parse_proc_stat(const std::string &stat, ProcStat &s);
+
+// Samples /proc, caching cmdline and exe by pid and start time. The manager and its
+// children are managed processes, which also get per thread cpu times and can be
+// sampled on their own at a higher rate than the rest of the system.
+class ProcSampler {
+public:
+  ProcSampler(const std::string &proc_root = "/proc", pid_t manager_pid = getppid());
+
+  // every process on the system, also refreshes the set of managed processes
+  void sample_all(std::vector<ProcSample> &procs);
+  // only the managed processes found by the last sample_all
+  void sample_managed(std::vector<ProcSample> &procs);
+
+  size_t cache_size() const { return cache.size(); }
+
+  // re-read the cached metadata on every sample, for benchmarking
+  bool use_cache = true;
+
+private:
+  bool sample(pid_t pid, ProcSample &s);
+  const ProcInfo *get_info(const ProcStat &stat);
+  void read_threads(pid_t pid, std::vector<ThreadStat> &threads);
+
+  std::string root;
+  pid_t manager_pid;
+  uint64_t generation = 0;
+  std::unordered_map<pid_t, ProcInfo> cache;
+  std::vector<pid_t> managed_pids;
+};
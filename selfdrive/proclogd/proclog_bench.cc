@@ -0,0 +1,99 @@
+// Sampling cost of ProcSampler against the number of processes on the system.
+// usage: ./proclog_bench [extra process counts...]
+#include <cstdio>
+#include <cstdlib>
+#include <csignal>
+#include <thread>
+#include <vector>
+
+#include <unistd.h>
+#include <sys/prctl.h>
+#include <sys/wait.h>
+
+#include "common/timing.h"
+#include "proclog.h"
+
+const int MANAGED_PROCS = 25;
+const int THREADS_PER_PROC = 4;
+const int ITERATIONS = 20;
+
+namespace {
+
+pid_t spawn(void (*f)()) {
+  pid_t pid = fork();
+  if (pid == 0) {
+    prctl(PR_SET_PDEATHSIG, SIGKILL);
+    f();
+    _exit(0);
+  }
+  return pid;
+}
+
+void idle() {
+  while (true) pause();
+}
+
+void idle_threads() {
+  std::vector<std::thread> threads;
+  for (int i = 0; i < THREADS_PER_PROC - 1; i++) {
+    threads.emplace_back(idle);
+  }
+  idle();
+}
+
+// stands in for manager and the processes it starts
+void manager() {
+  for (int i = 0; i < MANAGED_PROCS; i++) {
+    spawn(idle_threads);
+  }
+  idle();
+}
+
+template <typename F>
+double time_ms(F f) {
+  double t = millis_since_boot();
+  for (int i = 0; i < ITERATIONS; i++) {
+    f();
+  }
+  return (millis_since_boot() - t) / ITERATIONS;
+}
+
+}
+
+int main(int argc, char **argv) {
+  std::vector<int> counts = {0, 100, 500, 1000};
+  if (argc > 1) {
+    counts.clear();
+    for (int i = 1; i < argc; i++) counts.push_back(atoi(argv[i]));
+  }
+
+  std::vector<pid_t> children = {spawn(manager)};
+  usleep(200000);
+
+  ProcSampler sampler("/proc", children[0]);
+  std::vector<ProcSample> procs;
+
+  printf("%8s %8s %16s %16s %16s\n", "procs", "managed", "all uncached ms", "all cached ms", "managed ms");
+  for (int count : counts) {
+    while (children.size() < (size_t)count + 1) {
+      children.push_back(spawn(idle));
+    }
+    usleep(200000);
+
+    sampler.use_cache = false;
+    double uncached = time_ms([&] { sampler.sample_all(procs); });
+    sampler.use_cache = true;
+    sampler.sample_all(procs);
+    double cached = time_ms([&] { sampler.sample_all(procs); });
+    size_t total = procs.size();
+    double managed = time_ms([&] { sampler.sample_managed(procs); });
+
+    printf("%8zu %8zu %16.2f %16.2f %16.2f\n", total, procs.size(), uncached, cached, managed);
+  }
+
+  for (pid_t pid : children) {
+    kill(pid, SIGKILL);
+    waitpid(pid, NULL, 0);
+  }
+  return 0;
+}
@@ -4,27 +4,27 @@
 #include <cassert>
 
 #include <unistd.h>
-#include <dirent.h>
 #include <memory>
 #include <utility>
 #include <sstream>
 #include <fstream>
 #include <algorithm>
 #include <functional>
-#include <unordered_map>
 
 #include "messaging.hpp"
 
 #include "common/timing.h"
 #include "common/utilpp.h"
 
+#include "proclog.h"
+
 namespace {
 
-struct ProcCache {
-  std::string name;
-  std::vector<std::string> cmdline;
-  std::string exe;
-};
+// s between samples, PROCLOG_FAST_INTERVAL for the managed processes and PROCLOG_ALL_INTERVAL for everything
+double get_interval(const char *name, double default_interval) {
+  const char *s = getenv(name);
+  return s ? atof(s) : default_interval;
+}
 
 }
 
@@ -34,9 +34,15 @@ int main() {
   double jiffy = sysconf(_SC_CLK_TCK);
   size_t page_size = sysconf(_SC_PAGE_SIZE);
 
-  std::unordered_map<pid_t, ProcCache> proc_cache;
+  const double fast_interval = get_interval("PROCLOG_FAST_INTERVAL", 0.5);
+  const double all_interval = get_interval("PROCLOG_ALL_INTERVAL", 2.0);
+
+  ProcSampler sampler;
+  std::vector<ProcSample> procs;
+  double next_all = 0.;
 
   while (1) {
+    double now = seconds_since_boot();
 
     MessageBuilder msg;
     auto procLog = msg.initEvent().initProcLog();
@@ -117,113 +123,61 @@ int main() {
 
     // processes
     {
-      std::vector<capnp::Orphan<cereal::ProcLog::Process>> oprocs;
-      struct dirent *de = NULL;
-      DIR *d = opendir("/proc");
-      assert(d);
-      while ((de = readdir(d))) {
-        if (!isdigit(de->d_name[0])) continue;
-        pid_t pid = atoi(de->d_name);
-
-
-        auto lproco = orphanage.newOrphan<cereal::ProcLog::Process>();
-        auto lproc = lproco.get();
-
-        lproc.setPid(pid);
-
-        char tcomm[PATH_MAX] = {0};
-
-        {
-          std::string stat = util::read_file(util::string_format("/proc/%d/stat", pid));
-
-          char state;
-
-          int ppid;
-          unsigned long utime, stime;
-          long cutime, cstime, priority, nice, num_threads;
-          unsigned long long starttime;
-          unsigned long vms, rss;
-          int processor;
-
-          int count = sscanf(stat.data(),
-            "%*d (%1024[^)]) %c %d %*d %*d %*d %*d %*d %*d %*d %*d %*d "
-             "%lu %lu %ld %ld %ld %ld %ld %*d %lld "
-             "%lu %lu %*d %*d %*d %*d %*d %*d %*d "
-             "%*d %*d %*d %*d %*d %*d %*d %d",
-            tcomm, &state, &ppid,
-            &utime, &stime, &cutime, &cstime, &priority, &nice, &num_threads, &starttime,
-            &vms, &rss, &processor);
-
-          if (count != 14) continue;
-
-          lproc.setState(state);
-          lproc.setPpid(ppid);
-          lproc.setCpuUser(utime / jiffy);
-          lproc.setCpuSystem(stime / jiffy);
-          lproc.setCpuChildrenUser(cutime / jiffy);
-          lproc.setCpuChildrenSystem(cstime / jiffy);
-          lproc.setPriority(priority);
-          lproc.setNice(nice);
-          lproc.setNumThreads(num_threads);
-          lproc.setStartTime(starttime / jiffy);
-          lproc.setMemVms(vms);
-          lproc.setMemRss((uint64_t)rss * page_size);
-          lproc.setProcessor(processor);
-        }
-
-        std::string name(tcomm);
-        lproc.setName(name);
-
-        // populate other things from cache
-        auto cache_it = proc_cache.find(pid);
-        ProcCache cache;
-        if (cache_it != proc_cache.end()) {
-          cache = cache_it->second;
+      bool all = now >= next_all;
+      if (all) {
+        sampler.sample_all(procs);
+        next_all = now + all_interval;
+      } else {
+        sampler.sample_managed(procs);
+      }
+      procLog.setAllProcs(all);
+
+      auto lprocs = procLog.initProcs(procs.size());
+      for (size_t i = 0; i < procs.size(); i++) {
+        const ProcStat &stat = procs[i].stat;
+        const ProcInfo &info = *procs[i].info;
+        auto lproc = lprocs[i];
+
+        lproc.setPid(stat.pid);
+        lproc.setName(stat.name);
+        lproc.setState(stat.state);
+        lproc.setPpid(stat.ppid);
+        lproc.setCpuUser(stat.utime / jiffy);
+        lproc.setCpuSystem(stat.stime / jiffy);
+        lproc.setCpuChildrenUser(stat.cutime / jiffy);
+        lproc.setCpuChildrenSystem(stat.cstime / jiffy);
+        lproc.setPriority(stat.priority);
+        lproc.setNice(stat.nice);
+        lproc.setNumThreads(stat.num_threads);
+        lproc.setStartTime(stat.starttime / jiffy);
+        lproc.setMemVms(stat.vms);
+        lproc.setMemRss((uint64_t)stat.rss * page_size);
+        lproc.setProcessor(stat.processor);
+
+        auto lcmdline = lproc.initCmdline(info.cmdline.size());
+        for (size_t j = 0; j < lcmdline.size(); j++) {
+          lcmdline.set(j, info.cmdline[j]);
         }
-        if (cache_it == proc_cache.end() || cache.name != name) {
-          cache = (ProcCache){
-            .name = name,
-            .exe = util::readlink(util::string_format("/proc/%d/exe", pid)),
-          };
-
-          // null-delimited cmdline arguments to vector
-          std::string cmdline_s = util::read_file(util::string_format("/proc/%d/cmdline", pid));
-          const char* cmdline_p = cmdline_s.c_str();
-          const char* cmdline_ep = cmdline_p + cmdline_s.size();
-
-          // strip trailing null bytes
-          while ((cmdline_ep-1) > cmdline_p && *(cmdline_ep-1) == 0) {
-            cmdline_ep--;
+        lproc.setExe(info.exe);
+
+        lproc.setManaged(procs[i].managed);
+        if (procs[i].managed) {
+          auto lthreads = lproc.initThreads(procs[i].threads.size());
+          for (size_t j = 0; j < lthreads.size(); j++) {
+            const ThreadStat &thread = procs[i].threads[j];
+            lthreads[j].setTid(thread.tid);
+            lthreads[j].setName(thread.name);
+            lthreads[j].setCpuUser(thread.utime / jiffy);
+            lthreads[j].setCpuSystem(thread.stime / jiffy);
+            lthreads[j].setProcessor(thread.processor);
           }
-
-          while (cmdline_p < cmdline_ep) {
-            std::string arg(cmdline_p);
-            cache.cmdline.push_back(arg);
-            cmdline_p += arg.size() + 1;
-          }
-
-          proc_cache[pid] = cache;
-        }
-
-        auto lcmdline = lproc.initCmdline(cache.cmdline.size());
-        for (size_t i = 0; i < lcmdline.size(); i++) {
-          lcmdline.set(i, cache.cmdline[i]);
         }
-        lproc.setExe(cache.exe);
-
-        oprocs.push_back(std::move(lproco));
-      }
-      closedir(d);
-
-      auto lprocs = procLog.initProcs(oprocs.size());
-      for (size_t i = 0; i < oprocs.size(); i++) {
-        lprocs.adoptWithCaveats(i, std::move(oprocs[i]));
       }
     }
 
     publisher.send("procLog", msg);
 
-    usleep(2000000); // 2 secs
+    usleep(std::max(fast_interval - (seconds_since_boot() - now), 0.) * 1e6);
   }
 
   return 0;
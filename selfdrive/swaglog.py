@@ -1,10 +1,18 @@
 import os
+import copy
+import atexit
 import logging
+import threading
+from collections import deque
 
 from logentries import LogentriesHandler
 import zmq
 
-from common.logging_extra import SwagLogger, SwagFormatter
+from common.logging_extra import SwagLogger, SwagFormatter, CallsiteRateLimiter, NiceOrderedDict, json_robust_dumps
+
+LOG_ADDR = "ipc:///tmp/logmessage"
+# first frame of a multipart message carrying several records, each following frame is chr(levelnum) + json
+BATCH_MARKER = b'\x00'
 
 
 def get_le_handler():
@@ -14,16 +22,17 @@ def get_le_handler():
 
 
 class LogMessageHandler(logging.Handler):
-  def __init__(self, formatter):
+  def __init__(self, formatter, addr=LOG_ADDR):
     logging.Handler.__init__(self)
     self.setFormatter(formatter)
+    self.addr = addr
     self.pid = None
 
   def connect(self):
     self.zctx = zmq.Context()
     self.sock = self.zctx.socket(zmq.PUSH)
     self.sock.setsockopt(zmq.LINGER, 10)
-    self.sock.connect("ipc:///tmp/logmessage")
+    self.sock.connect(self.addr)
     self.pid = os.getpid()
 
   def emit(self, record):
@@ -40,6 +49,115 @@ class LogMessageHandler(logging.Handler):
       pass
 
 
+class AsyncLogMessageHandler(logging.Handler):
+  """Snapshots records as they are logged, then encodes and sends them in batches from a background thread.
+
+     The snapshot is taken on the caller since the msg and args of a record may change after it's logged,
+     the json dump happens on the send thread.
+     Records are dropped when a call site logs faster than its token bucket allows, or when the
+     ring is full. Those are reported in the dropped field of the call site's next record, or in a
+     swaglog_ratelimit_dropped event if its bucket was evicted first, and in a swaglog_ring_dropped
+     event respectively.
+  """
+  def __init__(self, formatter, addr=LOG_ADDR, ring_size=1024, batch_size=64, interval=0.05,
+               rate=10., burst=20.):
+    logging.Handler.__init__(self)
+    self.setFormatter(formatter)
+    self.addr = addr
+    self.ring_size = ring_size
+    self.batch_size = batch_size
+    self.interval = interval
+    self.limiter = CallsiteRateLimiter(rate, burst)
+    self.pid = None
+
+  def start(self):
+    # also after a fork, the thread and the socket don't carry over
+    self.ring = deque(maxlen=self.ring_size)
+    self.ring_dropped = 0  # counted up by emit
+    self.ring_reported = 0  # by the send thread
+    self.wake = threading.Event()
+    self.sent = threading.Condition()
+    self.pid = os.getpid()
+    self.thread = threading.Thread(target=self.send_thread, daemon=True)
+    self.thread.start()
+
+  def emit(self, record):
+    if os.getpid() != self.pid:
+      self.start()
+
+    if not self.limiter.allow(record):
+      return
+
+    for (pathname, lineno, event), dropped in self.limiter.pop_evicted():
+      self.queue(self.event_record(NiceOrderedDict(event="swaglog_ratelimit_dropped", pathname=pathname,
+                                                   lineno=lineno, callsite_event=event, dropped=dropped)))
+    self.queue(record)
+
+  def queue(self, record):
+    try:
+      record_dict = self.formatter.format_dict(record)
+      if isinstance(record.msg, dict):
+        # cloudlog.event kwargs, one level deep is what callers pass in and change
+        record_dict['msg'] = NiceOrderedDict((k, copy.copy(v)) for k, v in record.msg.items())
+    except Exception:
+      self.handleError(record)
+      return
+
+    if len(self.ring) >= self.ring_size:
+      self.ring_dropped += 1
+    self.ring.append((record.levelno, record_dict))
+
+    if len(self.ring) >= self.batch_size:
+      self.wake.set()
+
+  def send_thread(self):
+    zctx = zmq.Context()
+    sock = zctx.socket(zmq.PUSH)
+    sock.setsockopt(zmq.LINGER, 10)
+    sock.connect(self.addr)
+
+    while True:
+      self.wake.wait(self.interval)
+      self.wake.clear()
+
+      while len(self.ring) or self.ring_dropped != self.ring_reported:
+        batch = [BATCH_MARKER]
+        dropped = self.ring_dropped - self.ring_reported
+        if dropped:
+          batch.append(self.ring_dropped_frame(dropped))
+          self.ring_reported += dropped
+        while len(self.ring) and len(batch) <= self.batch_size:
+          batch.append(self.encode(*self.ring.popleft()))
+
+        try:
+          sock.send_multipart(batch, zmq.NOBLOCK)
+        except zmq.error.Again:
+          # drop :/
+          pass
+
+      with self.sent:
+        self.sent.notify_all()
+
+  def event_record(self, msg):
+    return logging.LogRecord(self.formatter.swaglogger.name, logging.WARNING, __file__, 0, msg, (), None)
+
+  def ring_dropped_frame(self, dropped):
+    record = self.event_record(NiceOrderedDict(event="swaglog_ring_dropped", dropped=dropped))
+    return self.encode(record.levelno, self.formatter.format_dict(record))
+
+  @staticmethod
+  def encode(levelno, record_dict):
+    return (chr(levelno) + json_robust_dumps(record_dict)).encode('utf8')
+
+  def flush(self):
+    """Wait until everything queued so far has been handed to the socket."""
+    if self.pid != os.getpid() or not (len(self.ring) or self.ring_dropped != self.ring_reported):
+      return
+    with self.sent:
+      self.wake.set()
+      self.sent.wait(1.)
+
+
 def add_logentries_handler(log):
   """Function to add the logentries handler to swaglog.
   This can be used to send logs when logmessaged is not running."""
@@ -53,4 +171,10 @@ log.setLevel(logging.DEBUG)
 
 outhandler = logging.StreamHandler()
 log.addHandler(outhandler)
-log.addHandler(LogMessageHandler(SwagFormatter(log)))
+
+if os.getenv("SWAGLOG_SYNC") is not None:
+  log.addHandler(LogMessageHandler(SwagFormatter(log)))
+else:
+  async_handler = AsyncLogMessageHandler(SwagFormatter(log))
+  log.addHandler(async_handler)
+  atexit.register(async_handler.flush)
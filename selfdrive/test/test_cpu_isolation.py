@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+import os
+import shutil
+import tempfile
+import unittest
+
+from selfdrive.cpu_isolation import CoreStats, CpuIsolation, parse_cpu_list, parse_cpu_mask, format_cpu_mask
+
+
+def write(root, path, value):
+  path = os.path.join(root, path)
+  os.makedirs(os.path.dirname(path), exist_ok=True)
+  with open(path, 'w') as f:
+    f.write(value)
+
+
+def read(root, path):
+  with open(os.path.join(root, path)) as f:
+    return f.read()
+
+
+class TestCpuIsolation(unittest.TestCase):
+  def setUp(self):
+    self.root = tempfile.mkdtemp()
+    self.cpuset = os.path.join(self.root, "cpuset")
+    self.proc = os.path.join(self.root, "proc")
+    self.sys = os.path.join(self.root, "sys")
+    self.cpu = CpuIsolation(rt_cores=[3], cpuset_root=self.cpuset, proc_root=self.proc, sys_root=self.sys)
+
+  def tearDown(self):
+    shutil.rmtree(self.root)
+
+  def test_cpu_lists(self):
+    self.assertEqual(parse_cpu_list("0-2,4\n"), {0, 1, 2, 4})
+    self.assertEqual(parse_cpu_list("3"), {3})
+    self.assertEqual(parse_cpu_list("\n"), set())
+    self.assertEqual(parse_cpu_mask("00000000,0000000f\n"), {0, 1, 2, 3})
+    self.assertEqual(format_cpu_mask({0, 1, 2}), "7")
+
+  def test_reserve_cpusets(self):
+    write(self.cpuset, "cpus", "0-3")
+    write(self.cpuset, "foreground/cpus", "0-3")
+    write(self.cpuset, "foreground/boost/cpus", "2-3")
+    write(self.cpuset, "background/cpus", "0")
+    write(self.cpuset, "only_rt/cpus", "3")
+    write(self.cpuset, "manager/cpus", "0-3")
+    write(self.proc, "self/cpuset", "/manager\n")
+
+    self.assertEqual(self.cpu.reserve_cpusets(), 2)
+    self.assertEqual(read(self.cpuset, "foreground/cpus"), "0,1,2")
+    self.assertEqual(read(self.cpuset, "foreground/boost/cpus"), "2")
+    self.assertEqual(read(self.cpuset, "background/cpus"), "0")
+    # nothing left without the realtime core
+    self.assertEqual(read(self.cpuset, "only_rt/cpus"), "3")
+    # children can't use the realtime core if the manager's own cpuset or its parents lose it
+    self.assertEqual(read(self.cpuset, "manager/cpus"), "0-3")
+    self.assertEqual(read(self.cpuset, "cpus"), "0-3")
+
+  def test_reserve_irqs(self):
+    write(self.proc, "irq/default_smp_affinity", "f\n")
+    write(self.proc, "irq/25/smp_affinity", "0f\n")
+    write(self.proc, "irq/26/smp_affinity", "8\n")
+    write(self.sys, "devices/virtual/workqueue/cpumask", "c\n")
+
+    self.cpu.reserve_irqs()
+    self.assertEqual(read(self.proc, "irq/default_smp_affinity"), "7")
+    self.assertEqual(read(self.proc, "irq/25/smp_affinity"), "7")
+    self.assertEqual(read(self.proc, "irq/26/smp_affinity"), "8\n")
+    self.assertEqual(read(self.sys, "devices/virtual/workqueue/cpumask"), "4")
+
+  def test_core_stats(self):
+    line = "cpu%d 0 0 %d 0 %d 0 0 %d %d\n"
+    write(self.proc, "schedstat", "version 15\ntimestamp 1\n" + line % (0, 10, 100, 0, 10) + "domain0 3 0 0\n")
+    stats = CoreStats(self.proc)
+    write(self.proc, "schedstat", "version 15\ntimestamp 2\n" + line % (0, 20, 150, 4000000, 20))
+
+    s, = stats.update()
+    self.assertEqual(s['core'], 0)
+    self.assertGreater(s['wakeups'], 0)
+    self.assertAlmostEqual(s['run_delay_ms'], 0.4)
+
+  def test_no_schedstat(self):
+    self.assertEqual(CoreStats(self.proc).update(), [])
+
+
+if __name__ == "__main__":
+  unittest.main()
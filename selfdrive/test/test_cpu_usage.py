@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import os
+import json
 import time
 import sys
 import subprocess
@@ -12,6 +13,19 @@ from selfdrive.test.helpers import set_params_enabled
 def cputime_total(ct):
   return ct.cpuUser + ct.cpuSystem + ct.cpuChildrenUser + ct.cpuChildrenSystem
 
+def managed_procs(proc_log):
+  # every cmdline argument of the processes started by manager
+  return {arg: p for p in proc_log.procs if p.managed for arg in p.cmdline}
+
+def busiest_threads(first, last, dt, n=3):
+  first_threads = {t.tid: t for t in first.threads}
+  usage = []
+  for t in last.threads:
+    if t.tid in first_threads:
+      prev = first_threads[t.tid]
+      usage.append(((t.cpuUser + t.cpuSystem - prev.cpuUser - prev.cpuSystem) / dt * 100., t.name))
+  return sorted(usage, reverse=True)[:n]
+
 
 def print_cpu_usage(first_proc, last_proc):
   procs = [
@@ -41,11 +55,11 @@ def print_cpu_usage(first_proc, last_proc):
 
   r = True
   dt = (last_proc.logMonoTime - first_proc.logMonoTime) / 1e9
+  first_procs, last_procs = managed_procs(first_proc.procLog), managed_procs(last_proc.procLog)
   result = "------------------------------------------------\n"
   for proc_name, normal_cpu_usage in procs:
     try:
-      first = [p for p in first_proc.procLog.procs if proc_name in p.cmdline][0]
-      last = [p for p in last_proc.procLog.procs if proc_name in p.cmdline][0]
+      first, last = first_procs[proc_name], last_procs[proc_name]
       cpu_time = cputime_total(last) - cputime_total(first)
       cpu_usage = cpu_time / dt * 100.
       if cpu_usage > max(normal_cpu_usage * 1.1, normal_cpu_usage + 5.0):
@@ -54,14 +68,40 @@ def print_cpu_usage(first_proc, last_proc):
       elif cpu_usage < min(normal_cpu_usage * 0.65, max(normal_cpu_usage - 1.0, 0.0)):
         result += f"Warning {proc_name} using less CPU than normal\n"
         r = False
-      result += f"{proc_name.ljust(35)}  {cpu_usage:.2f}%\n"
-    except IndexError:
+      threads = ", ".join(f"{name} {usage:.1f}%" for usage, name in busiest_threads(first, last, dt))
+      result += f"{proc_name.ljust(35)}  {cpu_usage:.2f}%  ({threads})\n"
+    except KeyError:
       result += f"{proc_name.ljust(35)}  NO METRICS FOUND\n"
       r = False
   result += "------------------------------------------------\n"
   print(result)
   return r
 
+def collect_loop_timing(log_sock, timing):
+  for msg in messaging.drain_sock(log_sock):
+    try:
+      log = json.loads(msg.logMessage)
+    except ValueError:
+      continue
+    if isinstance(log.get('msg'), dict) and log['msg'].get('event') == "loop_timing":
+      timing[log['msg']['process']] = log['msg']
+
+
+def print_loop_timing(timing):
+  r = True
+  result = "------------------------------------------------\n"
+  for proc_name in ("controlsd", "radard"):
+    t = timing.get(proc_name)
+    if t is None:
+      result += f"{proc_name.ljust(35)}  NO LOOP TIMING FOUND\n"
+      r = False
+      continue
+    result += f"{proc_name.ljust(35)}  work p50 {t['work']['p50']:.2f} p99 {t['work']['p99']:.2f} max {t['work']['max']:.2f} ms, "
+    result += f"{t['overruns']}/{t['frames']} overruns\n"
+  result += "------------------------------------------------\n"
+  print(result)
+  return r
+
 def test_cpu_usage():
   cpu_ok = False
 
@@ -70,6 +110,7 @@ def test_cpu_usage():
   manager_proc = subprocess.Popen(["python", manager_path])
   try:
     proc_sock = messaging.sub_sock('procLog', conflate=True, timeout=2000)
+    log_sock = messaging.sub_sock('logMessage')
 
     # wait until everything's started
     start_time = time.monotonic()
@@ -84,10 +125,15 @@ def test_cpu_usage():
     if first_proc is None:
       raise Exception("\n\nTEST FAILED: progLog recv timed out\n\n")
 
-    # run for a minute and get last sample
-    time.sleep(60)
+    # run for a minute and get last sample, keep the latest loop timing report of each process
+    timing = {}
+    start_time = time.monotonic()
+    while time.monotonic() - start_time < 60:
+      collect_loop_timing(log_sock, timing)
+      time.sleep(1)
     last_proc = messaging.recv_sock(proc_sock, wait=True)
     cpu_ok = print_cpu_usage(first_proc, last_proc)
+    cpu_ok = print_loop_timing(timing) and cpu_ok
   finally:
     manager_proc.terminate()
     ret = manager_proc.wait(20)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import zmq
+
+from common.logging_extra import CallsiteRateLimiter, SwagLogger, SwagFormatter
+from selfdrive.logmessaged import unpack_records
+from selfdrive.swaglog import AsyncLogMessageHandler
+
+
+class TestLogmessaged(unittest.TestCase):
+  def setUp(self):
+    self.tmp = tempfile.mkdtemp()
+    self.addr = "ipc://" + os.path.join(self.tmp, "logmessage")
+    self.zctx = zmq.Context()
+    self.sock = self.zctx.socket(zmq.PULL)
+    self.sock.bind(self.addr)
+
+    self.log = SwagLogger()
+    self.log.setLevel(logging.DEBUG)
+
+  def tearDown(self):
+    self.sock.close(linger=0)
+    self.zctx.term()
+    shutil.rmtree(self.tmp)
+
+  def handler(self, **kwargs):
+    handler = AsyncLogMessageHandler(SwagFormatter(self.log), addr=self.addr, **kwargs)
+    self.log.addHandler(handler)
+    return handler
+
+  def receive(self):
+    ret = []
+    while self.sock.poll(200):
+      ret += [(levelnum, json.loads(dat)) for levelnum, dat in unpack_records(self.sock.recv_multipart())]
+    return ret
+
+  def test_batches(self):
+    handler = self.handler(batch_size=4)
+    with self.log.ctx(daemon="test"):
+      for i in range(10):
+        self.log.info("record %d", i)
+    self.log.error("error")
+    handler.flush()
+
+    records = self.receive()
+    self.assertEqual([r['msg'] for _, r in records], ["record %d" % i for i in range(10)] + ["error"])
+    self.assertEqual([levelnum for levelnum, _ in records], [logging.INFO] * 10 + [logging.ERROR])
+    self.assertEqual(records[0][1]['ctx'], {'daemon': "test"})
+
+  def test_formatted_when_logged(self):
+    handler = self.handler(interval=10.)
+    args = {'a': 1}
+    self.log.info("%s", args)
+    self.log.event("evt", args=args)
+    args['a'] = 2
+    handler.flush()
+
+    records = self.receive()
+    self.assertEqual(records[0][1]['msg'], "{'a': 1}")
+    self.assertEqual(records[1][1]['msg']['args'], {'a': 1})
+
+  def test_encoded_on_send_thread(self):
+    handler = self.handler(interval=10.)
+    threads = []
+
+    class Unserializable():
+      def __repr__(self):
+        threads.append(threading.current_thread())
+        return "unserializable"
+
+    self.log.event("evt", obj=Unserializable())
+    self.assertEqual(threads, [])
+    handler.flush()
+
+    self.assertEqual(self.receive()[0][1]['msg']['obj'], "unserializable")
+    self.assertEqual(threads, [handler.thread])
+
+  def test_ring_dropped(self):
+    handler = self.handler(ring_size=4, interval=10.)
+    for i in range(10):
+      self.log.info("record %d", i)
+    handler.flush()
+
+    records = [r for _, r in self.receive()]
+    self.assertEqual(records[0]['msg'], {'event': "swaglog_ring_dropped", 'dropped': 6})
+    self.assertEqual([r['msg'] for r in records[1:]], ["record %d" % i for i in range(6, 10)])
+
+  def test_ratelimit_evicted(self):
+    handler = self.handler(interval=10.)
+    handler.limiter = CallsiteRateLimiter(rate=10., burst=2., max_buckets=2)
+    for name in ("a", "a", "a", "b", "c"):
+      self.log.event(name)
+    handler.flush()
+
+    records = [r['msg'] for _, r in self.receive()]
+    self.assertEqual([r['event'] for r in records], ["a", "a", "b", "swaglog_ratelimit_dropped", "c"])
+    self.assertEqual((records[3]['callsite_event'], records[3]['dropped']), ("a", 1))
+
+  def test_single_record(self):
+    # as sent by the C++ swaglog
+    dat = chr(logging.WARNING) + json.dumps({'msg': "hello"})
+    self.assertEqual(list(unpack_records([dat.encode('utf8')])), [(logging.WARNING, json.dumps({'msg': "hello"}))])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,117 @@
+import os
+import threading
+
+from cereal import log
+from common.realtime import sec_since_boot
+from selfdrive.swaglog import cloudlog
+
+NetworkType = log.ThermalData.NetworkType
+NetworkStrength = log.ThermalData.NetworkStrength
+
+# prefix for all sysfs paths, so a fake tree can stand in for /sys
+SYSFS_ROOT = os.getenv("SYSFS_ROOT", "/")
+MISSING_RETRY = 10.  # s before trying to open a missing node again
+
+
+class SysfsReader():
+  """Keeps sysfs nodes open and re-reads them with pread instead of an open/read/close per sample."""
+  def __init__(self, root=None):
+    self.root = SYSFS_ROOT if root is None else root
+    self.lock = threading.Lock()
+    self.fds = {}
+    self.missing = {}  # path -> time it was found missing
+
+  def _get_fd(self, path):
+    fd = self.fds.get(path)
+    if fd is not None:
+      return fd
+
+    with self.lock:
+      if path in self.fds:
+        return self.fds[path]
+      if sec_since_boot() - self.missing.get(path, -MISSING_RETRY) < MISSING_RETRY:
+        return None
+
+      try:
+        fd = os.open(os.path.join(self.root, path.lstrip('/')), os.O_RDONLY)
+      except OSError:
+        self.missing[path] = sec_since_boot()
+        return None
+
+      self.missing.pop(path, None)
+      self.fds[path] = fd
+      return fd
+
+  def _drop(self, path):
+    with self.lock:
+      fd = self.fds.pop(path, None)
+      if fd is not None:
+        os.close(fd)
+
+  def read(self, path, parser, default=0):
+    fd = self._get_fd(path)
+    if fd is None:
+      return default
+
+    try:
+      return parser(os.pread(fd, 4096, 0).decode('utf8'))
+    except OSError:
+      # node went away, reopen on the next read
+      self._drop(path)
+      return default
+    except Exception:
+      return default
+
+  def close(self):
+    with self.lock:
+      for fd in self.fds.values():
+        os.close(fd)
+      self.fds.clear()
+
+
+class NetworkSampler():
+  """Polls the expensive network type and strength calls on a background thread."""
+  def __init__(self, hardware, interval=10.):
+    self.hardware = hardware
+    self.interval = interval
+    self.lock = threading.Lock()
+    self.network_type = NetworkType.none
+    self.network_strength = NetworkStrength.unknown
+    self.last_update = None
+
+    self.stop_event = threading.Event()
+    self.thread = threading.Thread(target=self.run, daemon=True)
+
+  def update(self):
+    try:
+      network_type = self.hardware.get_network_type()
+      network_strength = self.hardware.get_network_strength(network_type)
+    except Exception:
+      cloudlog.exception("Error getting network status")
+      return
+
+    with self.lock:
+      self.network_type = network_type
+      self.network_strength = network_strength
+      self.last_update = sec_since_boot()
+
+  def run(self):
+    while not self.stop_event.is_set():
+      self.update()
+      self.stop_event.wait(self.interval)
+
+  def start(self):
+    self.thread.start()
+
+  def stop(self):
+    self.stop_event.set()
+    self.thread.join()
+
+  def get(self):
+    """Returns network type, strength and the age of the sample in seconds (inf before the first one)."""
+    with self.lock:
+      age = float('inf') if self.last_update is None else sec_since_boot() - self.last_update
+      return self.network_type, self.network_strength, age
+
+
+sysfs = SysfsReader()
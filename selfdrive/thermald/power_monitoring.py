@@ -8,6 +8,7 @@ from common.realtime import sec_since_boot
 from common.params import Params, put_nonblocking
 from common.hardware import TICI
 from selfdrive.swaglog import cloudlog
+from selfdrive.thermald.hardware_sampler import sysfs
 
 PANDA_OUTPUT_VOLTAGE = 5.28
 CAR_VOLTAGE_LOW_PASS_K = 0.091 # LPF gain for 5s tau (dt/tau / (dt/tau + 1))
@@ -55,11 +56,7 @@ def set_battery_charging(on):
 
 # Helpers
 def _read_param(path, parser, default=0):
-  try:
-    with open(path) as f:
-      return parser(f.read())
-  except Exception:
-    return default
+  return sysfs.read(path, parser, default)
 
 
 def panda_current_to_actual_current(panda_current):
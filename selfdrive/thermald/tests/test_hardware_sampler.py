@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from selfdrive.thermald.hardware_sampler import NetworkSampler, SysfsReader, NetworkStrength, NetworkType
+
+
+def write_node(root, path, value):
+  path = os.path.join(root, path.lstrip('/'))
+  os.makedirs(os.path.dirname(path), exist_ok=True)
+  with open(path, 'w') as f:
+    f.write(value)
+
+
+class FakeHardware():
+  def __init__(self):
+    self.calls = 0
+
+  def get_network_type(self):
+    self.calls += 1
+    return NetworkType.wifi
+
+  def get_network_strength(self, network_type):
+    return NetworkStrength.great
+
+
+class TestSysfsReader(unittest.TestCase):
+  def setUp(self):
+    self.root = tempfile.mkdtemp()
+    self.reader = SysfsReader(self.root)
+
+  def tearDown(self):
+    self.reader.close()
+    shutil.rmtree(self.root)
+
+  def test_reread(self):
+    path = "/sys/devices/virtual/thermal/thermal_zone5/temp"
+    write_node(self.root, path, "420\n")
+    self.assertEqual(self.reader.read(path, int), 420)
+
+    # same fd, sees the new value
+    fd = self.reader.fds[path]
+    write_node(self.root, path, "380\n")
+    self.assertEqual(self.reader.read(path, int), 380)
+    self.assertEqual(self.reader.fds[path], fd)
+
+  def test_missing(self):
+    path = "/sys/class/power_supply/usb/present"
+    self.assertEqual(self.reader.read(path, lambda x: bool(int(x)), False), False)
+
+    # not retried right away
+    write_node(self.root, path, "1\n")
+    self.assertEqual(self.reader.read(path, lambda x: bool(int(x)), False), False)
+    self.reader.missing[path] -= 100
+    self.assertEqual(self.reader.read(path, lambda x: bool(int(x)), False), True)
+
+  def test_parse_error(self):
+    path = "/sys/class/power_supply/battery/capacity"
+    write_node(self.root, path, "garbage\n")
+    self.assertEqual(self.reader.read(path, int, 50), 50)
+
+
+class TestNetworkSampler(unittest.TestCase):
+  def test_background_refresh(self):
+    hw = FakeHardware()
+    sampler = NetworkSampler(hw, interval=0.01)
+    self.assertEqual(sampler.get()[2], float('inf'))
+
+    sampler.start()
+    time.sleep(0.1)
+    sampler.stop()
+
+    network_type, network_strength, age = sampler.get()
+    self.assertEqual(network_type, NetworkType.wifi)
+    self.assertEqual(network_strength, NetworkStrength.great)
+    self.assertLess(age, 1.)
+    self.assertGreater(hw.calls, 1)
+
+
+if __name__ == "__main__":
+  unittest.main()
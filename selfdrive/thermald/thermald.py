@@ -19,6 +19,7 @@ from selfdrive.controls.lib.alertmanager import set_offroad_alert
 from selfdrive.loggerd.config import get_available_percent
 from selfdrive.pandad import get_expected_signature
 from selfdrive.swaglog import cloudlog
+from selfdrive.thermald.hardware_sampler import NetworkSampler, sysfs
 from selfdrive.thermald.power_monitoring import (PowerMonitoring,
                                                  get_battery_capacity,
                                                  get_battery_current,
@@ -60,11 +61,7 @@ def read_tz(x):
   if x is None:
     return 0
 
-  try:
-    with open("/sys/devices/virtual/thermal/thermal_zone%d/temp" % x) as f:
-      return int(f.read())
-  except FileNotFoundError:
-    return 0
+  return sysfs.read("/sys/devices/virtual/thermal/thermal_zone%d/temp" % x, int, 0)
 
 
 def read_thermal(thermal_config):
@@ -189,8 +186,9 @@ def thermald_thread():
   usb_power = True
   current_branch = get_git_branch()
 
-  network_type = NetworkType.none
-  network_strength = NetworkStrength.unknown
+  # get_network_type is an expensive call, update every 10s in the background
+  network = NetworkSampler(HARDWARE, 10.)
+  network.start()
 
   current_filter = FirstOrderFilter(0., CURRENT_TAU, DT_TRML)
   cpu_temp_filter = FirstOrderFilter(0., CPU_TEMP_TAU, DT_TRML)
@@ -246,13 +244,9 @@ def thermald_thread():
           params.panda_disconnect()
       health_prev = health
 
-    # get_network_type is an expensive call. update every 10s
-    if (count % int(10. / DT_TRML)) == 0:
-      try:
-        network_type = HARDWARE.get_network_type()
-        network_strength = HARDWARE.get_network_strength(network_type)
-      except Exception:
-        cloudlog.exception("Error getting network status")
+    network_type, network_strength, network_age = network.get()
+    if network_age > 3 * network.interval:
+      network_strength = NetworkStrength.unknown
 
     msg.thermal.freeSpace = get_available_percent(default=100.0) / 100.0
     msg.thermal.memUsedPercent = int(round(psutil.virtual_memory().percent))